@@ -0,0 +1,75 @@
+"""
+Benchmark Tools.should_ignore against the previous per-call fnmatch implementation.
+
+Usage:
+    python benchmarks/bench_should_ignore.py [--paths 100000]
+"""
+import os
+import sys
+import time
+import random
+import fnmatch
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from docdog.tools import Tools
+
+DIRS = ["src", "docdog", "tests", "utils", "venv", "node_modules", "__pycache__", ".git", "docs", "lib"]
+NAMES = ["main.py", "tools.py", "README.md", "image.png", "cache.pyc", "config.toml", ".env", "index.js", "a.json"]
+
+
+def legacy_should_ignore(tools, path):
+    rel_path = os.path.relpath(path, tools.project_root)
+    if rel_path.startswith(".git") or "/.git/" in rel_path:
+        return True
+    if rel_path.startswith("__pycache__") or "/__pycache__/" in rel_path:
+        return True
+    if rel_path.startswith("venv") or "/venv/" in rel_path:
+        return True
+    if rel_path.startswith("node_modules") or "/node_modules/" in rel_path:
+        return True
+    for ext in [".pyc", ".pyo", ".env", ".jpg", ".jpeg", ".png", ".gif", ".DS_Store"]:
+        if rel_path.endswith(ext):
+            return True
+    for pattern in tools.ignore_patterns:
+        if fnmatch.fnmatch(rel_path, pattern):
+            return True
+    return False
+
+
+def make_paths(root, count, seed=0):
+    rng = random.Random(seed)
+    paths = []
+    for _ in range(count):
+        depth = rng.randint(0, 5)
+        parts = [rng.choice(DIRS) for _ in range(depth)] + [rng.choice(NAMES)]
+        paths.append(os.path.join(root, *parts))
+    return paths
+
+
+def measure(label, func, paths):
+    start = time.perf_counter()
+    ignored = sum(1 for path in paths if func(path))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10} {len(paths) / elapsed:12,.0f} paths/s  ({ignored} ignored)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Tools.should_ignore")
+    parser.add_argument("--paths", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        tools = Tools(root, respect_gitignore=False)
+        paths = make_paths(tools.project_root, args.paths)
+        mismatches = sum(1 for path in paths if legacy_should_ignore(tools, path) != tools.should_ignore(path))
+        old = measure("fnmatch", lambda path: legacy_should_ignore(tools, path), paths)
+        new = measure("compiled", tools.should_ignore, paths)
+        print(f"speedup {old / new:.1f}x, {mismatches} mismatching verdicts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark parallel token counting in docdog.chunking on a synthetic project tree.
+
+Usage:
+    python benchmarks/bench_token_counting.py [--files 2000] [--max-workers 8]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from docdog.chunking import ProjectLoader, count_tokens, read_source
+
+WORDS = ["def", "class", "return", "import", "self", "value", "config", "logger", "path", "result"]
+
+
+def build_tree(root, num_files, seed=0):
+    rng = random.Random(seed)
+    for i in range(num_files):
+        package = os.path.join(root, f"pkg{i % 20}")
+        os.makedirs(package, exist_ok=True)
+        lines = rng.randint(20, 2000)
+        with open(os.path.join(package, f"module_{i}.py"), "w", encoding="utf-8") as f:
+            for _ in range(lines):
+                f.write(" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 12))) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel token counting")
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        build_tree(root, args.files)
+        loader = ProjectLoader(equal_chunks=1, output_dir=os.path.join(root, "chunks"))
+        texts = {}
+        for path, _ in loader.collect_paths(root):
+            text, _ = read_source(loader, path)
+            if text is not None:
+                texts[path] = text
+        total_mb = sum(len(text) for text in texts.values()) / 1e6
+        tokenizer = loader.encoding_name if loader.encoding else "word-split fallback"
+        print(f"{len(texts)} files, {total_mb:.1f} MB, tokenizer: {tokenizer}")
+
+        baseline = None
+        workers = 1
+        while workers <= args.max_workers:
+            start = time.perf_counter()
+            counts = count_tokens(loader, texts, workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"workers={workers:<3} {elapsed:8.3f}s  speedup={baseline / elapsed:5.2f}x  tokens={sum(counts.values())}")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
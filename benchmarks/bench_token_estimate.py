@@ -0,0 +1,86 @@
+"""
+Compare docdog's size-based token estimator with exact token counting on real checkouts.
+
+Reports the time of each approach, the speedup, the error of the total and the mean
+per-file error, plus the bytes-per-token ratio observed for each extension, which can
+be fed back as the "bytes_per_token" chunk config.
+
+Usage:
+    python benchmarks/bench_token_estimate.py [REPO ...] [--sample 0.05]
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from docdog.chunking import ProjectLoader, TokenEstimator, count_tokens, read_source
+
+
+def load_files(root):
+    loader = ProjectLoader(equal_chunks=1, output_dir=os.path.join(root, "chunks"))
+    files = {}
+    for path, st in loader.collect_paths(root, "git"):
+        try:
+            text, digest = read_source(loader, path)
+        except OSError:
+            continue
+        if text is not None:
+            files[os.path.relpath(path, root)] = (text, {"size": st.st_size, "hash": digest})
+    return loader, files
+
+
+def estimate_all(loader, files, sample):
+    estimator = TokenEstimator(sample_rate=sample)
+    window = [(rel_path, entry, text) for rel_path, (text, entry) in files.items()]
+    return estimator, estimator.count(loader, window)
+
+
+def report(root, sample):
+    loader, files = load_files(root)
+    texts = {rel_path: text for rel_path, (text, _) in files.items()}
+    total_mb = sum(entry["size"] for _, entry in files.values()) / 1e6
+    tokenizer = loader.encoding_name if loader.encoding else "word-split fallback"
+    print(f"{root}: {len(files)} files, {total_mb:.1f} MB, tokenizer: {tokenizer}")
+
+    start = time.perf_counter()
+    exact = count_tokens(loader, texts)
+    exact_time = time.perf_counter() - start
+    exact_total = max(1, sum(exact.values()))
+    print(f"  exact            {exact_time:8.3f}s  tokens={exact_total}")
+
+    for rate in sorted({0.0, sample}):
+        start = time.perf_counter()
+        estimator, estimated = estimate_all(loader, files, rate)
+        elapsed = time.perf_counter() - start
+        total_error = (sum(estimated.values()) - exact_total) / exact_total
+        file_error = sum(abs(estimated[p] - exact[p]) / max(1, exact[p]) for p in exact) / max(1, len(exact))
+        print(
+            f"  estimate s={rate:<5} {elapsed:8.3f}s  speedup={exact_time / max(elapsed, 1e-9):7.1f}x  "
+            f"total error={total_error:+.1%}  mean file error={file_error:.1%}  "
+            f"sampled={estimator.sampled_files}"
+        )
+
+    by_ext = {}
+    for rel_path, (_, entry) in files.items():
+        ext = os.path.splitext(rel_path)[1].lower() or "(none)"
+        size, tokens = by_ext.get(ext, (0, 0))
+        by_ext[ext] = (size + entry["size"], tokens + exact[rel_path])
+    print("  observed bytes per token:")
+    for ext, (size, tokens) in sorted(by_ext.items(), key=lambda item: -item[1][0]):
+        print(f"    {ext:<8} {size / max(1, tokens):5.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark size-based token estimation against exact counting")
+    parser.add_argument("repos", nargs="*", default=["."])
+    parser.add_argument("--sample", type=float, default=0.05,
+                        help="Fraction of files counted exactly for the corrected estimate (default: 0.05)")
+    args = parser.parse_args()
+    for repo in args.repos:
+        report(os.path.abspath(repo), args.sample)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_PATH = os.path.join(".docdog", "checkpoint.json")
+CHECKPOINT_VERSION = 2
+HASH_BLOCK_BYTES = 1024 * 1024
+
+
+def chunk_hashes(chunks_dir, chunk_names):
+    """sha256 of each chunk file's content, keyed by chunk name."""
+    hashes = {}
+    for name in chunk_names:
+        digest = hashlib.sha256()
+        with open(os.path.join(chunks_dir, name), "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b""):
+                digest.update(block)
+        hashes[name] = digest.hexdigest()
+    return hashes
+
+
+def save_checkpoint(path, messages, analyzed_chunks, analysis_iteration, chunks):
+    """
+    Atomically write the analysis state after an iteration, so an interrupted run can resume.
+
+    chunks maps every chunk name to its content hash (see chunk_hashes). The parent directory
+    is created if needed, but never the project root itself. Failures are logged and do not
+    stop the analysis.
+    """
+    state = {
+        "version": CHECKPOINT_VERSION,
+        "chunks": dict(chunks),
+        "analyzed_chunks": sorted(analyzed_chunks),
+        "analysis_iteration": analysis_iteration,
+        "messages": messages
+    }
+    directory = os.path.dirname(path)
+    tmp_path = None
+    try:
+        try:
+            os.mkdir(directory)
+        except FileExistsError:
+            pass
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning(f"Could not write checkpoint {path}: {str(e)}")
+        if tmp_path is not None:
+            remove_checkpoint(tmp_path)
+
+
+def load_checkpoint(path, chunks):
+    """
+    Return (messages, analyzed_chunks, analysis_iteration) from a checkpoint, or None if it is
+    missing, unreadable, or was written for other chunks: chunks, the chunk_hashes of the
+    current run, must match by name and content, since chunks are rebuilt before resuming.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if state.get("version") != CHECKPOINT_VERSION:
+        return None
+    if state.get("chunks") != dict(chunks):
+        logger.warning(f"Checkpoint {path} was written for different chunk contents; starting the analysis over")
+        return None
+    return state["messages"], set(state["analyzed_chunks"]), state["analysis_iteration"]
+
+
+def remove_checkpoint(path):
+    """Delete a checkpoint (or a partial write of one) if it exists."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
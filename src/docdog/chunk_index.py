@@ -0,0 +1,92 @@
+import os
+import json
+import mmap
+import logging
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = "index.json"
+INDEX_VERSION = 1
+MAX_SLICE_BYTES = 256 * 1024
+
+
+def save_chunk_index(output_dir, files):
+    """
+    Write the chunk index: for every packed source file (relative path), the chunk file it
+    was written to and where its content sits in that chunk.
+
+    Each entry has "chunk" (chunk file name), "offset" and "length" in bytes, and "line" and
+    "lines" (1-based first line and line count). Identical copies that were folded away
+    carry "duplicate_of" and point at the content of their original.
+    """
+    index = {"version": INDEX_VERSION, "files": files}
+    with open(os.path.join(output_dir, INDEX_NAME), "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+
+
+def load_chunk_index(output_dir):
+    """Return the files of the chunk index in output_dir, or None if it is missing or unreadable."""
+    try:
+        with open(os.path.join(output_dir, INDEX_NAME), "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get("version") != INDEX_VERSION:
+        return None
+    return index.get("files", {})
+
+
+def read_mapped(path, offset, length):
+    """Read up to length bytes at offset from path through a read-only memory map."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if length <= 0 or offset >= size:
+            return b""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm[offset:offset + length]
+
+
+class ChunkIndex:
+    """Serves packed source files and chunk slices from the chunk index, reloading it when it changes."""
+
+    def __init__(self, chunks_dir):
+        self.chunks_dir = os.path.abspath(chunks_dir)
+        self._files = None
+        self._mtime_ns = None
+
+    def files(self):
+        try:
+            mtime_ns = os.stat(os.path.join(self.chunks_dir, INDEX_NAME)).st_mtime_ns
+        except OSError:
+            self._files, self._mtime_ns = None, None
+            return None
+        if mtime_ns != self._mtime_ns:
+            self._files = load_chunk_index(self.chunks_dir)
+            self._mtime_ns = mtime_ns
+        return self._files
+
+    def locate(self, rel_path):
+        """Return the index entry of a packed source file, or None if it is not in any chunk."""
+        files = self.files()
+        if not files:
+            return None
+        return files.get(os.path.normpath(rel_path).replace(os.sep, "/"))
+
+    def read_file(self, rel_path):
+        entry = self.locate(rel_path)
+        if entry is None:
+            return None, None
+        data = read_mapped(self._chunk_path(entry["chunk"]), entry["offset"], entry["length"])
+        return data.decode("utf-8", errors="replace"), entry
+
+    def read_slice(self, chunk, offset, length=MAX_SLICE_BYTES):
+        """Read a byte range of a chunk file, capped at MAX_SLICE_BYTES."""
+        return read_mapped(self._chunk_path(chunk), max(0, offset), min(length, MAX_SLICE_BYTES)).decode(
+            "utf-8", errors="replace"
+        )
+
+    def _chunk_path(self, chunk):
+        name = os.path.basename(chunk)
+        if not (name.startswith("chunk-") and name.endswith(".txt")):
+            raise ValueError(f"Not a chunk file: {chunk}")
+        return os.path.join(self.chunks_dir, name)
@@ -1,12 +1,730 @@
 import os
+import re
+import json
+import heapq
+import hashlib
 import logging
 import shutil
+import concurrent.futures
 from pykomodo.multi_dirs_chunker import ParallelChunker
 from pykomodo.token_chunker import TokenBasedChunker
+from docdog.project_files import list_project_files
+from docdog.chunk_index import save_chunk_index, load_chunk_index
 
 logger = logging.getLogger(__name__)
 PYKOMODO_AVAILABLE = True  
 
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+MIN_FILES_PER_WORKER = 8
+TOKEN_WINDOW_BYTES = 16 * 1024 * 1024
+GENERATED_HEADER_BYTES = 2048
+GENERATED_HEADER_LINES = 5
+COMMENT_PREFIX = r"(?:#+|//+|/\*+|\*|--|;+|<!--)\s*"
+GENERATED_HEADERS = (
+    re.compile(r"// Code generated .* DO NOT EDIT\.$"),
+    re.compile(COMMENT_PREFIX + r"@generated\b"),
+    re.compile(COMMENT_PREFIX + r"Generated by the protocol buffer compiler\.\s+DO NOT EDIT!"),
+)
+WRITE_BUFFER_BYTES = 1024 * 1024
+SNIFF_BYTES = 8192
+BINARY_RATIO = 0.3
+TEXT_BYTES = bytes({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100)) - {0x7f})
+MAX_FILE_BYTES = 1024 * 1024
+DEFAULT_SIZE_CAPS = {
+    ".json": 256 * 1024,
+    ".csv": 256 * 1024,
+    ".tsv": 256 * 1024,
+    ".log": 256 * 1024,
+    ".xml": 512 * 1024,
+    ".txt": 512 * 1024,
+}
+DEFAULT_BYTES_PER_TOKEN = 3.6
+BYTES_PER_TOKEN = {
+    ".py": 3.4,
+    ".js": 3.2,
+    ".ts": 3.2,
+    ".sh": 3.3,
+    ".css": 3.0,
+    ".html": 2.9,
+    ".json": 2.8,
+    ".toml": 3.0,
+    ".yml": 3.0,
+    ".yaml": 3.0,
+    ".md": 4.0,
+    ".rst": 4.0,
+    ".txt": 4.2,
+}
+
+_worker_encoding = None
+
+
+class ProjectLoader(TokenBasedChunker):
+    """TokenBasedChunker that walks the project but leaves reading and chunk writing to docdog."""
+
+    def __init__(self, *args, skip_paths=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.skip_paths = set(skip_paths)
+
+    def _process_chunks(self):
+        pass
+
+    def collect_paths(self, directory, backend="walk"):
+        """Return (path, stat_result) for every file pykomodo would load from directory, without reading any."""
+        self.current_walk_root = os.path.abspath(directory)
+        self.tree_generator.reset()
+        self._read_ignore_file(directory)
+        if backend == "walk":
+            files = []
+            for path in self._collect_paths([directory]):
+                if os.path.relpath(path, directory).replace(os.sep, "/") in self.skip_paths:
+                    continue
+                try:
+                    files.append((path, os.stat(path)))
+                except OSError:
+                    continue
+            return files
+
+        output_dir = os.path.abspath(self.output_dir) + os.sep
+        files = []
+        for rel_path, st in list_project_files(directory, backend, self.dir_ignore_names, self.skip_paths):
+            full_path = os.path.join(directory, rel_path)
+            if os.path.abspath(full_path).startswith(output_dir):
+                continue
+            if not self.should_ignore_file(full_path):
+                files.append((full_path, st))
+        return files
+
+
+class ScanOptions:
+    """How the scan enumerates, filters and deduplicates project files, built from the chunk config."""
+
+    def __init__(self, workers=1, dedupe=True, backend="walk", max_file_bytes=MAX_FILE_BYTES, size_caps=None,
+                 token_counting="exact", estimate_sample=0.0, bytes_per_token=None, skip_generated=True):
+        self.workers = workers
+        self.dedupe = dedupe
+        self.skip_generated = skip_generated
+        self.backend = backend
+        self.max_file_bytes = max_file_bytes
+        self.size_caps = {**DEFAULT_SIZE_CAPS, **(size_caps or {})}
+        self.token_counting = token_counting
+        self.estimate_sample = estimate_sample
+        self.bytes_per_token = {**BYTES_PER_TOKEN, **(bytes_per_token or {})}
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            workers=config.get("workers") or 1,
+            dedupe=config.get("dedupe", True),
+            skip_generated=config.get("skip_generated", True),
+            backend=config.get("enumeration", "git"),
+            max_file_bytes=config.get("max_file_bytes", MAX_FILE_BYTES),
+            size_caps=config.get("max_file_bytes_by_extension"),
+            token_counting=config.get("token_counting", "exact"),
+            estimate_sample=config.get("estimate_sample", 0.0),
+            bytes_per_token=config.get("bytes_per_token")
+        )
+
+    def size_cap(self, path):
+        """The largest size in bytes a file at path may have, or None for no cap (a cap of 0 disables it)."""
+        return self.size_caps.get(os.path.splitext(path)[1].lower(), self.max_file_bytes) or None
+
+    def make_estimator(self):
+        """A fresh TokenEstimator for one scan, or None when tokens are counted exactly."""
+        if self.token_counting != "estimate":
+            return None
+        return TokenEstimator(self.bytes_per_token, self.estimate_sample)
+
+    def settings(self):
+        """The options that decide which files end up in the chunks, recorded in the incremental manifest."""
+        settings = {
+            "dedupe": self.dedupe,
+            "skip_generated": self.skip_generated,
+            "enumeration": self.backend,
+            "max_file_bytes": self.max_file_bytes,
+            "max_file_bytes_by_extension": self.size_caps,
+            "token_counting": self.token_counting
+        }
+        if self.token_counting == "estimate":
+            settings.update(estimate_sample=self.estimate_sample, bytes_per_token=self.bytes_per_token)
+        return settings
+
+
+def looks_binary(head):
+    """True if a file's leading bytes contain a NUL or are mostly not text."""
+    if b"\0" in head:
+        return True
+    return len(head.translate(None, TEXT_BYTES)) > len(head) * BINARY_RATIO
+
+
+def read_prefiltered(loader, path):
+    """Read one file as (content, None), or (None, reason) if its head shows it is empty or binary."""
+    if path.rsplit(".", 1)[-1].lower() in loader.binary_exts:
+        return None, "binary"
+    with open(path, "rb") as f:
+        head = f.read(SNIFF_BYTES)
+        if not head:
+            return None, "empty"
+        if looks_binary(head):
+            return None, "binary"
+        return head + f.read(), None
+
+
+def decode_source(loader, content):
+    """Decode raw file content and return (text with API keys filtered, sha256 of the raw bytes)."""
+    text = loader._filter_api_keys(content.decode("utf-8", errors="replace"))
+    return text, hashlib.sha256(content).hexdigest()
+
+
+def read_source(loader, path):
+    """Read one file and return (text, sha256), or (None, None) for empty or binary files."""
+    content, _ = read_prefiltered(loader, path)
+    if content is None:
+        return None, None
+    return decode_source(loader, content)
+
+
+def load_manifest(output_dir, settings):
+    """Load the manifest of a previous run, or None if it is missing or was built with other settings."""
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("settings") != settings:
+        logger.info("Chunk manifest is stale, rebuilding all chunks")
+        return None
+    return manifest
+
+
+def save_manifest(output_dir, settings, num_chunks, entries):
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "settings": settings,
+        "num_chunks": num_chunks,
+        "files": entries
+    }
+    with open(os.path.join(output_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def _init_token_worker(encoding_name):
+    global _worker_encoding
+    _worker_encoding = None
+    if encoding_name:
+        import tiktoken
+        _worker_encoding = tiktoken.get_encoding(encoding_name)
+
+
+def _count_token_batch(batch):
+    if _worker_encoding:
+        return [(key, len(_worker_encoding.encode(text))) for key, text in batch]
+    return [(key, len(text.split())) for key, text in batch]
+
+
+def make_token_batches(texts, num_batches):
+    """Split texts into at most num_batches batches of roughly equal total size, largest texts first."""
+    batches = [[] for _ in range(num_batches)]
+    heap = [(0, i) for i in range(num_batches)]
+    for key in sorted(texts, key=lambda k: -len(texts[k])):
+        size, idx = heapq.heappop(heap)
+        batches[idx].append((key, texts[key]))
+        heapq.heappush(heap, (size + len(texts[key]), idx))
+    return [batch for batch in batches if batch]
+
+
+def count_tokens(loader, texts, workers=1, pool=None):
+    """Count tokens for a dict of texts, spreading size-balanced batches over a process pool."""
+    if workers <= 1 or len(texts) < workers * MIN_FILES_PER_WORKER:
+        return {key: loader.count_tokens(text) for key, text in texts.items()}
+
+    batches = make_token_batches(texts, workers * 4)
+    try:
+        if pool is not None:
+            counts = {}
+            for batch_counts in pool.map(_count_token_batch, batches):
+                counts.update(batch_counts)
+            return counts
+        with make_token_pool(loader, workers) as pool:
+            return count_tokens(loader, texts, workers, pool)
+    except Exception as e:
+        logger.warning(f"Parallel token counting failed, counting serially: {str(e)}")
+        return {key: loader.count_tokens(text) for key, text in texts.items()}
+
+
+def make_token_pool(loader, workers):
+    encoding_name = loader.encoding_name if loader.encoding else None
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_token_worker,
+        initargs=(encoding_name,)
+    )
+
+
+class TokenEstimator:
+    """Estimates token counts from file sizes, optionally calibrated on an exactly counted sample."""
+
+    def __init__(self, bytes_per_token=None, sample_rate=0.0):
+        self.bytes_per_token = dict(BYTES_PER_TOKEN if bytes_per_token is None else bytes_per_token)
+        self.sample_every = round(1 / sample_rate) if sample_rate > 0 else 0
+        self.exact_by_ext = {}
+        self.estimated_by_ext = {}
+        self.estimated_files = 0
+        self.sampled_files = 0
+        self.sampled_tokens = 0
+        self.sample_abs_error = 0
+
+    def _estimate(self, rel_path, size):
+        """Return (extension, ratio-only estimate, estimate corrected by the samples seen so far)."""
+        ext = os.path.splitext(rel_path)[1].lower()
+        raw = max(1, round(size / self.bytes_per_token.get(ext, DEFAULT_BYTES_PER_TOKEN)))
+        if not self.estimated_by_ext.get(ext):
+            return ext, raw, raw
+        return ext, raw, max(1, round(raw * self.exact_by_ext[ext] / self.estimated_by_ext[ext]))
+
+    def is_sampled(self, digest):
+        return bool(self.sample_every) and int(digest[:8], 16) % self.sample_every == 0
+
+    def estimate(self, rel_path, size):
+        self.estimated_files += 1
+        return self._estimate(rel_path, size)[2]
+
+    def record_sample(self, rel_path, size, exact):
+        """Feed one exact count back into the correction factor of its extension."""
+        ext, raw, guess = self._estimate(rel_path, size)
+        self.exact_by_ext[ext] = self.exact_by_ext.get(ext, 0) + exact
+        self.estimated_by_ext[ext] = self.estimated_by_ext.get(ext, 0) + raw
+        self.sampled_files += 1
+        self.sampled_tokens += exact
+        self.sample_abs_error += abs(guess - exact)
+
+    def count(self, loader, window, workers=1, pool=None):
+        """Return token counts for window, a list of (rel_path, entry, text), counting only samples exactly."""
+        sampled = {rel_path: text for rel_path, entry, text in window if self.is_sampled(entry["hash"])}
+        counts = count_tokens(loader, sampled, workers, pool) if sampled else {}
+        for rel_path, entry, _ in window:
+            if rel_path in counts:
+                self.record_sample(rel_path, entry["size"], counts[rel_path])
+            else:
+                counts[rel_path] = self.estimate(rel_path, entry["size"])
+        return counts
+
+    def log_summary(self):
+        message = f"Estimated tokens for {self.estimated_files} files from their sizes"
+        if self.sampled_files:
+            error = self.sample_abs_error / max(1, self.sampled_tokens)
+            message += (
+                f"; {self.sampled_files} sampled files counted exactly, "
+                f"where estimates differed from the exact counts by {error:.1%}"
+            )
+        logger.info(message)
+
+
+def is_generated(text):
+    """True if one of the first lines of text is a code generator's header comment."""
+    lines = text[:GENERATED_HEADER_BYTES].splitlines()[:GENERATED_HEADER_LINES]
+    return any(header.match(line.strip()) for line in lines for header in GENERATED_HEADERS)
+
+
+class ScanStats:
+    """What the scan folded into aliases or skipped, for the chunking summary."""
+
+    def __init__(self):
+        self.duplicate_files = 0
+        self.duplicate_bytes = 0
+        self.duplicate_tokens = 0
+        self.generated_files = []
+        self.generated_bytes = 0
+        self.skipped = []
+        self.estimator = None
+
+    def skip(self, rel_path, reason, size):
+        self.skipped.append((rel_path, reason, size))
+
+    def log_summary(self):
+        if self.duplicate_files:
+            logger.info(
+                f"Folded {self.duplicate_files} duplicate files into aliases, "
+                f"saving {self.duplicate_tokens} tokens and {self.duplicate_bytes} bytes"
+            )
+        if self.generated_files:
+            logger.info(
+                f"Skipped {len(self.generated_files)} generated files, saving {self.generated_bytes} bytes "
+                f"(about {self.generated_bytes // 4} tokens)"
+            )
+            for rel_path in self.generated_files:
+                logger.info(f"  {rel_path}: generated-code header")
+        if self.skipped:
+            logger.info(
+                f"Skipped {len(self.skipped)} files before tokenizing, "
+                f"saving {sum(size for _, _, size in self.skipped)} bytes"
+            )
+            for rel_path, reason, size in self.skipped:
+                logger.info(f"  {rel_path}: {reason} ({size} bytes)")
+        if self.estimator is not None:
+            self.estimator.log_summary()
+
+
+def iter_scanned_files(loader, project_root, previous_files, options=None, stats=None):
+    """Yield (rel_path, entry, text, changed) per project file, tokenizing only files changed since the manifest."""
+    options = options if options is not None else ScanOptions()
+    stats = stats if stats is not None else ScanStats()
+    workers, dedupe = options.workers, options.dedupe
+    estimator = options.make_estimator()
+    if estimator is not None:
+        stats.estimator = estimator
+    exact_counts_needed = estimator is None or estimator.sample_every
+    pool = make_token_pool(loader, workers) if workers > 1 and exact_counts_needed else None
+    seen = {}
+    canonical_tokens = {}
+    window = []
+    window_bytes = 0
+
+    def flush():
+        pending = [(rel_path, entry, text) for rel_path, entry, text, changed in window
+                   if changed and "duplicate_of" not in entry]
+        if estimator is not None:
+            counts = estimator.count(loader, pending, workers, pool)
+        else:
+            counts = count_tokens(loader, {rel_path: text for rel_path, _, text in pending}, workers, pool)
+        for rel_path, entry, text, changed in window:
+            if rel_path in counts:
+                entry["tokens"] = counts[rel_path]
+            if "duplicate_of" in entry:
+                stats.duplicate_files += 1
+                stats.duplicate_bytes += entry["size"]
+                stats.duplicate_tokens += canonical_tokens[entry["hash"]]
+            else:
+                canonical_tokens[entry["hash"]] = entry["tokens"]
+        return window
+
+    try:
+        for path, st in loader.collect_paths(project_root, options.backend):
+            rel_path = os.path.relpath(path, project_root)
+            try:
+                cap = options.size_cap(rel_path)
+                if cap is not None and st.st_size > cap:
+                    stats.skip(rel_path, f"larger than {cap} bytes", st.st_size)
+                    continue
+                old = previous_files.get(rel_path)
+                was_duplicate = bool(old and "duplicate_of" in old)
+                text = None
+                if old and old["size"] == st.st_size and old["mtime_ns"] == st.st_mtime_ns:
+                    entry = {key: value for key, value in old.items() if key not in ("aliases", "duplicate_of")}
+                    changed = False
+                else:
+                    content, reason = read_prefiltered(loader, path)
+                    if content is None:
+                        if reason == "binary":
+                            stats.skip(rel_path, reason, st.st_size)
+                        continue
+                    text, digest = decode_source(loader, content)
+                    del content
+                    if options.skip_generated and is_generated(text):
+                        stats.generated_files.append(rel_path)
+                        stats.generated_bytes += st.st_size
+                        continue
+                    entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": digest}
+                    entry["chunk"] = old.get("chunk") if old else None
+                    changed = not (old and old["hash"] == digest) or was_duplicate
+                    if not changed:
+                        entry["tokens"] = old["tokens"]
+
+                canonical = seen.get(entry["hash"]) if dedupe else None
+                if canonical is not None:
+                    entry.update(duplicate_of=canonical, tokens=0, chunk=None)
+                    window.append((rel_path, entry, None, changed or not was_duplicate))
+                    continue
+
+                seen[entry["hash"]] = rel_path
+                if was_duplicate and text is None:
+                    text, _ = read_source(loader, path)
+                    entry["chunk"] = None
+                    changed = True
+                window.append((rel_path, entry, text, changed))
+                window_bytes += len(text or "")
+            except Exception as e:
+                logger.warning(f"Skipping {path}: {str(e)}")
+                continue
+
+            if pool is None or window_bytes >= TOKEN_WINDOW_BYTES:
+                yield from flush()
+                window = []
+                window_bytes = 0
+        yield from flush()
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def scan_files(loader, project_root, previous_files, options=None, stats=None):
+    """Return the new manifest entries keyed by relative path and the set of paths whose content changed."""
+    entries = {}
+    changed = set()
+    scanned = iter_scanned_files(loader, project_root, previous_files, options, stats)
+    for rel_path, entry, _, is_changed in scanned:
+        entries[rel_path] = entry
+        if is_changed:
+            changed.add(rel_path)
+    for rel_path, entry in entries.items():
+        if "duplicate_of" in entry:
+            entries[entry["duplicate_of"]].setdefault("aliases", []).append(rel_path)
+    return entries, changed
+
+
+class ChunkWriter:
+    """Streams files into chunk-N.txt files, recording each file's position for the chunk index."""
+
+    def __init__(self, loader, output_dir, max_tokens_per_chunk=None, buffer_size=WRITE_BUFFER_BYTES):
+        self.loader = loader
+        self.output_dir = output_dir
+        self.max_tokens_per_chunk = max_tokens_per_chunk
+        self.buffer_size = buffer_size
+        self.chunk_files = []
+        self.index_entries = {}
+        self.index = -1
+        self.tokens = 0
+        self.offset = 0
+        self.line = 1
+        self.file = None
+
+    def _write(self, text):
+        data = text.encode("utf-8")
+        self.file.write(data)
+        self.offset += len(data)
+        self.line += text.count("\n")
+        return len(data)
+
+    def open_chunk(self, index, total=None):
+        self.close_chunk()
+        self.index = index
+        chunk_path = os.path.join(self.output_dir, f"chunk-{index}.txt")
+        self.file = open(chunk_path, "wb", buffering=self.buffer_size)
+        self.offset = 0
+        self.line = 1
+        if index == 0 and self.loader.current_walk_root:
+            self._write(self.loader.tree_generator.prepare_tree_header(self.loader.current_walk_root))
+        title = f"CHUNK {index + 1} OF {total}" if total else f"CHUNK {index + 1}"
+        self._write(f"{'=' * 80}\n{title}\n{'=' * 80}\n\n")
+        self.chunk_files.append(chunk_path)
+
+    def write_file(self, path, text, tokens, aliases=(), rel_path=None):
+        self._write(f"{'=' * 40}\nFile: {path}\n")
+        if aliases:
+            self._write(f"Identical copies: {', '.join(aliases)}\n")
+        self._write(f"{'=' * 40}\n")
+        offset, line = self.offset, self.line
+        length = self._write(text)
+        self.index_entries[rel_path or path] = {
+            "chunk": os.path.basename(self.chunk_files[-1]),
+            "offset": offset,
+            "length": length,
+            "line": line,
+            "lines": self.line - line + (1 if text and not text.endswith("\n") else 0)
+        }
+        self._write("\n\n")
+        self.tokens += tokens
+
+    def add(self, path, text, tokens, rel_path=None):
+        """Append one file, rolling over to a new chunk when it would overflow the token budget."""
+        if self.file is None or (self.tokens and self.tokens + tokens > self.max_tokens_per_chunk):
+            self.open_chunk(self.index + 1)
+        self.write_file(path, text, tokens, rel_path=rel_path)
+
+    def write_duplicates(self, duplicates):
+        """List (alias, original) pairs whose contents were folded into the original."""
+        if self.file is None or not duplicates:
+            return
+        self._write(f"{'=' * 40}\nIDENTICAL COPIES (contents omitted)\n{'=' * 40}\n")
+        for alias, original in duplicates:
+            self._write(f"{alias} -> {original}\n")
+        self._write("\n")
+
+    def close_chunk(self):
+        if self.file is not None:
+            self.file.close()
+            logger.info(f"Wrote {self.chunk_files[-1]} with approximately {self.tokens} tokens")
+            self.file = None
+            self.tokens = 0
+
+    def close(self):
+        self.close_chunk()
+        return self.chunk_files
+
+
+def assign_chunks(entries, num_chunks, max_tokens_per_chunk, changed):
+    """First-fit-decreasing placement of changed and new entries, keeping every other assignment in place."""
+    chunk_tokens = [0] * num_chunks
+    pending = []
+    for rel_path, entry in entries.items():
+        if "duplicate_of" in entry:
+            continue
+        if rel_path in changed or entry["chunk"] is None or entry["chunk"] >= num_chunks:
+            pending.append(rel_path)
+        else:
+            chunk_tokens[entry["chunk"]] += entry["tokens"]
+
+    def fits(index, tokens):
+        return chunk_tokens[index] == 0 or chunk_tokens[index] + tokens <= max_tokens_per_chunk
+
+    for rel_path in sorted(pending, key=lambda p: (-entries[p]["tokens"], p)):
+        entry = entries[rel_path]
+        idx = entry["chunk"]
+        if idx is None or idx >= len(chunk_tokens) or not fits(idx, entry["tokens"]):
+            idx = next((i for i in range(len(chunk_tokens)) if fits(i, entry["tokens"])), None)
+        if idx is None:
+            chunk_tokens.append(0)
+            idx = len(chunk_tokens) - 1
+        entry["chunk"] = idx
+        chunk_tokens[idx] += entry["tokens"]
+    return max(1, len(chunk_tokens))
+
+
+def log_packing(total_tokens, num_chunks, max_tokens_per_chunk):
+    fill_ratio = total_tokens / (num_chunks * max_tokens_per_chunk) if num_chunks else 0.0
+    logger.info(
+        f"Packed {total_tokens} tokens into {num_chunks} chunks "
+        f"(fill ratio {fill_ratio:.1%} of {max_tokens_per_chunk} tokens per chunk)"
+    )
+
+
+def write_assigned_chunks(loader, project_root, output_dir, entries, num_chunks, indices):
+    """Stream the files assigned to each chunk in indices into its chunk file, one file at a time."""
+    members = [[] for _ in range(num_chunks)]
+    for rel_path in sorted(entries):
+        if "duplicate_of" not in entries[rel_path]:
+            members[entries[rel_path]["chunk"]].append(rel_path)
+
+    writer = ChunkWriter(loader, output_dir)
+    for index in sorted(indices):
+        chunk_path = os.path.join(output_dir, f"chunk-{index}.txt")
+        if not members[index]:
+            if os.path.exists(chunk_path):
+                os.remove(chunk_path)
+            continue
+        writer.open_chunk(index, num_chunks)
+        for rel_path in members[index]:
+            path = os.path.join(project_root, rel_path)
+            entry = entries[rel_path]
+            text, digest = read_source(loader, path)
+            text = text or ""
+            if digest != entry["hash"]:
+                logger.warning(f"{rel_path} changed while chunking; writing its current content")
+                entry["tokens"] = loader.count_tokens(text)
+                if digest is not None:
+                    entry["hash"] = digest
+            aliases = [os.path.join(project_root, alias) for alias in entry.get("aliases", [])]
+            writer.write_file(path, text, entry["tokens"], aliases, rel_path)
+    writer.close()
+    return members, writer.index_entries
+
+
+def duplicate_pairs(entries):
+    return [(rel_path, entry["duplicate_of"]) for rel_path, entry in entries.items() if "duplicate_of" in entry]
+
+
+def index_with_aliases(located, aliases):
+    """Add an entry for every (alias, original) pair pointing at the content of its original."""
+    files = dict(located)
+    for alias, original in aliases:
+        if original in located:
+            files[alias] = {**located[original], "duplicate_of": original}
+    return files
+
+
+def remove_stale_chunks(output_dir, chunk_files):
+    """Delete every chunk-*.txt in output_dir that is not one of chunk_files, such as those of an older plan."""
+    keep = {os.path.basename(path) for path in chunk_files}
+    for name in os.listdir(output_dir):
+        if name.startswith("chunk-") and name.endswith(".txt") and name not in keep:
+            os.remove(os.path.join(output_dir, name))
+
+
+def chunk_incrementally(loader, project_root, output_dir, settings, max_tokens_per_chunk, options=None, stats=None):
+    """Rebuild only the chunks touched by files that were added, changed or removed since the last run."""
+    manifest = load_manifest(output_dir, settings)
+    previous_files = manifest["files"] if manifest else {}
+    previous_num_chunks = manifest["num_chunks"] if manifest else 0
+
+    entries, changed = scan_files(loader, project_root, previous_files, options, stats)
+    removed = set(previous_files) - set(entries)
+
+    dirty = set()
+    for rel_path in changed:
+        old = previous_files.get(rel_path)
+        if old:
+            dirty.add(old["chunk"])
+    for rel_path in removed:
+        dirty.add(previous_files[rel_path]["chunk"])
+    if removed or set(entries) - set(previous_files):
+        dirty.add(0)
+
+    num_chunks = assign_chunks(entries, previous_num_chunks, max_tokens_per_chunk, changed)
+    for rel_path in changed:
+        dirty.add(entries[rel_path]["chunk"])
+    for rel_path, entry in entries.items():
+        if entry.get("aliases", []) != previous_files.get(rel_path, {}).get("aliases", []):
+            dirty.add(entry["chunk"])
+    if num_chunks != previous_num_chunks:
+        dirty = set(range(num_chunks))
+    dirty = {i for i in dirty if i is not None and i < num_chunks}
+
+    members, located = write_assigned_chunks(loader, project_root, output_dir, entries, num_chunks, dirty)
+    chunk_files = [os.path.join(output_dir, f"chunk-{i}.txt") for i in range(num_chunks) if members[i]]
+    remove_stale_chunks(output_dir, chunk_files)
+
+    save_manifest(output_dir, settings, num_chunks, entries)
+    rewritten = {f"chunk-{i}.txt" for i in dirty}
+    current = {f"chunk-{i}.txt" for i in range(num_chunks)}
+    for rel_path, location in (load_chunk_index(output_dir) or {}).items():
+        entry = entries.get(rel_path)
+        if (entry and "duplicate_of" not in entry and "duplicate_of" not in location
+                and location["chunk"] in current and location["chunk"] not in rewritten):
+            located.setdefault(rel_path, location)
+    save_chunk_index(output_dir, index_with_aliases(located, duplicate_pairs(entries)))
+    logger.info(
+        f"Incremental chunking: {len(changed)} changed, {len(removed)} removed, "
+        f"{len(dirty)}/{num_chunks} chunks rewritten"
+    )
+    log_packing(sum(entry["tokens"] for entry in entries.values()), num_chunks, max_tokens_per_chunk)
+    return chunk_files
+
+
+def chunk_packed(loader, project_root, output_dir, max_tokens_per_chunk, options=None, stats=None):
+    """Count every file once, bin-pack whole files first-fit-decreasing, then stream the chunks out."""
+    entries, changed = scan_files(loader, project_root, {}, options, stats)
+    num_chunks = assign_chunks(entries, 0, max_tokens_per_chunk, changed)
+    members, located = write_assigned_chunks(loader, project_root, output_dir, entries, num_chunks, range(num_chunks))
+    save_chunk_index(output_dir, index_with_aliases(located, duplicate_pairs(entries)))
+    log_packing(sum(entry["tokens"] for entry in entries.values()), num_chunks, max_tokens_per_chunk)
+    return [os.path.join(output_dir, f"chunk-{i}.txt") for i in range(num_chunks) if members[i]]
+
+
+def chunk_streaming(loader, project_root, output_dir, max_tokens_per_chunk, options=None, stats=None):
+    """Read, count and write one file at a time, starting a new chunk whenever the budget is reached."""
+    writer = ChunkWriter(loader, output_dir, max_tokens_per_chunk)
+    total_tokens = 0
+    duplicates = []
+    try:
+        scanned = iter_scanned_files(loader, project_root, {}, options, stats)
+        for rel_path, entry, text, _ in scanned:
+            if "duplicate_of" in entry:
+                duplicates.append((rel_path, entry["duplicate_of"]))
+                continue
+            writer.add(os.path.join(project_root, rel_path), text, entry["tokens"], rel_path)
+            total_tokens += entry["tokens"]
+        writer.write_duplicates([
+            (os.path.join(project_root, alias), os.path.join(project_root, original))
+            for alias, original in duplicates
+        ])
+    finally:
+        chunk_files = writer.close()
+    save_chunk_index(output_dir, index_with_aliases(writer.index_entries, duplicates))
+    log_packing(total_tokens, len(chunk_files), max_tokens_per_chunk)
+    return chunk_files
+
+
 def chunk_project(project_root, output_dir="chunks", config=None):
     if config is None:
         config = {
@@ -16,8 +734,12 @@ def chunk_project(project_root, output_dir="chunks", config=None):
     
     max_tokens_per_chunk = config.get("max_tokens_per_chunk", 80000)
     allowed_extensions = config.get("allowed_extensions", [".py", ".md", ".txt", ".json", ".toml"])
+    incremental = config.get("incremental", False)
+    packing = config.get("packing", "ffd")
+    options = ScanOptions.from_config(config)
+    skip_paths = config.get("skip_paths", [])
     
-    if os.path.exists(output_dir):
+    if os.path.exists(output_dir) and not incremental:
         shutil.rmtree(output_dir)
     os.makedirs(output_dir, exist_ok=True)
     
@@ -25,6 +747,7 @@ def chunk_project(project_root, output_dir="chunks", config=None):
         ignore_patterns = [
             "**/chunks/**",
             "**/.git/**",
+            "**/.docdog/**",
             "**/__pycache__/**",
             "**/venv/**",
             "**/.venv/**",
@@ -36,59 +759,37 @@ def chunk_project(project_root, output_dir="chunks", config=None):
             "**/*.gif",
             "**/*.pyc",
             "**/*.pyo",
-            "**/*.env"
+            "**/*.env",
+            *skip_paths
         ]
         
         try:
             logger.info("Using TokenBasedChunker...")
-            
-            temp_dir = os.path.join(output_dir, "temp")
+            stats = ScanStats()
 
-            try:
-                if not os.path.exists(output_dir):
-                    os.makedirs(output_dir, exist_ok=True)
-                os.makedirs(temp_dir, exist_ok=True)
-            except Exception as temp_dir_error:
-                logger.error(f"Error creating temp directory: {temp_dir_error}")
-                raise
-                        
-            analyzer = TokenBasedChunker(
-                equal_chunks=1, 
-                output_dir=temp_dir,
-                user_ignore=ignore_patterns,
-                user_unignore=[f"*{ext}" for ext in allowed_extensions],
-                verbose=True
-            )
-            
-            analyzer.process_directory(project_root)
-            
-            total_tokens = 0
-            for path, content_bytes, _ in analyzer.loaded_files:
-                try:
-                    text = content_bytes.decode("utf-8", errors="replace")
-                    total_tokens += analyzer.count_tokens(text)
-                except:
-                    pass
-            
-            num_chunks = max(1, (total_tokens + max_tokens_per_chunk - 1) // max_tokens_per_chunk)
-            logger.info(f"Estimated {total_tokens} total tokens across all files")
-            logger.info(f"Creating {num_chunks} chunks with approximately {max_tokens_per_chunk} tokens each")
-            
-            shutil.rmtree(temp_dir)
-            
-            chunker = TokenBasedChunker(
-                equal_chunks=num_chunks,
+            loader = ProjectLoader(
+                equal_chunks=1,
                 output_dir=output_dir,
                 user_ignore=ignore_patterns,
                 user_unignore=[f"*{ext}" for ext in allowed_extensions],
-                verbose=True
+                verbose=True,
+                skip_paths=skip_paths
             )
-            
-            chunker.process_directory(project_root)
-            
-            chunk_files = [f for f in os.listdir(output_dir) if f.startswith("chunk-") and f.endswith(".txt")]
-            chunk_files = [os.path.join(output_dir, f) for f in chunk_files]
-            chunk_files.sort()
+
+            if incremental:
+                settings = {
+                    "max_tokens_per_chunk": max_tokens_per_chunk,
+                    "allowed_extensions": sorted(allowed_extensions),
+                    **options.settings()
+                }
+                chunk_files = chunk_incrementally(
+                    loader, project_root, output_dir, settings, max_tokens_per_chunk, options, stats
+                )
+            elif packing == "stream":
+                chunk_files = chunk_streaming(loader, project_root, output_dir, max_tokens_per_chunk, options, stats)
+            else:
+                chunk_files = chunk_packed(loader, project_root, output_dir, max_tokens_per_chunk, options, stats)
+            stats.log_summary()
             
             logger.info(f"Created {len(chunk_files)} chunk files")
             return chunk_files
@@ -118,4 +819,4 @@ def chunk_project(project_root, output_dir="chunks", config=None):
                 logger.error(f"ParallelChunker also failed: {str(e)}")
                 return []
     
-    return []
\ No newline at end of file
+    return []
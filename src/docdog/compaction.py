@@ -0,0 +1,115 @@
+import os
+import re
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COMPACT_THRESHOLD = 150000
+CHARS_PER_TOKEN = 3.6
+MAX_SUMMARY_NAMES = 12
+COMPACTED_MARKER = "[Compacted:"
+FILE_SEPARATOR = "=" * 40
+DEFINITION = re.compile(r"(?:export\s+(?:default\s+)?)?(?:async\s+)?(?:def|class|function)\s+([A-Za-z_$][\w$]*)")
+
+
+def estimate_tokens(messages):
+    """Rough token count of a conversation from its character count."""
+    chars = 0
+    for message in messages:
+        content = message["content"]
+        if isinstance(content, str):
+            chars += len(content)
+            continue
+        for block in content:
+            for key in ("text", "content"):
+                if isinstance(block.get(key), str):
+                    chars += len(block[key])
+            if "input" in block:
+                chars += len(json.dumps(block["input"]))
+    return int(chars / CHARS_PER_TOKEN)
+
+
+def summarize_chunk(chunk_name, text):
+    """Extractive summary of a chunk: each packed file with its line count and top-level names."""
+    files = []
+    lines = text.split("\n")
+    for i, line in enumerate(lines):
+        if line.startswith("File: ") and i > 0 and lines[i - 1] == FILE_SEPARATOR:
+            files.append([line[len("File: "):], 0, [], i + 2])
+        elif files and i >= files[-1][3] and line != FILE_SEPARATOR:
+            if line.strip():
+                files[-1][1] = i - files[-1][3] + 1
+            match = DEFINITION.match(line)
+            if match:
+                files[-1][2].append(match.group(1))
+
+    out = [
+        f"{COMPACTED_MARKER} {chunk_name} was already analyzed; its content is replaced by this summary. "
+        f"Use read_chunk with a file_path to read a file again.]"
+    ]
+    for path, line_count, names, _ in files:
+        shown = ", ".join(names[:MAX_SUMMARY_NAMES])
+        if len(names) > MAX_SUMMARY_NAMES:
+            shown += f", ... ({len(names) - MAX_SUMMARY_NAMES} more)"
+        out.append(f"- {path} ({line_count} lines){': ' + shown if shown else ''}")
+    return "\n".join(out)
+
+
+def _compacted_batch(content, analyzed_chunks):
+    try:
+        items = json.loads(content)
+    except ValueError:
+        return None
+    changed = False
+    for item in items:
+        chunk_name = os.path.basename(item.get("file", ""))
+        if chunk_name in analyzed_chunks and "content" in item and not item.get("compacted"):
+            item["content"] = summarize_chunk(chunk_name, item["content"])
+            item["compacted"] = True
+            changed = True
+    return json.dumps(items) if changed else None
+
+
+def _compacted_result(tool_use, content, analyzed_chunks):
+    """The compacted form of one tool_result's content, or None if it does not hold an analyzed chunk."""
+    if not isinstance(content, str) or content.startswith(COMPACTED_MARKER):
+        return None
+    if tool_use["name"] in ("read_file", "read_file_range"):
+        chunk_name = os.path.basename(tool_use["input"].get("file_path", ""))
+        if chunk_name in analyzed_chunks:
+            return summarize_chunk(chunk_name, content)
+    elif tool_use["name"] == "batch_read_files":
+        return _compacted_batch(content, analyzed_chunks)
+    return None
+
+
+def compact_messages(messages, analyzed_chunks, threshold=DEFAULT_COMPACT_THRESHOLD):
+    """Summarize chunk contents the model has already answered once past threshold; return tokens saved."""
+    if not threshold:
+        return 0
+    last_answered = max((i for i, message in enumerate(messages) if message["role"] == "assistant"), default=-1)
+    tool_uses = {}
+    candidates = []
+    for message in messages[:last_answered]:
+        if isinstance(message["content"], str):
+            continue
+        for block in message["content"]:
+            if block.get("type") == "tool_use":
+                tool_uses[block["id"]] = block
+            elif block.get("type") == "tool_result" and block.get("tool_use_id") in tool_uses:
+                candidates.append(block)
+    if not candidates:
+        return 0
+
+    before = estimate_tokens(messages)
+    if before <= threshold:
+        return 0
+    for block in candidates:
+        compacted = _compacted_result(tool_uses[block["tool_use_id"]], block["content"], analyzed_chunks)
+        if compacted is not None and len(compacted) < len(block["content"]):
+            block["content"] = compacted
+    saved = before - estimate_tokens(messages)
+    if saved:
+        logger.info(f"Compacted consumed chunk contents: {before} -> {before - saved} estimated tokens")
+    return saved
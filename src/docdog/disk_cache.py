@@ -0,0 +1,97 @@
+import os
+import time
+import hashlib
+import logging
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.path.join(".docdog", "cache")
+CACHE_VERSION = 1
+DEFAULT_DISK_CACHE_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_AGE_DAYS = 30
+
+
+def content_hash(content):
+    """sha256 of a file's content, str or bytes."""
+    if isinstance(content, str):
+        content = content.encode("utf-8", errors="surrogatepass")
+    return hashlib.sha256(content).hexdigest()
+
+
+class DiskCache:
+    """
+    Content-addressed store of processed tool output shared across runs.
+
+    Entries live in cache_dir as files named by the sha256 of (kind, path, content hash), so
+    an entry is found again only while the file it was computed from is byte-identical. A hit
+    refreshes the entry's mtime, which prune() uses to drop entries unused for max_age_days
+    and then the least recently used ones until the store fits in max_bytes.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_DISK_CACHE_BYTES, max_age_days=DEFAULT_MAX_AGE_DAYS):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, kind, rel_path, digest):
+        raw = f"{CACHE_VERSION}\0{kind}\0{rel_path.replace(os.sep, '/')}\0{digest}"
+        return hashlib.sha256(raw.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = f.read()
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(value)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write disk cache entry {path}: {str(e)}")
+
+    def prune(self):
+        """Delete entries older than max_age_days, then the oldest until under max_bytes. Returns (files, bytes) removed."""
+        entries = []
+        for dirpath, _, filenames in os.walk(self.cache_dir):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+
+        cutoff = time.time() - self.max_age_days * 86400 if self.max_age_days is not None else None
+        total = sum(size for _, size, _ in entries)
+        removed_files = removed_bytes = 0
+        for mtime, size, path in sorted(entries):
+            expired = cutoff is not None and mtime < cutoff
+            if not expired and (self.max_bytes is None or total <= self.max_bytes):
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed_files += 1
+            removed_bytes += size
+        if removed_files:
+            logger.info(f"Pruned {removed_files} disk cache entries ({removed_bytes} bytes), {total} bytes remain")
+        return removed_files, removed_bytes
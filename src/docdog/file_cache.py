@@ -0,0 +1,94 @@
+import os
+import sys
+import threading
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "invalidations", "maxsize", "currsize", "max_bytes", "bytes"])
+
+
+def stat_signature(path):
+    """Return (mtime_ns, size, inode) for path, or None if it cannot be stat'ed."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+class StatValidatedCache:
+    """
+    Cache for functions of one path argument that re-checks os.stat on every hit.
+
+    Each entry remembers the (mtime_ns, size, inode) of its path when it was computed. A hit
+    whose path has since changed is dropped and recomputed, so only changed entries are
+    refreshed instead of clearing the whole cache. path_of maps the argument to the path on
+    disk. Like functools.lru_cache it offers cache_info() and cache_clear().
+
+    The cache is bounded by max_bytes of cached values (measured with sys.getsizeof) and
+    optionally by maxsize entries. Eviction is GreedyDual-Size: an entry's priority is the
+    cache's inflation value at its last use plus 1/size, the lowest priority is evicted
+    first and becomes the new inflation value. Large entries therefore leave before small
+    ones of the same age, and entries of any size age out once they go unused.
+    """
+
+    def __init__(self, func, path_of, maxsize=128, max_bytes=None):
+        self.func = func
+        self.path_of = path_of
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.bytes = 0
+        self._inflation = 0.0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, key):
+        signature = stat_signature(self.path_of(key))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == signature:
+                    entry[3] = self._inflation + 1.0 / entry[2]
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                self._remove(key)
+                self.invalidations += 1
+            self.misses += 1
+
+        value = self.func(key)
+        size = max(1, sys.getsizeof(value))
+        with self._lock:
+            if self.max_bytes is not None and size > self.max_bytes:
+                return value
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = [signature, value, size, self._inflation + 1.0 / size]
+            self.bytes += size
+            while self._over_budget():
+                victim = min(self._entries, key=lambda k: self._entries[k][3])
+                self._inflation = self._entries[victim][3]
+                self._remove(victim)
+        return value
+
+    def _over_budget(self):
+        if self.maxsize is not None and len(self._entries) > self.maxsize:
+            return True
+        return self.max_bytes is not None and self.bytes > self.max_bytes
+
+    def _remove(self, key):
+        self.bytes -= self._entries.pop(key)[2]
+
+    def cache_info(self):
+        with self._lock:
+            return CacheInfo(
+                self.hits, self.misses, self.invalidations, self.maxsize, len(self._entries), self.max_bytes, self.bytes
+            )
+
+    def cache_clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.invalidations = self.bytes = 0
+            self._inflation = 0.0
@@ -1,5 +1,6 @@
 import os
 import sys
+import asyncio
 import argparse
 import logging
 import anthropic
@@ -10,19 +11,27 @@ from docdog.chunking import chunk_project
 from docdog.utils.sanitize_prompt import sanitize_prompt
 from colorama import init
 from docdog.p1_analysis_helper import analyze_project
+from docdog.p1_map_reduce import map_reduce_analysis_async, DEFAULT_SUMMARY_WORKERS
+from docdog.rate_limit import RateScheduler, ScheduledClient, DEFAULT_REQUESTS_PER_MINUTE, DEFAULT_TOKENS_PER_MINUTE
 from docdog.p2_readme_generator import generate_readme
 from docdog.p3_validate_readme import validate_readme
 from docdog.p4_save_readme import save_readme_files
 from docdog.find_proj_root import find_project_root
+from docdog.checkpoint import CHECKPOINT_PATH, chunk_hashes, load_checkpoint, remove_checkpoint
+from docdog.compaction import DEFAULT_COMPACT_THRESHOLD
+from docdog.retry import DEFAULT_MAX_RETRIES
+from docdog.disk_cache import DiskCache, CACHE_DIR, DEFAULT_DISK_CACHE_BYTES, DEFAULT_MAX_AGE_DAYS
 
 load_dotenv()
 init(autoreset=True)
 
+LOG_FILE = "docdog_complete_log.txt"
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s [%(levelname)s] %(message)s',
     handlers=[
-        logging.FileHandler("docdog_complete_log.txt", mode='w'),
+        logging.FileHandler(LOG_FILE, mode='w'),
         logging.StreamHandler()
     ]
 )
@@ -69,18 +78,84 @@ def main():
     parser.add_argument("--max-iterations", type=int, default=15)
     parser.add_argument("--workers", "-w", type=int, default=None, 
                         help="Number of worker threads (default: auto)")
-    parser.add_argument("--cache-size", type=int, default=128, 
-                    help="Size of the LRU cache (default: 128)")
+    parser.add_argument("--cache-size", type=int, default=None,
+                    help="Also cap each tool cache at this many entries (default: no cap, --cache-bytes bounds it)")
+    parser.add_argument("--cache-bytes", type=int, default=64 * 1024 * 1024,
+                        help="Memory budget in bytes for each tool cache (default: 67108864)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only rebuild chunks whose files changed since the last run")
+    parser.add_argument("--chunk-workers", type=int, default=1,
+                        help="Number of processes used to count tokens while chunking (default: 1)")
+    parser.add_argument("--packing", choices=["ffd", "stream"], default="ffd",
+                        help="Chunk packing strategy: first-fit-decreasing or single-pass streaming (default: ffd)")
+    parser.add_argument("--enumeration", choices=["git", "gitignore", "walk"], default="git",
+                        help="How project files are found: git index, .gitignore rules or a plain walk (default: git)")
+    parser.add_argument("--max-file-bytes", type=int, default=1024 * 1024,
+                        help="Skip files larger than this many bytes while chunking, 0 for no limit (default: 1048576)")
+    parser.add_argument("--max-file-bytes-ext", action="append", default=[], metavar="EXT=BYTES",
+                        help="Size cap for one extension, e.g. .csv=65536; may be repeated")
+    parser.add_argument("--token-counting", choices=["exact", "estimate"], default="exact",
+                        help="Count chunk tokens with the tokenizer or estimate them from file sizes (default: exact)")
+    parser.add_argument("--estimate-sample", type=float, default=0.0,
+                        help="Fraction of files counted exactly to correct the estimates (default: 0)")
+    parser.add_argument("--disk-cache", action="store_true",
+                        help="Reuse processed file contents across runs from .docdog/cache")
+    parser.add_argument("--disk-cache-bytes", type=int, default=DEFAULT_DISK_CACHE_BYTES,
+                        help=f"Prune the disk cache down to this many bytes (default: {DEFAULT_DISK_CACHE_BYTES})")
+    parser.add_argument("--disk-cache-days", type=int, default=DEFAULT_MAX_AGE_DAYS,
+                        help=f"Prune disk cache entries unused for this many days (default: {DEFAULT_MAX_AGE_DAYS})")
+    parser.add_argument("--compact-threshold", type=int, default=DEFAULT_COMPACT_THRESHOLD,
+                        help="Summarize chunk contents Claude has already analyzed once the conversation passes "
+                             f"this many estimated tokens, 0 to never compact (default: {DEFAULT_COMPACT_THRESHOLD})")
+    parser.add_argument("--mode", choices=["agent", "map-reduce"], default="agent",
+                        help="Phase 1 strategy: one tool-using agent loop, or one concurrent summary request per "
+                             "chunk followed by a synthesis request (default: agent)")
+    parser.add_argument("--summary-workers", type=int, default=DEFAULT_SUMMARY_WORKERS,
+                        help=f"Concurrent chunk summary requests in map-reduce mode (default: {DEFAULT_SUMMARY_WORKERS})")
+    parser.add_argument("--rpm", type=int, default=DEFAULT_REQUESTS_PER_MINUTE,
+                        help="Requests per minute allowed to the API in map-reduce mode, 0 for no limit "
+                             f"(default: {DEFAULT_REQUESTS_PER_MINUTE})")
+    parser.add_argument("--tpm", type=int, default=DEFAULT_TOKENS_PER_MINUTE,
+                        help="Input plus output tokens per minute allowed to the API in map-reduce mode, 0 for no limit "
+                             f"(default: {DEFAULT_TOKENS_PER_MINUTE})")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue the analysis from the checkpoint of an interrupted run (.docdog/checkpoint.json); "
+                             "agent mode only")
+    parser.add_argument("--max-retries", type=int, default=DEFAULT_MAX_RETRIES,
+                        help=f"Retries of a transient API error during analysis, with jittered exponential backoff "
+                             f"(default: {DEFAULT_MAX_RETRIES})")
     args = parser.parse_args()
+    if args.resume and args.mode == "map-reduce":
+        parser.error("--resume needs --mode agent; map-reduce mode keeps no checkpoint")
+
+    size_caps = {}
+    for value in args.max_file_bytes_ext:
+        ext, _, size = value.partition("=")
+        if not ext or not size.isdigit():
+            parser.error(f"--max-file-bytes-ext expects EXT=BYTES, got {value!r}")
+        size_caps["." + ext.lower().lstrip(".")] = int(size)
 
     project_root = find_project_root()
     logger.info(f"Project root: {project_root}")
 
     chunks_dir = os.path.join(project_root, "chunks")
+    output_paths = [
+        os.path.relpath(os.path.abspath(path), project_root).replace(os.sep, "/")
+        for path in (LOG_FILE, "reasoning.md", args.output)
+    ]
     
     chunk_config = {
         "num_chunks": 5,
-        "allowed_extensions": [".py", ".md", ".txt", ".json", ".toml", ".yml", ".yaml", ".js", ".html", ".css", ".sh"]
+        "allowed_extensions": [".py", ".md", ".txt", ".json", ".toml", ".yml", ".yaml", ".js", ".html", ".css", ".sh"],
+        "incremental": args.incremental,
+        "workers": args.chunk_workers,
+        "packing": args.packing,
+        "enumeration": args.enumeration,
+        "max_file_bytes": args.max_file_bytes,
+        "max_file_bytes_by_extension": size_caps,
+        "token_counting": args.token_counting,
+        "estimate_sample": args.estimate_sample,
+        "skip_paths": output_paths
     }
     
     logger.info("Chunking project files...")
@@ -97,7 +172,16 @@ def main():
     seconds = total_estimated_time % 60
     logger.info(f"Estimated time for summarization: approximately {minutes} minutes and {seconds} seconds")
 
-    doc_tools = Tools(project_root=project_root, max_workers=args.workers, cache_size=args.cache_size)
+    disk_cache = None
+    if args.disk_cache:
+        disk_cache = DiskCache(os.path.join(project_root, CACHE_DIR), args.disk_cache_bytes, args.disk_cache_days)
+        disk_cache.prune()
+
+    doc_tools = None
+    if args.mode != "map-reduce":
+        doc_tools = Tools(project_root=project_root, max_workers=args.workers, cache_size=args.cache_size,
+                          cache_bytes=args.cache_bytes, disk_cache=disk_cache)
+        doc_tools.start_symbol_index()
 
     script_dir = os.path.dirname(os.path.abspath(__file__))
     templates_dir = os.path.join(script_dir, "templates")
@@ -128,25 +212,65 @@ def main():
 
     messages = [{"role": "user", "content": sanitize_prompt(initial_prompt)}]
     
-    expected_chunks = []
-    try:
-        if os.path.exists(chunks_dir):
-            expected_chunks = [f for f in os.listdir(chunks_dir) if f.startswith("chunk-") and f.endswith(".txt")]
-    except Exception as e:
-        logger.error(f"Error listing chunk files: {str(e)}")
+    expected_chunks = [os.path.basename(chunk_file) for chunk_file in chunk_files]
     
     logger.info(f"Found {len(expected_chunks)} chunk files to analyze")
     
     logger.info("===== PHASE 1: Project Analysis =====")
-    messages, analyzed_chunks, analysis_iteration = analyze_project(
-        client=client,
-        model=args.model,
-        messages=messages,
-        tools=use_tools,
-        doc_tools=doc_tools,
-        expected_chunks=expected_chunks,
-        max_iterations=args.max_iterations
-    )
+    if args.mode == "map-reduce":
+        summary_prompt_path = os.path.join(templates_dir, "chunk_summary_prompt.txt")
+        if not os.path.exists(summary_prompt_path):
+            logger.error(f"Chunk summary prompt template not found at {summary_prompt_path}")
+            sys.exit(1)
+        with open(summary_prompt_path, "r") as f:
+            summary_prompt = sanitize_prompt(f.read())
+        scheduler = RateScheduler(requests_per_minute=args.rpm, tokens_per_minute=args.tpm)
+        async_client = ScheduledClient(anthropic.AsyncAnthropic(api_key=api_key), scheduler)
+        messages, analyzed_chunks, analysis_iteration = asyncio.run(map_reduce_analysis_async(
+            client=async_client,
+            model=args.model,
+            messages=messages,
+            chunks_dir=chunks_dir,
+            expected_chunks=expected_chunks,
+            summary_prompt=summary_prompt,
+            max_concurrency=args.summary_workers,
+            max_retries=args.max_retries
+        ))
+        logger.info(f"Rate scheduler admitted {scheduler.admitted} requests, waiting {scheduler.waited:.1f}s in total")
+    else:
+        checkpoint_path = os.path.join(project_root, CHECKPOINT_PATH)
+        analyzed_chunks, analysis_iteration = set(), 0
+        try:
+            checkpoint_chunks = chunk_hashes(chunks_dir, expected_chunks)
+        except Exception as e:
+            logger.error(f"Error hashing chunk files, so no checkpoint is kept: {str(e)}")
+            checkpoint_path, checkpoint_chunks = None, None
+        if args.resume and checkpoint_path:
+            checkpoint = load_checkpoint(checkpoint_path, checkpoint_chunks)
+            if checkpoint:
+                messages, analyzed_chunks, analysis_iteration = checkpoint
+                logger.info(f"Resuming analysis after iteration {analysis_iteration} with "
+                            f"{len(analyzed_chunks)}/{len(expected_chunks)} chunks analyzed")
+            else:
+                logger.info("No usable checkpoint found; starting the analysis from the beginning")
+        messages, analyzed_chunks, analysis_iteration = analyze_project(
+            client=client,
+            model=args.model,
+            messages=messages,
+            tools=use_tools,
+            doc_tools=doc_tools,
+            expected_chunks=expected_chunks,
+            max_iterations=args.max_iterations,
+            compact_threshold=args.compact_threshold,
+            analyzed_chunks=analyzed_chunks,
+            analysis_iteration=analysis_iteration,
+            checkpoint_path=checkpoint_path,
+            max_retries=args.max_retries,
+            chunk_hashes=checkpoint_chunks
+        )
+        
+        logger.info(f"Tool cache stats: {doc_tools.cache_stats()}")
+        doc_tools.close()
     
     logger.info("===== PHASE 2: README Generation =====")
     readme_content, reasoning_content, full_text = generate_readme(
@@ -178,6 +302,8 @@ def main():
     expected_chunks=expected_chunks,
     analysis_iteration=analysis_iteration
 )
+    if args.mode != "map-reduce" and checkpoint_path and len(analyzed_chunks) == len(expected_chunks):
+        remove_checkpoint(checkpoint_path)
     logger.info("DocDog execution completed")
 
 if __name__ == "__main__":
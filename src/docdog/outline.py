@@ -0,0 +1,69 @@
+import ast
+
+OUTLINE_DOCSTRING_LINES = 8
+OUTLINE_VALUE_CHARS = 80
+
+
+def _docstring_lines(node, indent):
+    docstring = ast.get_docstring(node, clean=True)
+    if not docstring:
+        return []
+    lines = docstring.splitlines()
+    if len(lines) > OUTLINE_DOCSTRING_LINES:
+        lines = lines[:OUTLINE_DOCSTRING_LINES] + ["..."]
+    if len(lines) == 1:
+        return [f'{indent}"""{lines[0]}"""']
+    return [f'{indent}"""{lines[0]}'] + [f"{indent}{line}" if line else "" for line in lines[1:]] + [f'{indent}"""']
+
+
+def function_signature(node):
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+    return f"{prefix} {node.name}({ast.unparse(node.args)}){returns}:"
+
+
+def class_header(node):
+    bases = [ast.unparse(base) for base in node.bases] + [ast.unparse(kw) for kw in node.keywords]
+    return f"class {node.name}({', '.join(bases)}):" if bases else f"class {node.name}:"
+
+
+def _is_constant_target(target):
+    return isinstance(target, ast.Name) and target.id.isupper()
+
+
+def _short(source):
+    source = " ".join(source.split())
+    return source if len(source) <= OUTLINE_VALUE_CHARS else source[:OUTLINE_VALUE_CHARS - 3] + "..."
+
+
+def _outline_body(body, indent, out):
+    for node in body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            for decorator in node.decorator_list:
+                out.append(f"{indent}@{_short(ast.unparse(decorator))}")
+            header = class_header(node) if isinstance(node, ast.ClassDef) else function_signature(node)
+            first_line = node.decorator_list[0].lineno if node.decorator_list else node.lineno
+            out.append(f"{indent}{header}  # lines {first_line}-{node.end_lineno}")
+            out.extend(_docstring_lines(node, indent + "    "))
+            if isinstance(node, ast.ClassDef):
+                _outline_body(node.body, indent + "    ", out)
+        elif not indent and isinstance(node, (ast.Import, ast.ImportFrom)):
+            out.append(ast.unparse(node))
+        elif isinstance(node, ast.Assign) and all(_is_constant_target(t) for t in node.targets):
+            out.append(f"{indent}{_short(ast.unparse(node))}")
+        elif isinstance(node, ast.AnnAssign) and _is_constant_target(node.target):
+            out.append(f"{indent}{_short(ast.unparse(node))}")
+
+
+def python_outline(source):
+    """
+    Outline of a Python module: its docstring, imports, UPPER_CASE constants, and class and
+    function signatures with decorators, docstrings (first lines) and line ranges.
+
+    One pass over the module and class bodies; function bodies are never visited, so nested
+    helpers are left out. Raises SyntaxError for unparsable source.
+    """
+    tree = ast.parse(source)
+    out = _docstring_lines(tree, "")
+    _outline_body(tree.body, "", out)
+    return "\n".join(out)
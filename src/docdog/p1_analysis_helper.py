@@ -1,23 +1,135 @@
 import os
+import re
+import json
+import time
 import logging
 import traceback
+import concurrent.futures
+from docdog.checkpoint import save_checkpoint
+from docdog.compaction import DEFAULT_COMPACT_THRESHOLD, compact_messages
+from docdog.prompt_cache import cached_tools, describe_usage, input_usage, with_cache_breakpoints
+from docdog.retry import DEFAULT_MAX_RETRIES, call_with_retries
 
 logger = logging.getLogger(__name__)
 
-def analyze_project(client, model, messages, tools, doc_tools, expected_chunks, max_iterations):
+MAX_PARALLEL_TOOL_CALLS = 8
+RANGE_WINDOW = re.compile(r"\[.* bytes (\d+)-(\d+) of (\d+)\]$")
 
-    analyzed_chunks = set()
-    analysis_iteration = 0
+
+def _timed_tool_call(doc_tools, tool_name, tool_input):
+    start = time.perf_counter()
+    result = doc_tools.handle_tool_call(tool_name, tool_input)
+    return result, time.perf_counter() - start
+
+
+def run_tool_calls(executor, doc_tools, tool_calls):
+    """
+    Run the tool calls of one turn concurrently and return their tool_result blocks in call order.
+
+    A turn asking for several files takes about as long as its slowest call. Each call's
+    latency is logged, and the turn's wall time next to the sum of those latencies.
+    """
+    start = time.perf_counter()
+    futures = [
+        executor.submit(_timed_tool_call, doc_tools, tool_call.name, tool_call.input) for tool_call in tool_calls
+    ]
+    tool_results_content = []
+    total_latency = 0.0
+    for tool_call, future in zip(tool_calls, futures):
+        result, latency = future.result()
+        total_latency += latency
+        log_preview = result[:100] + "..." if len(result) > 100 else result
+        logger.info(f"Tool {tool_call.name} returned in {latency:.3f}s: {log_preview}")
+        tool_results_content.append({
+            "type": "tool_result",
+            "tool_use_id": tool_call.id,
+            "content": result
+        })
+    if len(tool_calls) > 1:
+        logger.info(
+            f"Ran {len(tool_calls)} tool calls in {time.perf_counter() - start:.3f}s "
+            f"(sum of tool latencies {total_latency:.3f}s)"
+        )
+    return tool_results_content
+
+
+def _covers(windows, size):
+    reached = 0
+    for start, end in sorted(windows):
+        if start > reached:
+            return False
+        reached = max(reached, end)
+    return reached >= size
+
+
+def returned_chunks(tool_name, tool_input, result, expected_chunks, windows=None):
+    """
+    Names of the expected chunks whose whole content a tool result gave the model.
+
+    A read_file counts unless it failed; a batch_read_files counts only the files whose
+    content is in the result, not those it failed on or left behind its cursor. The byte
+    windows read_file_range returns of a chunk are collected in windows, a dict kept across
+    calls, and the chunk counts once they cover all of it.
+    """
+    if not isinstance(result, str):
+        return set()
+    if tool_name == "read_file_range" and windows is not None and "file_path" in tool_input:
+        chunk_name = os.path.basename(tool_input["file_path"])
+        match = RANGE_WINDOW.match(result.split("\n", 1)[0])
+        if chunk_name not in expected_chunks or not match:
+            return set()
+        start, end, size = (int(group) for group in match.groups())
+        chunk_windows = windows.setdefault((chunk_name, size), set())
+        chunk_windows.add((start, end))
+        return {chunk_name} if _covers(chunk_windows, size) else set()
+    if tool_name == "read_file" and "file_path" in tool_input:
+        file_paths = [] if result.startswith("Error") else [tool_input["file_path"]]
+    elif tool_name == "batch_read_files":
+        try:
+            items = json.loads(result)
+        except ValueError:
+            return set()
+        file_paths = [item["file"] for item in items if isinstance(item, dict) and "content" in item]
+    else:
+        return set()
+    return {os.path.basename(path) for path in file_paths} & set(expected_chunks)
+
+
+def analyze_project(client, model, messages, tools, doc_tools, expected_chunks, max_iterations,
+                    compact_threshold=DEFAULT_COMPACT_THRESHOLD, analyzed_chunks=None, analysis_iteration=0,
+                    checkpoint_path=None, max_retries=DEFAULT_MAX_RETRIES, chunk_hashes=None):
+    """
+    Phase 1: let Claude read the chunks through the tools until all are analyzed.
+
+    To resume an interrupted run, pass the messages, analyzed_chunks and analysis_iteration
+    of its checkpoint. With checkpoint_path, that state is saved after every iteration along
+    with chunk_hashes, the checkpoint.chunk_hashes of the chunks, which a resumed run must
+    match; without them only the chunk names are recorded.
+    Transient API errors are retried up to max_retries times before the loop gives up.
+    """
+
+    analyzed_chunks = set(analyzed_chunks or ())
+    range_windows = {}
+    tokens_saved = 0
+    request_tools = cached_tools(tools)
+    usage_totals = [0, 0, 0]
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=MAX_PARALLEL_TOOL_CALLS, thread_name_prefix="docdog-tool-call"
+    )
     
     while len(analyzed_chunks) < len(expected_chunks) and analysis_iteration < max_iterations:
         try:
             logger.info(f"Analysis iteration {analysis_iteration+1}/{max_iterations}")
-            response = client.messages.create(
+            tokens_saved += compact_messages(messages, analyzed_chunks, compact_threshold)
+            response = call_with_retries(lambda: client.messages.create(
                 model=model,
-                messages=messages,
-                tools=tools,
+                messages=with_cache_breakpoints(messages),
+                tools=request_tools,
                 max_tokens=4000
-            )
+            ), max_retries)
+            usage = input_usage(response)
+            logger.info(f"Analysis iteration {analysis_iteration+1} input tokens: {describe_usage(usage)}")
+            usage_totals = [total + count for total, count in zip(usage_totals, usage)]
             
             assistant_content = []
             for content in response.content:
@@ -35,48 +147,41 @@ def analyze_project(client, model, messages, tools, doc_tools, expected_chunks,
             
             tool_calls = [c for c in response.content if c.type == "tool_use"]
             if tool_calls:
-                tool_results_content = []
                 for tool_call in tool_calls:
-                    tool_name = tool_call.name
-                    tool_input = tool_call.input
-                    tool_id = tool_call.id
-                    
-                    if tool_name == "read_file" and "file_path" in tool_input:
-                        file_path = tool_input["file_path"]
-                        chunk_name = os.path.basename(file_path)
-                        if chunk_name in expected_chunks:
-                            analyzed_chunks.add(chunk_name)
-                            logger.info(f"Analyzed chunk: {chunk_name} ({len(analyzed_chunks)}/{len(expected_chunks)})")
-                    elif tool_name == "batch_read_files" and "file_paths" in tool_input:
-                        for file_path in tool_input["file_paths"]:
-                            chunk_name = os.path.basename(file_path)
-                            if chunk_name in expected_chunks:
-                                analyzed_chunks.add(chunk_name)
-                                logger.info(f"Analyzed chunk: {chunk_name} ({len(analyzed_chunks)}/{len(expected_chunks)})")
-                    
-                    logger.info(f"Claude requested tool: {tool_name} with input: {tool_input}")
-                    result = doc_tools.handle_tool_call(tool_name, tool_input)
-                    log_preview = result[:100] + "..." if len(result) > 100 else result
-                    logger.info(f"Tool {tool_name} returned: {log_preview}")
-                    
-                    tool_results_content.append({
-                        "type": "tool_result",
-                        "tool_use_id": tool_id,
-                        "content": result
-                    })
+                    logger.info(f"Claude requested tool: {tool_call.name} with input: {tool_call.input}")
                 
+                tool_results_content = run_tool_calls(executor, doc_tools, tool_calls)
                 messages.append({"role": "user", "content": tool_results_content})
+                for tool_call, tool_result in zip(tool_calls, tool_results_content):
+                    read = returned_chunks(
+                        tool_call.name, tool_call.input, tool_result["content"], expected_chunks, range_windows
+                    )
+                    for chunk_name in sorted(read - analyzed_chunks):
+                        analyzed_chunks.add(chunk_name)
+                        logger.info(f"Analyzed chunk: {chunk_name} ({len(analyzed_chunks)}/{len(expected_chunks)})")
             
             for content in response.content:
                 if content.type == "text" and "Final README:" in content.text:
                     logger.info("Claude prematurely generated a README during analysis. Continuing to ensure all chunks are analyzed.")
             
             analysis_iteration += 1
+            if checkpoint_path:
+                save_checkpoint(
+                    checkpoint_path, messages, analyzed_chunks, analysis_iteration,
+                    chunk_hashes if chunk_hashes is not None else dict.fromkeys(expected_chunks)
+                )
             
         except Exception as e:
             logger.error(f"Error in analysis phase: {str(e)}")
             traceback.print_exc()
+            if checkpoint_path and analysis_iteration:
+                logger.info(f"Run again with --resume to continue from iteration {analysis_iteration + 1}")
             break
+    executor.shutdown(wait=False, cancel_futures=True)
+    tokens_saved += compact_messages(messages, analyzed_chunks, compact_threshold)
+    if tokens_saved:
+        logger.info(f"Compaction removed about {tokens_saved} estimated tokens from the conversation this run")
+    logger.info(f"Analysis input tokens: {describe_usage(usage_totals)}")
     
     if len(analyzed_chunks) < len(expected_chunks):
         logger.warning(f"Analysis incomplete: Only {len(analyzed_chunks)}/{len(expected_chunks)} chunks were analyzed")
@@ -0,0 +1,119 @@
+import os
+import re
+import time
+import asyncio
+import logging
+from docdog.prompt_cache import describe_usage, input_usage
+from docdog.retry import DEFAULT_MAX_RETRIES, call_with_retries_async
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SUMMARY_WORKERS = 8
+SUMMARY_MAX_TOKENS = 2000
+
+
+def _chunk_number(chunk_name):
+    match = re.search(r"(\d+)", chunk_name)
+    return int(match.group(1)) if match else -1
+
+
+def _summary_request(model, summary_prompt, chunk_path):
+    with open(chunk_path, "r", encoding="utf-8", errors="replace") as f:
+        chunk_text = f.read()
+    return {
+        "model": model,
+        "messages": [{"role": "user", "content": f"{summary_prompt}\n\n{chunk_text}"}],
+        "max_tokens": SUMMARY_MAX_TOKENS
+    }
+
+
+def _summary_text(response):
+    return "".join(c.text for c in response.content if c.type == "text").strip()
+
+
+async def summarize_chunk_async(client, model, summary_prompt, chunk_path, max_retries=DEFAULT_MAX_RETRIES):
+    """
+    Map step: one independent request summarizing a single chunk file, retrying transient errors.
+
+    The latency includes any wait for the rate scheduler and for retries.
+    """
+    request = _summary_request(model, summary_prompt, chunk_path)
+    start = time.perf_counter()
+    response = await call_with_retries_async(lambda: client.messages.create(**request), max_retries)
+    return _summary_text(response), time.perf_counter() - start, input_usage(response)
+
+
+class _SummaryCollector:
+    """Gathers the per-chunk results and builds the synthesis turn."""
+
+    def __init__(self, expected_chunks):
+        self.expected_chunks = expected_chunks
+        self.chunk_names = sorted(expected_chunks, key=_chunk_number)
+        self.summaries = {}
+        self.usage_totals = [0, 0, 0]
+        self.start = time.perf_counter()
+
+    def add(self, chunk_name, result):
+        if isinstance(result, Exception):
+            logger.error(f"Error summarizing {chunk_name}: {str(result)}")
+            return
+        summary, latency, usage = result
+        self.summaries[chunk_name] = summary
+        self.usage_totals = [total + count for total, count in zip(self.usage_totals, usage)]
+        logger.info(f"Analyzed chunk: {chunk_name} ({len(self.summaries)}/{len(self.chunk_names)}) in {latency:.3f}s")
+
+    def finish(self, messages):
+        logger.info(
+            f"Summarized {len(self.summaries)} chunks in {time.perf_counter() - self.start:.3f}s; "
+            f"input tokens: {describe_usage(self.usage_totals)}"
+        )
+        analyzed_chunks = set(self.summaries)
+        if len(analyzed_chunks) < len(self.expected_chunks):
+            missing_chunks = [name for name in self.chunk_names if name not in analyzed_chunks]
+            logger.warning(
+                f"Analysis incomplete: Only {len(analyzed_chunks)}/{len(self.expected_chunks)} chunks were analyzed"
+            )
+            logger.warning(f"Missing chunks: {', '.join(missing_chunks)}")
+
+        sections = [f"## {name}\n{self.summaries[name]}" for name in self.chunk_names if name in self.summaries]
+        messages.append({
+            "role": "assistant",
+            "content": [{
+                "type": "text",
+                "text": "I summarized each chunk of the project independently:\n\n" + "\n\n".join(sections)
+            }]
+        })
+        return messages, analyzed_chunks, 1
+
+
+async def map_reduce_analysis_async(client, model, messages, chunks_dir, expected_chunks, summary_prompt,
+                                    max_concurrency=None, max_retries=DEFAULT_MAX_RETRIES):
+    """
+    Phase 1 in map-reduce mode: summarize every chunk in its own concurrent request.
+
+    client is an async client, typically a rate_limit.ScheduledClient. At most max_concurrency
+    requests are in flight; the client's scheduler decides when each may start, so a larger
+    concurrency only helps as far as the rate limits allow. Returns the same (messages,
+    analyzed_chunks, analysis_iteration) as analyze_project. The summaries are added to
+    messages as one assistant turn following the initial prompt, so Phase 2 synthesizes the
+    README from them exactly as it would from an agent-loop analysis. Transient errors are
+    retried up to max_retries times; chunks whose request still fails are logged and left
+    out of analyzed_chunks.
+    """
+    collector = _SummaryCollector(expected_chunks)
+    concurrency = max(1, max_concurrency or DEFAULT_SUMMARY_WORKERS)
+    limit = asyncio.Semaphore(concurrency)
+    logger.info(f"Summarizing {len(collector.chunk_names)} chunks on asyncio, up to {concurrency} at a time")
+
+    async def summarize(chunk_name):
+        async with limit:
+            try:
+                result = await summarize_chunk_async(
+                    client, model, summary_prompt, os.path.join(chunks_dir, chunk_name), max_retries
+                )
+            except Exception as e:
+                result = e
+        collector.add(chunk_name, result)
+
+    await asyncio.gather(*(summarize(name) for name in collector.chunk_names))
+    return collector.finish(messages)
@@ -1,5 +1,6 @@
 import logging
 import traceback
+from docdog.prompt_cache import describe_usage, input_usage, with_cache_breakpoints
 
 logger = logging.getLogger(__name__)
 
@@ -27,9 +28,10 @@ def generate_readme(client, model, messages, analyzed_chunks, expected_chunks):
         logger.info("Requesting README generation from Claude")
         response = client.messages.create(
             model=model,
-            messages=messages,
+            messages=with_cache_breakpoints(messages, tools_cached=False),
             max_tokens=4000
         )
+        logger.info(f"README generation input tokens: {describe_usage(input_usage(response))}")
         
         full_text = "".join([c.text for c in response.content if c.type == "text"])
         
@@ -1,5 +1,6 @@
 import os
 import logging
+from docdog.prompt_cache import describe_usage, input_usage, with_cache_breakpoints
 
 logger = logging.getLogger(__name__)
 
@@ -27,9 +28,10 @@ def validate_readme(client, model, messages, full_text, readme_content, reasonin
         logger.info("Requesting README validation from Claude")
         response = client.messages.create(
             model=model,
-            messages=messages,
+            messages=with_cache_breakpoints(messages, tools_cached=False),
             max_tokens=4000
         )
+        logger.info(f"README validation input tokens: {describe_usage(input_usage(response))}")
         
         validation_text = "".join([c.text for c in response.content if c.type == "text"])
         
@@ -0,0 +1,270 @@
+import os
+import re
+import stat
+import fnmatch
+import logging
+import subprocess
+
+logger = logging.getLogger(__name__)
+
+GIT_TIMEOUT_SECONDS = 60
+
+
+def _translate_glob(pattern):
+    """Translate one gitignore glob into a regular expression body."""
+    i, n = 0, len(pattern)
+    out = []
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**/", i):
+                out.append("(?:.*/)?")
+                i += 3
+                continue
+            if pattern.startswith("**", i):
+                out.append(".*")
+                i += 2
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = pattern.find("]", i + 2)
+            if j == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:j].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = j
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def compile_gitignore_line(line, base=""):
+    """
+    Compile one .gitignore line into (regex, negate, dir_only), or None for blanks and comments.
+
+    base is the directory of the .gitignore file relative to the project root, which
+    anchors the pattern the same way git does.
+    """
+    line = line.rstrip("\n").rstrip("\r")
+    if not line.endswith("\\ "):
+        line = line.rstrip(" ")
+    if not line or line.startswith("#"):
+        return None
+
+    negate = line.startswith("!")
+    if negate:
+        line = line[1:]
+    elif line.startswith("\\!") or line.startswith("\\#"):
+        line = line[1:]
+
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+
+    anchored = "/" in line
+    line = line.lstrip("/")
+    prefix = re.escape(base + "/") if base else ""
+    if not anchored:
+        prefix += "(?:.*/)?"
+    return re.compile(f"^{prefix}{_translate_glob(line)}$"), negate, dir_only
+
+
+class GitignoreMatcher:
+    """
+    Evaluates the .gitignore files of a project (plus .git/info/exclude) with compiled rules.
+
+    Nested .gitignore files are read lazily the first time a path below them is checked,
+    and per-directory verdicts are cached, so repeated lookups under one directory are cheap.
+    """
+
+    def __init__(self, project_root):
+        self.project_root = os.path.abspath(project_root)
+        self._rules = {}
+        self._dir_cache = {}
+        exclude_rules = self._read_rules(os.path.join(self.project_root, ".git", "info", "exclude"), "")
+        self._rules[""] = exclude_rules + self._read_rules(os.path.join(self.project_root, ".gitignore"), "")
+
+    def _read_rules(self, path, base):
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                lines = f.readlines()
+        except OSError:
+            return []
+        return [rule for rule in (compile_gitignore_line(line, base) for line in lines) if rule]
+
+    def _rules_for(self, base):
+        rules = self._rules.get(base)
+        if rules is None:
+            rules = self._read_rules(os.path.join(self.project_root, base, ".gitignore"), base)
+            self._rules[base] = rules
+        return rules
+
+    def _matches(self, rel_path, is_dir):
+        parts = rel_path.split("/")
+        ignored = False
+        for depth in range(len(parts)):
+            base = "/".join(parts[:depth])
+            for regex, negate, dir_only in self._rules_for(base):
+                if dir_only and not is_dir:
+                    continue
+                if regex.match(rel_path):
+                    ignored = not negate
+        return ignored
+
+    def is_dir_ignored(self, rel_dir):
+        """True if rel_dir or any of its parent directories is ignored."""
+        rel_dir = rel_dir.replace(os.sep, "/").strip("/")
+        if not rel_dir or rel_dir == ".":
+            return False
+        cached = self._dir_cache.get(rel_dir)
+        if cached is None:
+            parent = rel_dir.rsplit("/", 1)[0] if "/" in rel_dir else ""
+            cached = self.is_dir_ignored(parent) or rel_dir == ".git" or self._matches(rel_dir, True)
+            self._dir_cache[rel_dir] = cached
+        return cached
+
+    def is_ignored(self, rel_path, is_dir=False):
+        """True if git would ignore rel_path (relative to the project root)."""
+        rel_path = rel_path.replace(os.sep, "/").strip("/")
+        if not rel_path or rel_path == "." or rel_path.startswith("../"):
+            return False
+        if is_dir:
+            return self.is_dir_ignored(rel_path)
+        parent = rel_path.rsplit("/", 1)[0] if "/" in rel_path else ""
+        return self.is_dir_ignored(parent) or self._matches(rel_path, False)
+
+
+class IgnoreRules:
+    """
+    Path ignore rules compiled once for repeated matching of relative paths.
+
+    A path is ignored when it starts with one of prefixes (walked through a character
+    trie), when one of its inner directories is in dir_names, when its name ends with one
+    of suffixes (looked up in a set at every "." of the name), or when it matches one of
+    patterns, which are fnmatch globs combined into a single regular expression.
+    """
+
+    _END = ""
+
+    def __init__(self, prefixes=(), dir_names=(), suffixes=(), patterns=()):
+        self.trie = {}
+        for prefix in prefixes:
+            node = self.trie
+            for char in prefix:
+                node = node.setdefault(char, {})
+            node[self._END] = True
+        self.dir_names = frozenset(dir_names)
+        self.suffixes = frozenset(suffixes)
+        self.patterns = tuple(patterns)
+        self.regex = re.compile("|".join(fnmatch.translate(p) for p in self.patterns)) if self.patterns else None
+
+    def _has_prefix(self, rel_path):
+        node = self.trie
+        for char in rel_path:
+            node = node.get(char)
+            if node is None:
+                return False
+            if self._END in node:
+                return True
+        return False
+
+    def matches(self, rel_path):
+        if self._has_prefix(rel_path):
+            return True
+        parts = rel_path.split("/")
+        if len(parts) > 2 and not self.dir_names.isdisjoint(parts[1:-1]):
+            return True
+        name = parts[-1]
+        dot = name.find(".")
+        while dot != -1:
+            if name[dot:] in self.suffixes:
+                return True
+            dot = name.find(".", dot + 1)
+        return bool(self.regex and self.regex.match(rel_path))
+
+
+def git_ls_files(project_root):
+    """
+    Return the files git tracks or would track (untracked but not ignored), relative to
+    project_root, or None when project_root is not inside a git work tree.
+    """
+    try:
+        result = subprocess.run(
+            ["git", "-C", project_root, "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+            capture_output=True,
+            check=True,
+            timeout=GIT_TIMEOUT_SECONDS
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.info(f"git ls-files unavailable, falling back to .gitignore rules: {str(e).strip()}")
+        return None
+    paths = result.stdout.decode("utf-8", errors="surrogateescape").split("\0")
+    return list(dict.fromkeys(path for path in paths if path))
+
+
+def walk_gitignored(project_root, skip_dir_names=()):
+    """
+    Walk project_root with os.scandir, never descending into directories .gitignore excludes.
+
+    Yields (rel_path, stat_result) using the DirEntry's stat data, so callers can filter on
+    size without another system call per file.
+    """
+    matcher = GitignoreMatcher(project_root)
+    skip_dir_names = set(skip_dir_names)
+    pending = [""]
+    while pending:
+        rel_dir = pending.pop()
+        try:
+            it = os.scandir(os.path.join(project_root, rel_dir) if rel_dir else project_root)
+        except OSError:
+            continue
+        subdirs = []
+        with it:
+            for entry in it:
+                rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in skip_dir_names and not matcher.is_dir_ignored(rel_path):
+                            subdirs.append(rel_path)
+                    elif entry.is_file() and not matcher.is_ignored(rel_path):
+                        yield rel_path, entry.stat()
+                except OSError:
+                    continue
+        pending.extend(reversed(subdirs))
+
+
+def list_project_files(project_root, backend="git", skip_dir_names=(), skip_paths=()):
+    """
+    Return (rel_path, stat_result) for the project's files using the given enumeration backend.
+
+    "git" reads the git index (falling back to "gitignore" outside a work tree) and
+    "gitignore" walks the tree with compiled .gitignore rules. Files at skip_paths
+    (relative to project_root) are left out either way.
+    """
+    skip_paths = set(skip_paths)
+    if backend == "git":
+        paths = git_ls_files(project_root)
+        if paths is not None:
+            skip_dir_names = set(skip_dir_names)
+            files = []
+            for path in paths:
+                if path in skip_paths or skip_dir_names.intersection(path.split("/")[:-1]):
+                    continue
+                try:
+                    st = os.stat(os.path.join(project_root, path))
+                except OSError:
+                    continue
+                if stat.S_ISREG(st.st_mode):
+                    files.append((path, st))
+            return files
+    return [(path, st) for path, st in walk_gitignored(project_root, skip_dir_names) if path not in skip_paths]
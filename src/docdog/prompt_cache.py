@@ -0,0 +1,52 @@
+CACHE_CONTROL = {"type": "ephemeral"}
+MAX_CACHE_BREAKPOINTS = 4
+
+
+def cached_tools(tools):
+    """Copy of the tool schemas with a cache breakpoint after the last one, so they are cached as a prefix."""
+    if not tools:
+        return tools
+    return list(tools[:-1]) + [dict(tools[-1], cache_control=CACHE_CONTROL)]
+
+
+def _with_breakpoint(message):
+    content = message["content"]
+    if isinstance(content, str):
+        content = [{"type": "text", "text": content}]
+    if not content:
+        return message
+    content = list(content)
+    content[-1] = dict(content[-1], cache_control=CACHE_CONTROL)
+    return dict(message, content=content)
+
+
+def with_cache_breakpoints(messages, tools_cached=True):
+    """
+    Copy of messages with cache breakpoints on the initial prompt and the latest user turns.
+
+    The conversation only grows, so everything up to the newest user turn is a stable
+    prefix: the breakpoint there writes it to the cache for the next request, and the one
+    on the user turn before it reads what the previous request wrote. Together with the
+    tools breakpoint this stays within the API's limit of MAX_CACHE_BREAKPOINTS. The stored
+    messages are left untouched so breakpoints do not pile up across requests.
+    """
+    budget = MAX_CACHE_BREAKPOINTS - (1 if tools_cached else 0)
+    user_turns = [i for i, message in enumerate(messages) if message["role"] == "user"]
+    marked = set(user_turns[:1]) | set(user_turns[1:][-(budget - 1):])
+    return [_with_breakpoint(message) if i in marked else message for i, message in enumerate(messages)]
+
+
+def input_usage(response):
+    """(cache read, cache write, uncached) input tokens of a response; fields the usage lacks count as 0."""
+    usage = getattr(response, "usage", None)
+    counts = []
+    for field in ("cache_read_input_tokens", "cache_creation_input_tokens", "input_tokens"):
+        value = getattr(usage, field, 0)
+        counts.append(value if isinstance(value, int) else 0)
+    return tuple(counts)
+
+
+def describe_usage(usage):
+    """Human-readable form of an input_usage() tuple, for the phases' logs."""
+    cached, written, uncached = usage
+    return f"{cached} cached, {written} written to cache, {uncached} uncached"
@@ -0,0 +1,132 @@
+import time
+import asyncio
+import logging
+from docdog.compaction import estimate_tokens
+from docdog.prompt_cache import input_usage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REQUESTS_PER_MINUTE = 50
+DEFAULT_TOKENS_PER_MINUTE = 0
+
+
+class TokenBucket:
+    """
+    Holds up to capacity units and refills continuously at rate units per second.
+
+    take() may drive the level below zero when a charge is corrected upwards afterwards;
+    later callers then wait until the debt is refilled.
+    """
+
+    def __init__(self, capacity, rate, clock=time.monotonic):
+        self.capacity = capacity
+        self.rate = rate
+        self.clock = clock
+        self.level = float(capacity)
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        """Seconds until amount units are available; amounts over capacity wait for a full bucket."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount):
+        """Charge amount, at most one full bucket, and return what was actually charged."""
+        self._refill()
+        charged = min(amount, self.capacity)
+        self.level -= charged
+        return charged
+
+    def give_back(self, amount):
+        """Return units (or charge more, for a negative amount) after the real cost is known."""
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+
+class RateScheduler:
+    """
+    Admits asyncio requests within a requests-per-minute and a tokens-per-minute budget.
+
+    Each budget is a token bucket holding one period's worth and refilling continuously,
+    the way the API meters its own limits, so bursts up to the limit go through at once and
+    sustained load is paced instead of answered with 429s. Waiters are served in arrival
+    order. A request is charged its estimated tokens up front, at most one full bucket, and
+    settle() corrects that charge with the usage the response reports, so a request larger
+    than the budget leaves a debt later requests wait out. A falsy limit leaves that budget
+    unenforced.
+    """
+
+    def __init__(self, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE, tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE,
+                 period=60.0, clock=time.monotonic):
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / period, clock) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / period, clock) if tokens_per_minute else None
+        self.admitted = 0
+        self.waited = 0.0
+        self._lock = None
+        self._warned_over_capacity = False
+
+    async def acquire(self, tokens):
+        """Wait until the request fits both budgets and return the tokens it was charged."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        if self.tokens and tokens > self.tokens.capacity and not self._warned_over_capacity:
+            self._warned_over_capacity = True
+            logger.warning(f"A request estimated at {tokens} tokens is larger than the {self.tokens.capacity} "
+                           f"tokens per minute budget; each such request waits for a full minute's budget")
+        charges = [(bucket, amount) for bucket, amount in ((self.requests, 1), (self.tokens, tokens)) if bucket]
+        async with self._lock:
+            while True:
+                delay = max((bucket.wait_time(amount) for bucket, amount in charges), default=0.0)
+                if delay <= 0:
+                    break
+                self.waited += delay
+                await asyncio.sleep(delay)
+            if self.requests:
+                self.requests.take(1)
+            charged = self.tokens.take(tokens) if self.tokens else 0
+            self.admitted += 1
+        return charged
+
+    def settle(self, charged, actual):
+        """Replace the charge acquire() returned by the tokens the request actually used."""
+        if self.tokens and actual is not None:
+            self.tokens.give_back(charged - actual)
+
+
+def estimate_request_tokens(request):
+    """Tokens a messages.create request is charged up front: its estimated input plus max_tokens."""
+    return estimate_tokens(request.get("messages", [])) + request.get("max_tokens", 0)
+
+
+def response_tokens(response):
+    """Tokens a response used against the budget: uncached and cache-write input plus output."""
+    _, written, uncached = input_usage(response)
+    output = getattr(getattr(response, "usage", None), "output_tokens", 0)
+    return written + uncached + (output if isinstance(output, int) else 0)
+
+
+class ScheduledMessages:
+    def __init__(self, messages, scheduler):
+        self._messages = messages
+        self.scheduler = scheduler
+
+    async def create(self, **kwargs):
+        charged = await self.scheduler.acquire(estimate_request_tokens(kwargs))
+        response = await self._messages.create(**kwargs)
+        self.scheduler.settle(charged, response_tokens(response))
+        return response
+
+
+class ScheduledClient:
+    """Wraps an async Anthropic client so every messages.create passes through a RateScheduler first."""
+
+    def __init__(self, client, scheduler):
+        self.client = client
+        self.scheduler = scheduler
+        self.messages = ScheduledMessages(client.messages, scheduler)
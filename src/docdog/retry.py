@@ -0,0 +1,77 @@
+import time
+import random
+import asyncio
+import logging
+import anthropic
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_RETRIES = 5
+BASE_DELAY_SECONDS = 1.0
+MAX_DELAY_SECONDS = 60.0
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504, 529})
+
+
+def is_transient(error):
+    """True for API errors worth retrying: connection problems, timeouts, rate limits, overload and 5xx."""
+    if isinstance(error, anthropic.APIConnectionError):
+        return True
+    return isinstance(error, anthropic.APIStatusError) and (
+        error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+    )
+
+
+def _retry_after(error):
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, base=BASE_DELAY_SECONDS, cap=MAX_DELAY_SECONDS, rng=random):
+    """Full-jitter exponential backoff: a uniform delay up to base * 2**attempt, capped at cap."""
+    return rng.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def _retry_delay(error, attempt, max_retries, rng):
+    """Seconds to wait before retrying a call that failed with error, or None to raise it."""
+    if not is_transient(error) or attempt >= max_retries:
+        return None
+    delay = max(backoff_delay(attempt, rng=rng), _retry_after(error) or 0.0)
+    logger.warning(f"Transient API error ({str(error)}); retry {attempt + 1}/{max_retries} in {delay:.1f}s")
+    return delay
+
+
+def call_with_retries(func, max_retries=DEFAULT_MAX_RETRIES, sleep=None, rng=random):
+    """
+    Call func(), retrying transient API errors up to max_retries times with jittered backoff.
+
+    A retry-after header on the error sets the minimum wait. These retries come on top of the
+    SDK's own short ones, so a run survives an outage of a minute or two; other errors and
+    the last transient one are raised.
+    """
+    attempt = 0
+    while True:
+        try:
+            return func()
+        except Exception as e:
+            delay = _retry_delay(e, attempt, max_retries, rng)
+            if delay is None:
+                raise
+            attempt += 1
+            (sleep or time.sleep)(delay)
+
+
+async def call_with_retries_async(func, max_retries=DEFAULT_MAX_RETRIES, sleep=None, rng=random):
+    """call_with_retries for a func returning an awaitable; the backoff waits with asyncio.sleep."""
+    attempt = 0
+    while True:
+        try:
+            return await func()
+        except Exception as e:
+            delay = _retry_delay(e, attempt, max_retries, rng)
+            if delay is None:
+                raise
+            attempt += 1
+            await (sleep or asyncio.sleep)(delay)
@@ -0,0 +1,142 @@
+import os
+import re
+import ast
+import logging
+import threading
+from collections import namedtuple
+from docdog.outline import class_header, function_signature
+from docdog.project_files import list_project_files
+
+logger = logging.getLogger(__name__)
+
+PYTHON_EXTENSIONS = (".py",)
+JS_EXTENSIONS = (".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx", ".mts", ".cts")
+MAX_SYMBOL_FILE_BYTES = 1024 * 1024
+MAX_SIGNATURE_CHARS = 160
+
+Symbol = namedtuple("Symbol", ["name", "qualname", "kind", "path", "line", "signature"])
+
+JS_EXPORT = re.compile(
+    r"\s*export\s+(?:default\s+)?(?:declare\s+)?(?:abstract\s+)?(?:async\s+)?"
+    r"(function\*?|class|const|let|var|interface|type|enum)\s+([A-Za-z_$][\w$]*)"
+)
+JS_KINDS = {"function*": "function", "let": "variable", "var": "variable", "const": "constant"}
+
+
+def _short(signature):
+    signature = " ".join(signature.split())
+    return signature if len(signature) <= MAX_SIGNATURE_CHARS else signature[:MAX_SIGNATURE_CHARS - 3] + "..."
+
+
+def python_symbols(source, rel_path):
+    """
+    Classes, functions, methods and UPPER_CASE constants defined at module or class level.
+
+    Methods get the qualified name Class.method. Raises SyntaxError for unparsable source.
+    """
+    symbols = []
+
+    def visit(body, prefix):
+        for node in body:
+            if isinstance(node, ast.ClassDef):
+                qualname = prefix + node.name
+                symbols.append(Symbol(node.name, qualname, "class", rel_path, node.lineno, _short(class_header(node))))
+                visit(node.body, qualname + ".")
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                kind = "method" if prefix else "function"
+                signature = _short(function_signature(node))
+                symbols.append(Symbol(node.name, prefix + node.name, kind, rel_path, node.lineno, signature))
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                for target in targets:
+                    if isinstance(target, ast.Name) and target.id.isupper():
+                        symbols.append(Symbol(
+                            target.id, prefix + target.id, "constant", rel_path, node.lineno,
+                            _short(ast.unparse(node))
+                        ))
+
+    visit(ast.parse(source).body, "")
+    return symbols
+
+
+def js_symbols(source, rel_path):
+    """Exported declarations of a JavaScript or TypeScript module, found line by line."""
+    symbols = []
+    for lineno, line in enumerate(source.splitlines(), 1):
+        match = JS_EXPORT.match(line)
+        if match:
+            keyword, name = match.groups()
+            signature = _short(line.split("{", 1)[0].rstrip(" =") if keyword != "type" else line)
+            symbols.append(Symbol(name, name, JS_KINDS.get(keyword, keyword), rel_path, lineno, signature))
+    return symbols
+
+
+def file_symbols(source, rel_path):
+    """Symbols of one source file, or [] for languages the index does not cover."""
+    if rel_path.endswith(PYTHON_EXTENSIONS):
+        return python_symbols(source, rel_path)
+    if rel_path.endswith(JS_EXTENSIONS):
+        return js_symbols(source, rel_path)
+    return []
+
+
+class SymbolIndex:
+    """
+    Where each class, function and constant of the project is defined.
+
+    The index is built once, on the first lookup or by calling build() from a background
+    thread; lookups made while a build runs wait for it. Afterwards find() and
+    module_symbols() are dictionary lookups that never touch the files again. Files are
+    enumerated like the chunker does (git index or .gitignore rules); should_ignore drops
+    further files, and files over MAX_SYMBOL_FILE_BYTES or that fail to parse are skipped.
+    """
+
+    def __init__(self, project_root, should_ignore=None, backend="git", skip_dir_names=()):
+        self.project_root = os.path.abspath(project_root)
+        self.should_ignore = should_ignore
+        self.backend = backend
+        self.skip_dir_names = skip_dir_names
+        self._by_name = None
+        self._by_module = None
+        self._lock = threading.Lock()
+
+    def build(self):
+        with self._lock:
+            if self._by_name is not None:
+                return
+            by_name, by_module = {}, {}
+            skipped = 0
+            for rel_path, st in list_project_files(self.project_root, self.backend, self.skip_dir_names):
+                if not rel_path.endswith(PYTHON_EXTENSIONS + JS_EXTENSIONS) or st.st_size > MAX_SYMBOL_FILE_BYTES:
+                    continue
+                full_path = os.path.join(self.project_root, rel_path)
+                if self.should_ignore and self.should_ignore(full_path):
+                    continue
+                try:
+                    with open(full_path, "r", encoding="utf-8", errors="replace") as f:
+                        symbols = file_symbols(f.read(), rel_path)
+                except (OSError, SyntaxError, ValueError):
+                    skipped += 1
+                    continue
+                by_module[rel_path] = symbols
+                for symbol in symbols:
+                    by_name.setdefault(symbol.name, []).append(symbol)
+                    if symbol.qualname != symbol.name:
+                        by_name.setdefault(symbol.qualname, []).append(symbol)
+            for symbols in by_name.values():
+                symbols.sort(key=lambda symbol: (symbol.path, symbol.line))
+            self._by_name, self._by_module = by_name, by_module
+        logger.info(
+            f"Symbol index: {sum(len(s) for s in by_module.values())} symbols in {len(by_module)} files"
+            f" ({skipped} unreadable or unparsable files skipped)"
+        )
+
+    def find(self, name):
+        """Definitions of a name or qualified name (Class.method), in path and line order."""
+        self.build()
+        return self._by_name.get(name.strip(), [])
+
+    def module_symbols(self, rel_path):
+        """Symbols of one file in source order, or None if the file is not indexed."""
+        self.build()
+        return self._by_module.get(os.path.normpath(rel_path).replace(os.sep, "/"))
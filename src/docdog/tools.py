@@ -1,50 +1,110 @@
 import os
-import fnmatch
+import re
 import ast
+import fnmatch
 import json
+import mmap
+import threading
 import concurrent.futures
 from typing import Optional
-from functools import lru_cache
+from docdog.project_files import GitignoreMatcher, IgnoreRules
+from docdog.chunk_index import ChunkIndex, MAX_SLICE_BYTES
+from docdog.file_cache import StatValidatedCache
+from docdog.disk_cache import DiskCache, content_hash
+from docdog.outline import python_outline
+from docdog.symbol_index import SymbolIndex
+
+CHUNKS_DIR = "chunks"
+DEFAULT_RANGE_LINES = 200
+MAX_RANGE_BYTES = 64 * 1024
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+MAX_BATCH_BYTES = 256 * 1024
+DEFAULT_TREE_DEPTH = 3
+DEFAULT_TREE_PAGE = 500
+MAX_TREE_PAGE = 5000
+MAX_SYMBOL_RESULTS = 50
+DEFAULT_IGNORE_PATTERNS = (
+    "**/.git/**", "**/__pycache__/**", "**/venv/**", "**/node_modules/**",
+    "**/*.pyc", "**/*.pyo", "**/.env", "**/*.env", "**/.DS_Store",
+    "**/*.jpg", "**/*.jpeg", "**/*.png", "**/*.gif"
+)
+IGNORED_DIR_PREFIXES = (".git", "__pycache__", "venv", "node_modules", ".docdog")
+IGNORED_SUFFIXES = (".pyc", ".pyo", ".env", ".jpg", ".jpeg", ".png", ".gif", ".DS_Store")
+
+
+def _window_end(data, start, end, size):
+    """Move end back so the window [start, end) does not split a UTF-8 sequence, unless that empties it."""
+    if end >= size:
+        return size
+    for back in range(min(4, end - start)):
+        if (data[end - back] & 0xC0) != 0x80:
+            return end - back
+    return end
 
 class Tools:
-    def __init__(self, project_root: str, max_workers: Optional[int] = None, cache_size: int = 128):
+    def __init__(self, project_root: str, max_workers: Optional[int] = None, cache_size: Optional[int] = None,
+                 respect_gitignore: bool = True, cache_bytes: Optional[int] = DEFAULT_CACHE_BYTES,
+                 disk_cache: Optional[DiskCache] = None, batch_max_bytes: int = MAX_BATCH_BYTES):
         self.project_root = os.path.abspath(project_root)
         self.max_workers = max_workers 
         self.cache_size = cache_size 
-        self.ignore_patterns = [
-            "**/.git/**", "**/__pycache__/**", "**/venv/**", "**/node_modules/**",
-            "**/*.pyc", "**/*.pyo", "**/.env", "**/*.env", "**/.DS_Store",
-            "**/*.jpg", "**/*.jpeg", "**/*.png", "**/*.gif"
-        ]
-        self._cached_read_file = lru_cache(maxsize=self.cache_size)(self._read_file_impl)
-        self._cached_list_files = lru_cache(maxsize=self.cache_size)(self._list_files_impl)
+        self.cache_bytes = cache_bytes
+        self.disk_cache = disk_cache
+        self.batch_max_bytes = batch_max_bytes
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self.ignore_patterns = list(DEFAULT_IGNORE_PATTERNS)
+        self._root_prefix = os.path.join(self.project_root, "")
+        self.compile_ignore_rules()
+        self.gitignore = GitignoreMatcher(self.project_root) if respect_gitignore else None
+        self.chunk_index = ChunkIndex(os.path.join(self.project_root, CHUNKS_DIR))
+        self.symbol_index = SymbolIndex(self.project_root, self.should_ignore, skip_dir_names=IGNORED_DIR_PREFIXES)
+        self._cached_read_file = StatValidatedCache(
+            self._read_file_impl, self._full_path, self.cache_size, self.cache_bytes
+        )
+        self._cached_list_files = StatValidatedCache(
+            self._list_files_impl, self._full_path, self.cache_size, self.cache_bytes
+        )
+        self._cached_outline = StatValidatedCache(
+            self._outline_impl, self._full_path, self.cache_size, self.cache_bytes
+        )
 
+    def _full_path(self, path: str) -> str:
+        return os.path.join(self.project_root, path)
 
-    def should_ignore(self, path: str) -> bool:
-        rel_path = os.path.relpath(path, self.project_root)
-        
-        if rel_path.startswith(".git") or "/.git/" in rel_path:
-            return True
-        if rel_path.startswith("__pycache__") or "/__pycache__/" in rel_path:
-            return True
-        if rel_path.startswith("venv") or "/venv/" in rel_path:
-            return True
-        if rel_path.startswith("node_modules") or "/node_modules/" in rel_path:
+    def _canonical(self, path: str) -> str:
+        """Cache key for a repo path, so that ./a/b, a//b and a/x/../b share one entry."""
+        return os.path.normpath(path.strip() or ".")
+
+
+    def compile_ignore_rules(self):
+        """Compile the ignore rules; call again after changing ignore_patterns."""
+        self._ignore_rules = IgnoreRules(
+            prefixes=IGNORED_DIR_PREFIXES,
+            dir_names=IGNORED_DIR_PREFIXES,
+            suffixes=IGNORED_SUFFIXES,
+            patterns=[p for p in self.ignore_patterns if p not in DEFAULT_IGNORE_PATTERNS]
+        )
+
+    def should_ignore(self, path: str, is_dir: bool = False) -> bool:
+        if path.startswith(self._root_prefix) and "/." not in path and "//" not in path:
+            rel_path = path[len(self._root_prefix):]
+        else:
+            rel_path = os.path.relpath(path, self.project_root)
+        if os.sep != "/":
+            rel_path = rel_path.replace(os.sep, "/")
+
+        if self._ignore_rules.matches(rel_path):
             return True
-        
-        for ext in [".pyc", ".pyo", ".env", ".jpg", ".jpeg", ".png", ".gif", ".DS_Store"]:
-            if rel_path.endswith(ext):
-                return True
-        
-        for pattern in self.ignore_patterns:
-            if fnmatch.fnmatch(rel_path, pattern):
-                return True
+
+        if self.gitignore and not (rel_path == CHUNKS_DIR or rel_path.startswith(CHUNKS_DIR + "/")):
+            return self.gitignore.is_ignored(rel_path, is_dir)
                 
         return False
 
     def list_files(self, directory: str) -> str:
-        """List files with LRU caching."""
-        return self._cached_list_files(directory)
+        """List files, cached until the directory changes."""
+        return self._cached_list_files(self._canonical(directory))
         
     def _list_files_impl(self, directory: str) -> str:
         """Implementation of list_files that will be cached."""
@@ -64,9 +124,92 @@ class Tools:
         except Exception as e:
             return f"Error listing files: {str(e)}"
 
-    def read_file(self, file_path: str) -> str:
-        """Read file with LRU caching."""
-        return self._cached_read_file(file_path)
+    def list_tree(self, directory: str = ".", max_depth: int = DEFAULT_TREE_DEPTH, pattern: Optional[str] = None,
+                  page_size: int = DEFAULT_TREE_PAGE, cursor: Optional[str] = None) -> str:
+        """List a directory tree depth-first as "path/" and "path<TAB>size" lines, paged by cursor."""
+        full_dir = os.path.abspath(os.path.join(self.project_root, directory))
+        if full_dir != self.project_root and not full_dir.startswith(self._root_prefix):
+            return "Error: Directory is outside the repo!"
+        if not os.path.isdir(full_dir):
+            return "Directory does not exist."
+        page_size = max(1, min(page_size or DEFAULT_TREE_PAGE, MAX_TREE_PAGE))
+        after = tuple(cursor.strip("/").split("/")) if cursor else None
+        pattern_regex = re.compile(fnmatch.translate(pattern)) if pattern else None
+        match_path = bool(pattern) and "/" in pattern
+
+        def scan(path):
+            try:
+                with os.scandir(path) as it:
+                    return iter(sorted(it, key=lambda e: e.name))
+            except OSError:
+                return iter(())
+
+        lines = []
+        paths = []
+        rel_root = os.path.relpath(full_dir, self.project_root).replace(os.sep, "/")
+        stack = [(scan(full_dir), rel_root, 1)]
+        try:
+            while stack and len(lines) <= page_size:
+                entries, rel_dir, depth = stack[-1]
+                entry = next(entries, None)
+                if entry is None:
+                    stack.pop()
+                    continue
+                rel_path = entry.name if rel_dir == "." else f"{rel_dir}/{entry.name}"
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if after is not None:
+                    parts = tuple(rel_path.split("/"))
+                    if parts <= after:
+                        if is_dir and after[:len(parts)] == parts and depth < max_depth:
+                            stack.append((scan(entry.path), rel_path, depth + 1))
+                        continue
+                if self.should_ignore(entry.path, is_dir=is_dir):
+                    continue
+                if is_dir:
+                    if not pattern_regex:
+                        lines.append(f"{rel_path}/")
+                        paths.append(rel_path)
+                    if depth < max_depth:
+                        stack.append((scan(entry.path), rel_path, depth + 1))
+                elif entry.is_file():
+                    if pattern_regex and not pattern_regex.match(rel_path if match_path else entry.name):
+                        continue
+                    lines.append(f"{rel_path}\t{entry.stat().st_size}")
+                    paths.append(rel_path)
+        except Exception as e:
+            return f"Error listing tree: {str(e)}"
+
+        if len(lines) > page_size:
+            lines = lines[:page_size]
+            lines.append(f"[more entries, cursor: {paths[page_size - 1]}]")
+        return "\n".join(lines) if lines else "No files found."
+
+    def read_file(self, file_path: str, mode: str = "full") -> str:
+        """Read file, cached until its mtime, size or inode changes; mode "outline" outlines Python files."""
+        if mode == "outline":
+            return self._cached_outline(self._canonical(file_path))
+        return self._cached_read_file(self._canonical(file_path))
+
+    def _outline_impl(self, file_path: str) -> str:
+        """Implementation of the outline mode of read_file that will be cached."""
+        full_path = os.path.join(self.project_root, file_path)
+        if self.should_ignore(full_path):
+            return "Error: File ignored!"
+        if not file_path.endswith('.py'):
+            return "Error: outline mode supports Python files only; use read_file_range for other files"
+        try:
+            with open(full_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            if self.disk_cache is None:
+                return python_outline(content)
+            key = self.disk_cache.key("outline", file_path, content_hash(content))
+            result = self.disk_cache.get(key)
+            if result is None:
+                result = python_outline(content)
+                self.disk_cache.put(key, result)
+            return result
+        except Exception as e:
+            return f"Error reading file: {str(e)}"
         
     def _read_file_impl(self, file_path: str) -> str:
         """Implementation of read_file that will be cached."""
@@ -77,48 +220,259 @@ class Tools:
             with open(full_path, 'r', encoding='utf-8') as f:
                 content = f.read()
             if file_path.endswith('.py'):
-                tree = ast.parse(content)
-                docstrings = []
-                
-                for node in ast.walk(tree):
-                    if isinstance(node, (ast.FunctionDef, ast.ClassDef)) and node.body:
-                        first_node = node.body[0]
-                        if isinstance(first_node, ast.Expr) and hasattr(first_node.value, 's'):
-                            docstrings.append(first_node.value.s)
-                
-                comments = [line.strip() for line in content.split('\n') if line.strip().startswith('#')]
-                return f"Content:\n{content}\n\nDocstrings:\n{docstrings}\n\nComments:\n{comments}"
+                if self.disk_cache is None:
+                    return self._describe_python(content)
+                key = self.disk_cache.key("read_file", file_path, content_hash(content))
+                result = self.disk_cache.get(key)
+                if result is None:
+                    result = self._describe_python(content)
+                    self.disk_cache.put(key, result)
+                return result
             return content
         except Exception as e:
             return f"Error reading file: {str(e)}"
+
+    def _describe_python(self, content: str) -> str:
+        """Python source followed by its docstrings and comments."""
+        tree = ast.parse(content)
+        docstrings = []
         
-    def batch_read_files(self, file_paths: list) -> str:
-        results = []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = [executor.submit(self.read_file, file_path) for file_path in file_paths]
-            for future, file_path in zip(futures, file_paths):
-                try:
-                    content = future.result()
-                    if "Error" in content:
-                        results.append({"file": file_path, "error": content})
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.FunctionDef, ast.ClassDef)) and node.body:
+                first_node = node.body[0]
+                if isinstance(first_node, ast.Expr) and hasattr(first_node.value, 's'):
+                    docstrings.append(first_node.value.s)
+        
+        comments = [line.strip() for line in content.split('\n') if line.strip().startswith('#')]
+        return f"Content:\n{content}\n\nDocstrings:\n{docstrings}\n\nComments:\n{comments}"
+        
+    def read_file_range(self, file_path: str, start_line: Optional[int] = None, num_lines: Optional[int] = None,
+                        offset: Optional[int] = None, length: Optional[int] = None,
+                        cursor: Optional[str] = None) -> str:
+        """Return a window of a file by lines or bytes through a memory map, ending with a cursor if more follows."""
+        full_path = os.path.abspath(os.path.join(self.project_root, file_path))
+        if not full_path.startswith(self.project_root):
+            return "Error: File is outside the repo!"
+        if self.should_ignore(full_path):
+            return "Error: File ignored!"
+        try:
+            if cursor:
+                mode, _, position = cursor.partition(":")
+                if mode == "lines":
+                    start_line, _, offset = position.partition(":")
+                    start_line, offset = int(start_line), int(offset)
+                elif mode == "bytes":
+                    offset, start_line = int(position), None
+                else:
+                    return f"Error: Invalid cursor {cursor!r}"
+            by_lines = offset is None or start_line is not None
+
+            with open(full_path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size == 0:
+                    return f"[{file_path} is empty]"
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if by_lines:
+                        start_line = max(1, start_line or 1)
+                        if offset is None:
+                            offset = 0
+                            for _ in range(start_line - 1):
+                                offset = mm.find(b"\n", offset) + 1
+                                if offset == 0:
+                                    return f"Error: {file_path} has fewer than {start_line} lines"
+                        limit = min(size, offset + MAX_RANGE_BYTES)
+                        end = offset
+                        for _ in range(num_lines or DEFAULT_RANGE_LINES):
+                            newline = mm.find(b"\n", end, limit)
+                            if newline == -1:
+                                end = _window_end(mm, offset, limit, size)
+                                break
+                            end = newline + 1
                     else:
-                        results.append({"file": file_path, "content": content})
-                except Exception as exc:
-                    results.append({"file": file_path, "error": f"Exception: {str(exc)}"})
-        return json.dumps(results, indent=2)
+                        offset = min(max(0, offset), size)
+                        end = offset + min(length or MAX_RANGE_BYTES, MAX_RANGE_BYTES)
+                        end = _window_end(mm, offset, end, size)
+                    data = mm[offset:end]
+        except Exception as e:
+            return f"Error reading file: {str(e)}"
+
+        if by_lines:
+            newlines = data.count(b"\n")
+            last_line = start_line + max(newlines - (1 if data.endswith(b"\n") else 0), 0)
+            window = f"lines {start_line}-{last_line}, bytes {offset}-{end} of {size}"
+            next_cursor = f"lines:{start_line + newlines}:{end}"
+        else:
+            window = f"bytes {offset}-{end} of {size}"
+            next_cursor = f"bytes:{end}"
+        footer = f"[more follows, cursor: {next_cursor}]" if end < size else "[end of file]"
+        text = data.decode("utf-8", errors="replace")
+        separator = "" if text.endswith("\n") else "\n"
+        return f"[{file_path} {window}]\n{text}{separator}{footer}"
+
+    def read_chunk(self, file_path: Optional[str] = None, chunk: Optional[str] = None, offset: int = 0,
+                   length: int = MAX_SLICE_BYTES) -> str:
+        """Serve one packed source file, or a byte slice of a chunk, from the chunk index."""
+        try:
+            if file_path:
+                text, entry = self.chunk_index.read_file(file_path)
+                if text is None:
+                    return f"Error: {file_path} is not in the chunk index"
+                last_line = entry["line"] + max(entry["lines"], 1) - 1
+                return f"{file_path} ({entry['chunk']}, lines {entry['line']}-{last_line}):\n{text}"
+            if chunk:
+                return self.chunk_index.read_slice(chunk, offset, length)
+            return "Error: read_chunk needs file_path or chunk"
+        except Exception as e:
+            return f"Error reading chunk: {str(e)}"
+
+    def start_symbol_index(self) -> threading.Thread:
+        """Build the symbol index on a background thread so that it is ready by the first lookup."""
+        thread = threading.Thread(target=self.symbol_index.build, name="docdog-symbol-index", daemon=True)
+        thread.start()
+        return thread
+
+    def find_symbol(self, name: str) -> str:
+        """Where a class, function, method or constant is defined, as 'path:line kind signature' lines."""
+        symbols = self.symbol_index.find(name)
+        if not symbols:
+            return f"No definition of {name} found."
+        lines = [f"{s.path}:{s.line}\t{s.kind}\t{s.qualname}\t{s.signature}" for s in symbols[:MAX_SYMBOL_RESULTS]]
+        if len(symbols) > MAX_SYMBOL_RESULTS:
+            lines.append(f"[{len(symbols) - MAX_SYMBOL_RESULTS} more definitions not shown]")
+        return "\n".join(lines)
+
+    def list_module_symbols(self, file_path: str) -> str:
+        """The indexed symbols of one file in source order, as 'line kind qualname signature' lines."""
+        symbols = self.symbol_index.module_symbols(file_path)
+        if symbols is None:
+            return f"Error: {file_path} is not in the symbol index (only Python and JS/TS sources are indexed)"
+        if not symbols:
+            return "No symbols found."
+        return "\n".join(f"{s.line}\t{s.kind}\t{s.qualname}\t{s.signature}" for s in symbols)
+
+    def _get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        """The worker pool shared by every batch call, created on first use."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    def close(self):
+        """Shut down the batch worker pool."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _batch_item(self, file_path: str, future: concurrent.futures.Future) -> dict:
+        try:
+            content = future.result()
+        except Exception as exc:
+            return {"file": file_path, "error": f"Exception: {str(exc)}"}
+        if content.startswith("Error"):
+            return {"file": file_path, "error": content}
+        return {"file": file_path, "content": content}
+
+    def batch_read_files(self, file_paths: list, cursor: int = 0) -> str:
+        """Read several whole files as a JSON list in request order, ending with a cursor at the output cap."""
+        file_paths = file_paths[cursor:]
+        if not file_paths:
+            return "[]"
+        executor = self._get_executor()
+        futures = {executor.submit(self.read_file, file_path): i for i, file_path in enumerate(file_paths)}
+        completed = {}
+        parts = []
+        used = 0
+        next_index = 0
+        truncated_at = None
+        for future in concurrent.futures.as_completed(futures):
+            completed[futures[future]] = future
+            while next_index in completed:
+                item = self._batch_item(file_paths[next_index], completed.pop(next_index))
+                part = json.dumps(item)
+                if parts and used + len(part) > self.batch_max_bytes:
+                    truncated_at = next_index
+                    break
+                parts.append(part)
+                used += len(part)
+                next_index += 1
+            if truncated_at is not None:
+                for pending in futures:
+                    pending.cancel()
+                break
+
+        if truncated_at is not None:
+            parts.append(json.dumps({
+                "truncated": True,
+                "cursor": cursor + truncated_at,
+                "message": f"Output limit of {self.batch_max_bytes} bytes reached; call batch_read_files again "
+                           f"with the same file_paths and cursor {cursor + truncated_at} to continue"
+            }))
+        return "[\n" + ",\n".join(parts) + "\n]"
 
     def clear_caches(self):
-        """Clear all LRU caches."""
+        """Clear all caches."""
         self._cached_read_file.cache_clear()
         self._cached_list_files.cache_clear()
+        self._cached_outline.cache_clear()
+
+    def cache_stats(self) -> dict:
+        """Hit, miss and invalidation counters of each cached tool."""
+        stats = {}
+        caches = (
+            ("read_file", self._cached_read_file),
+            ("list_files", self._cached_list_files),
+            ("outline", self._cached_outline)
+        )
+        for tool_name, cache in caches:
+            info = cache.cache_info()
+            stats[tool_name] = {
+                "hits": info.hits,
+                "misses": info.misses,
+                "invalidations": info.invalidations,
+                "entries": info.currsize,
+                "bytes": info.bytes
+            }
+        if self.disk_cache is not None:
+            stats["read_file"]["disk_hits"] = self.disk_cache.hits
+            stats["read_file"]["disk_misses"] = self.disk_cache.misses
+        return stats
 
     def handle_tool_call(self, tool_name: str, tool_input: dict) -> str:
         if tool_name == "list_files":
             return self.list_files(tool_input["directory"])
+        elif tool_name == "list_tree":
+            return self.list_tree(
+                tool_input.get("directory", "."),
+                tool_input.get("max_depth", DEFAULT_TREE_DEPTH),
+                tool_input.get("pattern"),
+                tool_input.get("page_size", DEFAULT_TREE_PAGE),
+                tool_input.get("cursor")
+            )
         elif tool_name == "read_file":
-            return self.read_file(tool_input["file_path"])
+            return self.read_file(tool_input["file_path"], tool_input.get("mode", "full"))
         elif tool_name == "batch_read_files":
-            return self.batch_read_files(tool_input["file_paths"])
+            return self.batch_read_files(tool_input["file_paths"], tool_input.get("cursor", 0))
+        elif tool_name == "read_file_range":
+            return self.read_file_range(
+                tool_input["file_path"],
+                tool_input.get("start_line"),
+                tool_input.get("num_lines"),
+                tool_input.get("offset"),
+                tool_input.get("length"),
+                tool_input.get("cursor")
+            )
+        elif tool_name == "find_symbol":
+            return self.find_symbol(tool_input["name"])
+        elif tool_name == "list_module_symbols":
+            return self.list_module_symbols(tool_input["file_path"])
+        elif tool_name == "read_chunk":
+            return self.read_chunk(
+                tool_input.get("file_path"),
+                tool_input.get("chunk"),
+                tool_input.get("offset", 0),
+                tool_input.get("length", MAX_SLICE_BYTES)
+            )
         else:
             return f"Unknown tool: {tool_name}"
 
@@ -132,22 +486,103 @@ use_tools = [
             "required": ["directory"]
         }
     },
+    {
+        "name": "list_tree",
+        "description": "List a directory tree recursively: 'path/' lines for directories and 'path<TAB>size in bytes' "
+                       "for files. Use this to map the project in one call instead of listing each directory.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "directory": {"type": "string", "description": "Directory path relative to repo root (default '.')"},
+                "max_depth": {"type": "integer", "description": f"Directory levels to descend (default {DEFAULT_TREE_DEPTH})"},
+                "pattern": {"type": "string", "description": "Glob such as '*.py'; only matching files are listed"},
+                "page_size": {"type": "integer", "description": f"Entries per page (default {DEFAULT_TREE_PAGE})"},
+                "cursor": {"type": "string", "description": "Cursor from a previous list_tree result"}
+            }
+        }
+    },
     {
         "name": "read_file",
-        "description": "Read a file's content within the current repo.",
+        "description": "Read a file's content within the current repo. For Python files, mode 'outline' returns "
+                       "only the module docstring, imports, constants, and class and function signatures with "
+                       "docstrings and line ranges, at a fraction of the tokens.",
         "input_schema": {
             "type": "object",
-            "properties": {"file_path": {"type": "string", "description": "File path relative to repo root"}},
+            "properties": {
+                "file_path": {"type": "string", "description": "File path relative to repo root"},
+                "mode": {"type": "string", "enum": ["full", "outline"], "description": "Default 'full'"}
+            },
             "required": ["file_path"]
         }
     },
     {
     "name": "batch_read_files",
-    "description": "Read multiple files' contents within the repo.",
+    "description": "Read multiple files' contents within the repo. Large batches are truncated; the last "
+                   "element then gives a cursor to continue from.",
     "input_schema": {
         "type": "object",
-        "properties": {"file_paths": {"type": "array", "items": {"type": "string"}}},
+        "properties": {
+            "file_paths": {"type": "array", "items": {"type": "string"}},
+            "cursor": {"type": "integer", "description": "Index into file_paths to resume a truncated batch from"}
+        },
         "required": ["file_paths"]
     }
-  }
-]
\ No newline at end of file
+  },
+    {
+        "name": "read_file_range",
+        "description": "Read part of a file: a line window (start_line, num_lines) or a byte window (offset, length), "
+                       f"at most {MAX_RANGE_BYTES} bytes. If more follows, the result ends with a cursor; pass it "
+                       "back with the same file_path to read the next window.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "file_path": {"type": "string", "description": "File path relative to repo root"},
+                "start_line": {"type": "integer", "description": "First line to return, starting at 1"},
+                "num_lines": {"type": "integer", "description": f"Number of lines (default {DEFAULT_RANGE_LINES})"},
+                "offset": {"type": "integer", "description": "Byte offset to start at, for a byte window"},
+                "length": {"type": "integer", "description": "Number of bytes, for a byte window"},
+                "cursor": {"type": "string", "description": "Cursor from a previous read_file_range result"}
+            },
+            "required": ["file_path"]
+        }
+    },
+    {
+        "name": "read_chunk",
+        "description": "Read one source file as packed in the chunks (by file_path), or a byte slice of a chunk file "
+                       "(by chunk, offset and length), without reading the whole chunk. chunks/index.json lists "
+                       "every packed file with its chunk, byte offset and line range. Use it to revisit chunks "
+                       "already read; it does not count as reading a chunk for the analysis.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "file_path": {"type": "string", "description": "Source file path relative to repo root"},
+                "chunk": {"type": "string", "description": "Chunk file name, e.g. chunk-0.txt"},
+                "offset": {"type": "integer", "description": "Byte offset into the chunk"},
+                "length": {"type": "integer", "description": f"Number of bytes to read (at most {MAX_SLICE_BYTES})"}
+            }
+        }
+    },
+    {
+        "name": "find_symbol",
+        "description": "Find where a class, function, method or constant is defined in the repo's Python and "
+                       "JavaScript/TypeScript sources. Returns 'path:line, kind, qualified name, signature' lines; "
+                       "follow up with read_file_range to read the definition.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "description": "Name such as 'Tools' or qualified name such as 'Tools.read_file'"}
+            },
+            "required": ["name"]
+        }
+    },
+    {
+        "name": "list_module_symbols",
+        "description": "List the classes, functions, methods and constants a Python or JavaScript/TypeScript file "
+                       "defines, with line numbers and signatures, without reading the file.",
+        "input_schema": {
+            "type": "object",
+            "properties": {"file_path": {"type": "string", "description": "File path relative to repo root"}},
+            "required": ["file_path"]
+        }
+    }
+]
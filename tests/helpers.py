@@ -0,0 +1,22 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+import anthropic
+
+
+def status_error(status, retry_after=None):
+    headers = {"retry-after": retry_after} if retry_after else {}
+    return anthropic.APIStatusError("error", response=MagicMock(status_code=status, headers=headers), body=None)
+
+
+def read_chunk_response(i, cached=0, written=0, uncached=0):
+    return SimpleNamespace(
+        content=[SimpleNamespace(type="tool_use", id=f"tool{i}", name="read_file",
+                                 input={"file_path": f"chunks/chunk-{i}.txt"})],
+        usage=SimpleNamespace(cache_read_input_tokens=cached, cache_creation_input_tokens=written,
+                              input_tokens=uncached, output_tokens=10)
+    )
+
+
+class FakeTools:
+    def handle_tool_call(self, tool_name, tool_input):
+        return f"content of {tool_input['file_path']}"
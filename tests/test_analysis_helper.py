@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from docdog.p1_analysis_helper import analyze_project, returned_chunks
+from docdog.tools import Tools
+
+
+def tool_use(tool_id, name, tool_input):
+    return SimpleNamespace(type="tool_use", id=tool_id, name=name, input=tool_input)
+
+
+class SlowTools:
+    """Tools stand-in whose calls sleep, so concurrent dispatch shows in the wall time."""
+
+    def __init__(self, delays):
+        self.delays = delays
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def handle_tool_call(self, tool_name, tool_input):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delays[tool_input["file_path"]])
+        with self.lock:
+            self.active -= 1
+        return f"content of {tool_input['file_path']}"
+
+
+class TestConcurrentToolCalls(unittest.TestCase):
+    def test_turn_runs_tool_calls_concurrently_in_order(self):
+        """Test that one turn's calls overlap and their results keep the call order"""
+        files = [f"chunks/chunk-{i}.txt" for i in range(6)]
+        delays = {path: 0.3 - 0.05 * i for i, path in enumerate(files)}
+        doc_tools = SlowTools(delays)
+        client = MagicMock()
+        client.messages.create.return_value = SimpleNamespace(content=[
+            tool_use(f"tool{i}", "read_file", {"file_path": path}) for i, path in enumerate(files)
+        ])
+
+        start = time.perf_counter()
+        messages, analyzed, iterations = analyze_project(
+            client, "model", [], [], doc_tools, [f"chunk-{i}.txt" for i in range(6)], max_iterations=3
+        )
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(iterations, 1)
+        self.assertEqual(len(analyzed), 6)
+        self.assertGreater(doc_tools.max_active, 1)
+        self.assertLess(elapsed, sum(delays.values()) * 0.75)
+        results = messages[-1]["content"]
+        self.assertEqual([r["tool_use_id"] for r in results], [f"tool{i}" for i in range(6)])
+        self.assertEqual([r["content"] for r in results], [f"content of {path}" for path in files])
+
+    def test_tool_error_ends_analysis(self):
+        """Test that an exception from a tool call stops the analysis loop as before"""
+        doc_tools = MagicMock()
+        doc_tools.handle_tool_call.side_effect = RuntimeError("boom")
+        client = MagicMock()
+        client.messages.create.return_value = SimpleNamespace(content=[
+            tool_use("tool0", "read_file", {"file_path": "chunks/chunk-0.txt"})
+        ])
+        messages, _, iterations = analyze_project(client, "model", [], [], doc_tools, ["chunk-0.txt"], 3)
+        self.assertEqual(iterations, 0)
+        self.assertEqual(messages[-1]["role"], "assistant")
+
+
+
+class TestReturnedChunks(unittest.TestCase):
+    def test_only_chunks_returned_in_full_count(self):
+        """Test that failed reads and files left behind a batch cursor are not counted as analyzed"""
+        expected = ["chunk-0.txt", "chunk-1.txt", "chunk-2.txt"]
+        self.assertEqual(returned_chunks("read_file", {"file_path": "chunks/chunk-0.txt"}, "text", expected),
+                         {"chunk-0.txt"})
+        self.assertEqual(returned_chunks("read_file", {"file_path": "chunks/chunk-0.txt"},
+                                         "Error reading file: missing", expected), set())
+        batch = json.dumps([
+            {"file": "chunks/chunk-0.txt", "content": "text"},
+            {"file": "chunks/chunk-1.txt", "error": "Error: File ignored!"},
+            {"truncated": True, "cursor": 2}
+        ])
+        self.assertEqual(returned_chunks("batch_read_files", {"file_paths": []}, batch, expected), {"chunk-0.txt"})
+        self.assertEqual(returned_chunks("batch_read_files", {"file_paths": []}, "not json", expected), set())
+
+    def test_batch_over_the_output_cap_marks_only_the_chunk_it_returned(self):
+        """Test that a chunk larger than the batch cap is returned whole and the one behind the cursor is not marked"""
+        with tempfile.TemporaryDirectory() as root:
+            os.mkdir(os.path.join(root, "chunks"))
+            for i in range(2):
+                with open(os.path.join(root, "chunks", f"chunk-{i}.txt"), "w") as f:
+                    f.write(f"chunk {i}\n" * 2000)
+            doc_tools = Tools(root, batch_max_bytes=1024)
+            client = MagicMock()
+            client.messages.create.return_value = SimpleNamespace(content=[
+                tool_use("tool0", "batch_read_files", {"file_paths": ["chunks/chunk-0.txt", "chunks/chunk-1.txt"]})
+            ])
+            messages, analyzed, _ = analyze_project(
+                client, "model", [], [], doc_tools, ["chunk-0.txt", "chunk-1.txt"], max_iterations=1
+            )
+            doc_tools.close()
+        items = json.loads(messages[-1]["content"][0]["content"])
+        self.assertEqual(items[0]["content"], "chunk 0\n" * 2000)
+        self.assertEqual(items[1]["cursor"], 1)
+        self.assertEqual(analyzed, {"chunk-0.txt"})
+
+    def test_batch_chunk_mentioning_error_counts(self):
+        """Test that a chunk whose source text contains "Error" is returned as content and counted"""
+        with tempfile.TemporaryDirectory() as root:
+            os.mkdir(os.path.join(root, "chunks"))
+            for i, body in enumerate(['raise ValueError("x")\n', "print('ok')\n"]):
+                with open(os.path.join(root, "chunks", f"chunk-{i}.txt"), "w") as f:
+                    f.write(f"File: mod{i}.py\n{body}")
+            doc_tools = Tools(root)
+            tool_input = {"file_paths": ["chunks/chunk-0.txt", "chunks/chunk-1.txt"]}
+            result = doc_tools.handle_tool_call("batch_read_files", tool_input)
+            doc_tools.close()
+        self.assertIn("ValueError", json.loads(result)[0]["content"])
+        self.assertEqual(returned_chunks("batch_read_files", tool_input, result, ["chunk-0.txt", "chunk-1.txt"]),
+                         {"chunk-0.txt", "chunk-1.txt"})
+
+    def test_chunk_paged_with_read_file_range_counts_once_covered(self):
+        """Test that a chunk read in read_file_range windows is analyzed once the windows cover all of it"""
+        with tempfile.TemporaryDirectory() as root:
+            os.mkdir(os.path.join(root, "chunks"))
+            with open(os.path.join(root, "chunks", "chunk-0.txt"), "w") as f:
+                f.write("line of chunk 0\n" * 10000)
+            doc_tools = Tools(root)
+            windows = [{"file_path": "chunks/chunk-0.txt", "offset": offset, "length": 65536}
+                       for offset in (65536, 0, 131072)]
+            client = MagicMock()
+            client.messages.create.side_effect = [
+                SimpleNamespace(content=[tool_use(f"tool{i}", "read_file_range", window)])
+                for i, window in enumerate(windows)
+            ]
+            messages, analyzed, iterations = analyze_project(
+                client, "model", [], [], doc_tools, ["chunk-0.txt"], max_iterations=5
+            )
+            doc_tools.close()
+        self.assertEqual((analyzed, iterations), ({"chunk-0.txt"}, 3))
+        self.assertTrue(messages[-1]["content"][0]["content"].endswith("[end of file]"))
+
+    def test_read_file_range_windows(self):
+        """Test that read_file_range windows count a chunk only when they leave no gap"""
+        windows = {}
+
+        def read(start, end, size=300):
+            result = f"[chunks/chunk-0.txt bytes {start}-{end} of {size}]\ntext\n[end of file]"
+            return returned_chunks("read_file_range", {"file_path": "chunks/chunk-0.txt"}, result,
+                                   ["chunk-0.txt"], windows)
+        self.assertEqual(read(200, 300), set())
+        self.assertEqual(read(0, 100), set())
+        self.assertEqual(read(100, 200), {"chunk-0.txt"})
+        self.assertEqual(returned_chunks("read_file_range", {"file_path": "chunks/chunk-0.txt"},
+                                         "[chunks/chunk-0.txt lines 1-9, bytes 0-300 of 300]\ntext", ["chunk-0.txt"],
+                                         {}), {"chunk-0.txt"})
+        self.assertEqual(returned_chunks("read_file_range", {"file_path": "chunks/chunk-0.txt"},
+                                         "Error reading file: gone", ["chunk-0.txt"], {}), set())
+
+
+if __name__ == '__main__':
+    unittest.main()
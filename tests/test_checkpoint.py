@@ -0,0 +1,121 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+from docdog.chunking import chunk_project
+from docdog.checkpoint import chunk_hashes, load_checkpoint, remove_checkpoint, save_checkpoint
+from docdog.p1_analysis_helper import analyze_project
+from tests.helpers import FakeTools, read_chunk_response, status_error
+
+CHUNKS = [f"chunk-{i}.txt" for i in range(3)]
+HASHES = {name: f"hash of {name}" for name in CHUNKS}
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, ".docdog", "checkpoint.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_round_trip_and_chunk_mismatch(self):
+        """Test saving and loading state, and refusing a checkpoint for other chunks or chunk contents"""
+        messages = [{"role": "user", "content": "Initial prompt"}]
+        save_checkpoint(self.path, messages, {"chunk-1.txt"}, 4, HASHES)
+        self.assertEqual(load_checkpoint(self.path, dict(reversed(HASHES.items()))), (messages, {"chunk-1.txt"}, 4))
+        self.assertIsNone(load_checkpoint(self.path, {name: HASHES[name] for name in CHUNKS[:2]}))
+        self.assertIsNone(load_checkpoint(self.path, {**HASHES, "chunk-2.txt": "hash of rebuilt chunk-2.txt"}))
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["checkpoint.json"])
+
+        remove_checkpoint(self.path)
+        self.assertIsNone(load_checkpoint(self.path, HASHES))
+
+    def test_chunk_hashes_follow_content(self):
+        """Test that a chunk rebuilt under the same name with other content gets another hash"""
+        for name, text in (("chunk-0.txt", "alpha"), ("chunk-1.txt", "beta")):
+            with open(os.path.join(self.root, name), "w") as f:
+                f.write(text)
+        before = chunk_hashes(self.root, ["chunk-0.txt", "chunk-1.txt"])
+        with open(os.path.join(self.root, "chunk-1.txt"), "w") as f:
+            f.write("gamma")
+        after = chunk_hashes(self.root, ["chunk-0.txt", "chunk-1.txt"])
+        self.assertEqual(before["chunk-0.txt"], after["chunk-0.txt"])
+        self.assertNotEqual(before["chunk-1.txt"], after["chunk-1.txt"])
+
+    def test_resume_after_rechunking_with_changed_docdog_outputs(self):
+        """Test that docdog's own log and README are not chunked, so re-chunking keeps the checkpoint usable"""
+        chunks_dir = os.path.join(self.root, "chunks")
+        outputs = {"docdog_complete_log.txt": "first run log\n", "README.md": "# Degraded README\n"}
+        with open(os.path.join(self.root, "app.py"), "w") as f:
+            f.write("def main():\n    return 1\n")
+
+        def rechunk():
+            for name, text in outputs.items():
+                with open(os.path.join(self.root, name), "w") as f:
+                    f.write(text)
+            config = {"max_tokens_per_chunk": 1000, "allowed_extensions": [".py", ".md", ".txt"],
+                      "enumeration": "walk", "skip_paths": list(outputs)}
+            chunk_files = chunk_project(self.root, chunks_dir, config)
+            return chunk_hashes(chunks_dir, [os.path.basename(f) for f in chunk_files])
+
+        hashes = rechunk()
+        with open(os.path.join(chunks_dir, "chunk-0.txt")) as f:
+            self.assertNotIn("first run log", f.read())
+        save_checkpoint(self.path, [], {"chunk-0.txt"}, 1, hashes)
+
+        outputs = {"docdog_complete_log.txt": "second run log\n", "README.md": "# Other README\n"}
+        self.assertEqual(load_checkpoint(self.path, rechunk()), ([], {"chunk-0.txt"}, 1))
+
+    def test_missing_project_root_is_not_created(self):
+        """Test that a checkpoint under a missing directory tree is skipped, not created"""
+        path = os.path.join(self.root, "missing", ".docdog", "checkpoint.json")
+        with self.assertLogs("docdog.checkpoint", level="WARNING"):
+            save_checkpoint(path, [], set(), 1, HASHES)
+        self.assertFalse(os.path.exists(os.path.join(self.root, "missing")))
+
+    def test_interrupted_analysis_resumes_from_checkpoint(self):
+        """Test that a failed run leaves a checkpoint a second run continues from"""
+        client = MagicMock()
+        client.messages.create.side_effect = [read_chunk_response(0), read_chunk_response(1), status_error(400)]
+        messages = [{"role": "user", "content": "Initial prompt"}]
+        _, analyzed, iteration = analyze_project(
+            client, "model", messages, [], FakeTools(), CHUNKS, max_iterations=15,
+            checkpoint_path=self.path, max_retries=0, chunk_hashes=HASHES
+        )
+        self.assertEqual((analyzed, iteration), ({"chunk-0.txt", "chunk-1.txt"}, 2))
+
+        self.assertIsNone(load_checkpoint(self.path, {**HASHES, "chunk-0.txt": "hash of rebuilt chunk-0.txt"}))
+        messages, analyzed, iteration = load_checkpoint(self.path, HASHES)
+        self.assertEqual(len(messages), 5)
+        client = MagicMock()
+        client.messages.create.side_effect = [read_chunk_response(2)]
+        messages, analyzed, iteration = analyze_project(
+            client, "model", messages, [], FakeTools(), CHUNKS, max_iterations=15,
+            analyzed_chunks=analyzed, analysis_iteration=iteration, checkpoint_path=self.path, chunk_hashes=HASHES
+        )
+        self.assertEqual((analyzed, iteration), (set(CHUNKS), 3))
+        self.assertEqual(client.messages.create.call_count, 1)
+        sent = client.messages.create.call_args.kwargs["messages"]
+        self.assertEqual([m["role"] for m in sent], ["user", "assistant", "user", "assistant", "user"])
+        with open(self.path) as f:
+            self.assertEqual(json.load(f)["analysis_iteration"], 3)
+
+    def test_transient_error_does_not_end_analysis(self):
+        """Test that a transient API error is retried instead of ending Phase 1"""
+        client = MagicMock()
+        client.messages.create.side_effect = [
+            read_chunk_response(0), status_error(529), read_chunk_response(1), read_chunk_response(2)
+        ]
+        with patch("docdog.retry.time.sleep") as sleep:
+            _, analyzed, iteration = analyze_project(
+                client, "model", [{"role": "user", "content": "Initial prompt"}], [], FakeTools(), CHUNKS, 15
+            )
+        self.assertEqual((analyzed, iteration), (set(CHUNKS), 3))
+        self.assertEqual(sleep.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
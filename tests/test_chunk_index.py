@@ -0,0 +1,56 @@
+import os
+import shutil
+import tempfile
+import unittest
+from docdog.chunk_index import ChunkIndex, save_chunk_index, read_mapped
+from docdog.tools import Tools
+
+class TestChunkIndex(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.chunks_dir = os.path.join(self.root, "chunks")
+        os.makedirs(self.chunks_dir)
+        header = b"=" * 40 + b"\nFile: src/app.py\n" + b"=" * 40 + b"\n"
+        body = b"def main():\n    pass\n"
+        with open(os.path.join(self.chunks_dir, "chunk-0.txt"), "wb") as f:
+            f.write(header + body + b"\n\n")
+        entry = {"chunk": "chunk-0.txt", "offset": len(header), "length": len(body), "line": 4, "lines": 2}
+        save_chunk_index(self.chunks_dir, {
+            "src/app.py": entry,
+            "copy/app.py": dict(entry, duplicate_of="src/app.py")
+        })
+        self.tools = Tools(self.root)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_read_mapped(self):
+        """Test memory-mapped reads, including ranges past the end of the file"""
+        path = os.path.join(self.chunks_dir, "chunk-0.txt")
+        self.assertEqual(read_mapped(path, 0, 5), b"=====")
+        self.assertEqual(read_mapped(path, 10 ** 6, 5), b"")
+        self.assertEqual(read_mapped(path, 0, 0), b"")
+
+    def test_read_packed_file(self):
+        """Test serving one packed file, and its aliases, straight from the index"""
+        result = self.tools.handle_tool_call("read_chunk", {"file_path": "src/app.py"})
+        self.assertEqual(result, "src/app.py (chunk-0.txt, lines 4-5):\ndef main():\n    pass\n")
+        self.assertIn("def main():", self.tools.read_chunk(file_path="./copy/app.py"))
+        self.assertTrue(self.tools.read_chunk(file_path="missing.py").startswith("Error"))
+
+    def test_read_chunk_slice(self):
+        """Test byte slices of a chunk and rejection of non-chunk files"""
+        self.assertEqual(self.tools.read_chunk(chunk="chunk-0.txt", offset=41, length=16), "File: src/app.py")
+        self.assertTrue(self.tools.read_chunk(chunk="../secrets.txt").startswith("Error"))
+        self.assertTrue(self.tools.read_chunk().startswith("Error"))
+
+    def test_index_reloaded_when_changed(self):
+        """Test that a rewritten index is picked up without restarting"""
+        index = ChunkIndex(self.chunks_dir)
+        self.assertIsNotNone(index.locate("src/app.py"))
+        save_chunk_index(self.chunks_dir, {})
+        os.utime(os.path.join(self.chunks_dir, "index.json"), ns=(1, 1))
+        self.assertIsNone(index.locate("src/app.py"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,14 @@
 import os
+import json
+import hashlib
 import shutil
 import unittest
 from unittest.mock import patch, MagicMock, mock_open
-from docdog.chunking import chunk_project
+from types import SimpleNamespace
+from docdog.chunking import (
+    chunk_project, make_token_batches, count_tokens, ChunkWriter, assign_chunks, is_generated, looks_binary,
+    TokenEstimator, scan_files, write_assigned_chunks
+)
 
 class TestChunking(unittest.TestCase):
     def setUp(self):
@@ -23,39 +29,46 @@ class TestChunking(unittest.TestCase):
         if os.path.exists(self.chunks_dir):
             shutil.rmtree(self.chunks_dir)
     
-    @patch('shutil.rmtree')
-    @patch('os.makedirs')
-    @patch('os.path.exists')
-    @patch('docdog.chunking.TokenBasedChunker')
-    def test_chunk_project_with_tokenbased_chunker(self, mock_chunker, mock_exists, mock_makedirs, mock_rmtree):
-        mock_exists.return_value = True
-        instance = mock_chunker.return_value
-        instance.process_directory.return_value = None
-        mock_files = ["chunk-0.txt", "chunk-1.txt"]
+    def _mock_loader(self, mock_loader, file_names, tokens):
+        paths = []
+        for name in file_names:
+            path = os.path.join(self.test_dir, name)
+            if not os.path.exists(path):
+                with open(path, "w") as f:
+                    f.write(f"contents of {name}\n")
+            paths.append(path)
+        instance = mock_loader.return_value
+        self._collect(instance, paths)
+        instance.binary_exts = {"exe", "dll", "so"}
+        instance.count_tokens.return_value = tokens
+        instance._filter_api_keys.side_effect = lambda text: text
+        instance.current_walk_root = None
+        return instance
+
+    def _collect(self, instance, paths):
+        instance.collect_paths.side_effect = lambda root, backend: [(path, os.stat(path)) for path in paths]
+
+    @patch('docdog.chunking.ProjectLoader')
+    def test_chunk_project_with_tokenbased_chunker(self, mock_loader):
+        instance = self._mock_loader(mock_loader, ["test.py", "test.md"], 50000)
         
-        instance.loaded_files = [
-            ("test.py", b"test content", 0),
-            ("test.md", b"more content", 0)
-        ]
-        instance.count_tokens.return_value = 100
+        result = chunk_project(self.test_dir, self.chunks_dir)
         
-        with patch('os.listdir', return_value=mock_files):
-            result = chunk_project(self.test_dir, self.chunks_dir)
-            
-            mock_chunker.assert_called()
-            
-            instance.process_directory.assert_called_with(self.test_dir)
-            
-            self.assertEqual(len(result), 2)
+        mock_loader.assert_called_once()
+        instance.collect_paths.assert_called_once_with(self.test_dir, "git")
+        self.assertEqual(len(result), 2)
+        self.assertEqual(instance.count_tokens.call_count, 2)
+        with open(result[1], encoding="utf-8") as f:
+            self.assertIn("File: " + os.path.join(self.test_dir, "test.py"), f.read())
     
     @patch('shutil.rmtree')
     @patch('os.makedirs')
     @patch('os.path.exists')
-    @patch('docdog.chunking.TokenBasedChunker')
+    @patch('docdog.chunking.ProjectLoader')
     @patch('docdog.chunking.ParallelChunker')
     def test_fallback_to_parallel_chunker(self, mock_parallel, mock_token, mock_exists, mock_makedirs, mock_rmtree):
         mock_exists.return_value = True
-        mock_token.side_effect = Exception("Token chunker failed")
+        mock_token.side_effect = Exception("Project loader failed")
         
         instance = mock_parallel.return_value
         instance.process_directory.return_value = None
@@ -78,105 +91,407 @@ class TestChunking(unittest.TestCase):
             if os.path.exists(empty_dir):
                 shutil.rmtree(empty_dir)
                     
-    @patch('shutil.rmtree')
-    @patch('os.makedirs')
-    @patch('os.path.exists')
-    @patch('docdog.chunking.TokenBasedChunker')
-    def test_default_config(self, mock_chunker, mock_exists, mock_makedirs, mock_rmtree):
+    @patch('docdog.chunking.ProjectLoader')
+    def test_default_config(self, mock_loader):
         """Test chunking with no config provided (should use defaults)"""
-        mock_exists.return_value = True
-        instance = mock_chunker.return_value
-        instance.process_directory.return_value = None
-        instance.loaded_files = [("test.py", b"content", 0)]
-        instance.count_tokens.return_value = 50
+        self._mock_loader(mock_loader, ["test.py"], 50)
         
-        with patch('os.listdir', return_value=["chunk-0.txt"]):
-            result = chunk_project(self.test_dir, self.chunks_dir, None)
-            
-            args, kwargs = mock_chunker.call_args_list[0]
-            self.assertEqual(kwargs['user_ignore'][0], "**/chunks/**")
-            self.assertTrue(any("**/venv/**" in ign for ign in kwargs['user_ignore']))
+        chunk_project(self.test_dir, self.chunks_dir, None)
+        
+        args, kwargs = mock_loader.call_args_list[0]
+        self.assertEqual(kwargs['user_ignore'][0], "**/chunks/**")
+        self.assertTrue(any("**/venv/**" in ign for ign in kwargs['user_ignore']))
     
-    @patch('docdog.chunking.TokenBasedChunker')
-    @patch('os.makedirs')
-    @patch('shutil.rmtree')
-    @patch('os.path.exists')
-    def test_output_dir_cleanup(self, mock_exists, mock_rmtree, mock_makedirs, mock_chunker):
+    @patch('docdog.chunking.ProjectLoader')
+    def test_output_dir_cleanup(self, mock_loader):
         """Test that the output directory is cleaned up before processing"""
-        mock_exists.return_value = True
-        instance = mock_chunker.return_value
-        instance.process_directory.return_value = None
-        instance.loaded_files = [("test.py", b"content", 0)]
-        instance.count_tokens.return_value = 50
+        self._mock_loader(mock_loader, ["test.py"], 50)
+        os.makedirs(self.chunks_dir, exist_ok=True)
+        stale = os.path.join(self.chunks_dir, "chunk-7.txt")
+        with open(stale, "w") as f:
+            f.write("stale")
         
-        with patch('os.listdir', return_value=["chunk-0.txt"]):
-            chunk_project(self.test_dir, self.chunks_dir)
-            mock_rmtree.assert_any_call(self.chunks_dir)
-            temp_dir = os.path.join(self.chunks_dir, "temp")
-            mock_rmtree.assert_any_call(temp_dir)
-    
-    @patch('shutil.rmtree')
-    @patch('os.makedirs')
-    @patch('os.path.exists')
-    @patch('docdog.chunking.TokenBasedChunker')
-    def test_temp_dir_cleanup(self, mock_chunker, mock_exists, mock_makedirs, mock_rmtree):
-        """Test that the temporary directory is cleaned up"""
-        mock_exists.return_value = True
-        analyzer = MagicMock()
-        analyzer.loaded_files = [("test.py", b"content", 0)]
-        analyzer.count_tokens.return_value = 50
+        result = chunk_project(self.test_dir, self.chunks_dir)
         
-        chunker = MagicMock()
-        chunker.process_directory.return_value = None
+        self.assertFalse(os.path.exists(stale))
+        self.assertEqual(result, [os.path.join(self.chunks_dir, "chunk-0.txt")])
+    
+    @patch('docdog.chunking.ProjectLoader')
+    def test_single_pass_without_temp_dir(self, mock_loader):
+        """Test that the project is loaded and tokenized only once"""
+        instance = self._mock_loader(mock_loader, ["test.py"], 50)
         
-        mock_chunker.side_effect = [analyzer, chunker]
+        chunk_project(self.test_dir, self.chunks_dir)
         
-        with patch('os.listdir', return_value=["chunk-0.txt"]):
-            chunk_project(self.test_dir, self.chunks_dir)
-            
-            temp_dir = os.path.join(self.chunks_dir, "temp")
-            mock_makedirs.assert_any_call(temp_dir, exist_ok=True)
-            
-            mock_rmtree.assert_any_call(temp_dir)
+        self.assertEqual(instance.collect_paths.call_count, 1)
+        self.assertEqual(instance.count_tokens.call_count, 1)
+        self.assertFalse(os.path.exists(os.path.join(self.chunks_dir, "temp")))
     
-    @patch('shutil.rmtree')
-    @patch('os.makedirs')
-    @patch('os.path.exists')
-    @patch('docdog.chunking.TokenBasedChunker')
-    def test_custom_max_tokens(self, mock_chunker, mock_exists, mock_makedirs, mock_rmtree):
+    @patch('docdog.chunking.ProjectLoader')
+    def test_custom_max_tokens(self, mock_loader):
         """Test with custom max_tokens_per_chunk value"""
-        mock_exists.return_value = True
         config = {
             "max_tokens_per_chunk": 75000,  
             "allowed_extensions": [".py", ".md"]
         }
+        self._mock_loader(mock_loader, ["a.py", "b.py", "c.md"], 40000)
         
-        instance = mock_chunker.return_value
-        instance.process_directory.return_value = None
-        instance.loaded_files = [("test.py", b"content", 0)]
-        instance.count_tokens.return_value = 100
+        result = chunk_project(self.test_dir, self.chunks_dir, config)
         
-        with patch('os.listdir', return_value=["chunk-0.txt"]):
-            chunk_project(self.test_dir, self.chunks_dir, config)
-            
-            calls = mock_chunker.call_args_list
-            self.assertEqual(len(calls), 2) 
-            
-            _, first_kwargs = calls[0]
-            self.assertEqual(first_kwargs['equal_chunks'], 1)
-            
-            _, second_kwargs = calls[1]
-            self.assertEqual(second_kwargs['equal_chunks'], 1)
+        _, kwargs = mock_loader.call_args
+        self.assertEqual(kwargs['user_unignore'], ["*.py", "*.md"])
+        self.assertEqual(len(result), 3)
+    
+    @patch('docdog.chunking.ProjectLoader')
+    def test_incremental_writes_manifest(self, mock_loader):
+        """Test that incremental mode records every file in the manifest"""
+        self._mock_loader(mock_loader, ["test.py", "test.md"], 30)
+        
+        result = chunk_project(self.test_dir, self.chunks_dir, {"incremental": True})
+        
+        with open(os.path.join(self.chunks_dir, "manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.assertEqual(sorted(manifest["files"]), ["test.md", "test.py"])
+        entry = manifest["files"]["test.py"]
+        self.assertEqual(entry["tokens"], 30)
+        self.assertEqual(entry["chunk"], 0)
+        self.assertEqual(entry["size"], os.path.getsize(os.path.join(self.test_dir, "test.py")))
+        self.assertEqual(result, [os.path.join(self.chunks_dir, "chunk-0.txt")])
+    
+    @patch('docdog.chunking.ProjectLoader')
+    def test_incremental_skips_unchanged_files(self, mock_loader):
+        """Test that a second incremental run only re-tokenizes changed files"""
+        config = {"incremental": True, "max_tokens_per_chunk": 100}
+        instance = self._mock_loader(mock_loader, ["a.py", "b.py", "c.py"], 60)
+        chunk_project(self.test_dir, self.chunks_dir, config)
+        self.assertEqual(instance.count_tokens.call_count, 3)
+        
+        manifest_path = os.path.join(self.chunks_dir, "manifest.json")
+        with open(manifest_path, encoding="utf-8") as f:
+            files = json.load(f)["files"]
+        untouched = [i for i in range(3) if i != files["b.py"]["chunk"]]
+        mtimes = {i: os.stat(os.path.join(self.chunks_dir, f"chunk-{i}.txt")).st_mtime_ns for i in untouched}
+        
+        with open(os.path.join(self.test_dir, "b.py"), "w") as f:
+            f.write("changed contents of b.py\n")
+        chunk_project(self.test_dir, self.chunks_dir, config)
+        
+        self.assertEqual(instance.count_tokens.call_count, 4)
+        for i in untouched:
+            self.assertEqual(os.stat(os.path.join(self.chunks_dir, f"chunk-{i}.txt")).st_mtime_ns, mtimes[i])
+        with open(os.path.join(self.chunks_dir, f"chunk-{files['b.py']['chunk']}.txt"), encoding="utf-8") as f:
+            self.assertIn("changed contents of b.py", f.read())
+    
+    @patch('docdog.chunking.ProjectLoader')
+    def test_incremental_removes_deleted_files(self, mock_loader):
+        """Test that deleted files drop out of the manifest and their chunk"""
+        config = {"incremental": True, "max_tokens_per_chunk": 100}
+        instance = self._mock_loader(mock_loader, ["a.py", "b.py"], 60)
+        chunk_project(self.test_dir, self.chunks_dir, config)
+        
+        self._collect(instance, [os.path.join(self.test_dir, "a.py")])
+        result = chunk_project(self.test_dir, self.chunks_dir, config)
+        
+        with open(os.path.join(self.chunks_dir, "manifest.json"), encoding="utf-8") as f:
+            self.assertEqual(list(json.load(f)["files"]), ["a.py"])
+        self.assertEqual(len(result), 1)
+        self.assertEqual(len([f for f in os.listdir(self.chunks_dir) if f.startswith("chunk-")]), 1)
+    
+    @patch('docdog.chunking.ProjectLoader')
+    def test_incremental_stale_manifest_removes_old_chunks(self, mock_loader):
+        """Test that a rebuild after a settings change leaves no chunk files of the old plan behind"""
+        self._mock_loader(mock_loader, ["a.py", "b.py", "c.py"], 60)
+        chunk_project(self.test_dir, self.chunks_dir, {"incremental": True, "max_tokens_per_chunk": 100})
+        self.assertEqual(len([f for f in os.listdir(self.chunks_dir) if f.startswith("chunk-")]), 3)
+        
+        result = chunk_project(self.test_dir, self.chunks_dir, {"incremental": True, "max_tokens_per_chunk": 1000})
+        
+        self.assertEqual(result, [os.path.join(self.chunks_dir, "chunk-0.txt")])
+        self.assertEqual([f for f in os.listdir(self.chunks_dir) if f.startswith("chunk-")], ["chunk-0.txt"])
+    
+    @patch('docdog.chunking.ProjectLoader')
+    def test_file_changed_between_scan_and_write(self, mock_loader):
+        """Test that a file edited after the scan is written as it is now, with a matching hash and token count"""
+        instance = self._mock_loader(mock_loader, ["a.py"], 10)
+        entries, changed = scan_files(instance, self.test_dir, {})
+        num_chunks = assign_chunks(entries, 0, 1000, changed)
+        with open(os.path.join(self.test_dir, "a.py"), "w") as f:
+            f.write("edited contents of a.py\n")
+        instance.count_tokens.return_value = 25
+        os.makedirs(self.chunks_dir)
+        
+        with self.assertLogs('docdog.chunking', level='WARNING') as logs:
+            write_assigned_chunks(instance, self.test_dir, self.chunks_dir, entries, num_chunks, range(num_chunks))
+        
+        self.assertIn("a.py changed while chunking", "\n".join(logs.output))
+        self.assertEqual(entries["a.py"]["hash"], hashlib.sha256(b"edited contents of a.py\n").hexdigest())
+        self.assertEqual(entries["a.py"]["tokens"], 25)
+        with open(os.path.join(self.chunks_dir, "chunk-0.txt"), encoding="utf-8") as f:
+            self.assertIn("edited contents of a.py", f.read())
+    
+    def test_chunk_writer_rolls_over_at_budget(self):
+        """Test that the streaming writer starts a new chunk when the budget would overflow"""
+        os.makedirs(self.chunks_dir, exist_ok=True)
+        loader = SimpleNamespace(current_walk_root=None)
+        writer = ChunkWriter(loader, self.chunks_dir, 100)
+        
+        writer.add("a.py", "alpha", 60)
+        writer.add("b.py", "beta", 30)
+        writer.add("c.py", "gamma", 20)
+        writer.add("d.py", "delta", 500)
+        chunk_files = writer.close()
+        
+        self.assertEqual([os.path.basename(f) for f in chunk_files], ["chunk-0.txt", "chunk-1.txt", "chunk-2.txt"])
+        with open(chunk_files[0], encoding="utf-8") as f:
+            first = f.read()
+        self.assertIn("CHUNK 1\n", first)
+        self.assertIn("File: a.py", first)
+        self.assertIn("File: b.py", first)
+        with open(chunk_files[2], encoding="utf-8") as f:
+            self.assertIn("File: d.py", f.read())
+    
+    def test_assign_chunks_first_fit_decreasing(self):
+        """Test that whole files are packed first-fit-decreasing into the fewest chunks"""
+        entries = {name: {"tokens": tokens, "chunk": None} for name, tokens in
+                   [("a", 30), ("b", 60), ("c", 20), ("d", 50), ("e", 40), ("f", 250)]}
+        
+        num_chunks = assign_chunks(entries, 0, 100, set(entries))
+        
+        self.assertEqual(num_chunks, 3)
+        self.assertEqual(entries["f"]["chunk"], 0)
+        self.assertEqual(entries["b"]["chunk"], entries["e"]["chunk"])
+        self.assertEqual(entries["d"]["chunk"], entries["a"]["chunk"])
+        self.assertEqual(entries["d"]["chunk"], entries["c"]["chunk"])
+    
+    @patch('docdog.chunking.ProjectLoader')
+    def test_packing_strategies(self, mock_loader):
+        """Test that ffd packing needs fewer chunks than streaming in walk order"""
+        instance = self._mock_loader(mock_loader, ["a.py", "b.py", "c.py", "d.py"], 0)
+        tokens = {"a.py": 60, "b.py": 50, "c.py": 40, "d.py": 50}
+        instance.count_tokens.side_effect = lambda text: tokens[text.split()[-1]]
+        
+        streamed = chunk_project(self.test_dir, self.chunks_dir, {"max_tokens_per_chunk": 100, "packing": "stream"})
+        packed = chunk_project(self.test_dir, self.chunks_dir, {"max_tokens_per_chunk": 100})
+        
+        self.assertEqual(len(streamed), 3)
+        self.assertEqual(len(packed), 2)
+        with open(packed[0], encoding="utf-8") as f:
+            first = f.read()
+        self.assertIn("CHUNK 1 OF 2", first)
+        self.assertIn("a.py", first)
+        self.assertIn("c.py", first)
+    
+    def _write(self, name, text):
+        with open(os.path.join(self.test_dir, name), "w") as f:
+            f.write(text)
+    
+    @patch('docdog.chunking.ProjectLoader')
+    def test_duplicates_folded_into_aliases(self, mock_loader):
+        """Test that identical files are tokenized and written once, with their aliases listed"""
+        self._write("a.py", "shared = 1\n")
+        self._write("b.py", "shared = 1\n")
+        self._write("gen_pb2.py", "# Generated by the protocol buffer compiler.  DO NOT EDIT!\nx = 1\n")
+        instance = self._mock_loader(mock_loader, ["a.py", "b.py", "gen_pb2.py", "test.py"], 10)
+        
+        with self.assertLogs('docdog.chunking', level='INFO') as logs:
+            result = chunk_project(self.test_dir, self.chunks_dir)
+        
+        self.assertEqual(instance.count_tokens.call_count, 2)
+        with open(result[0], encoding="utf-8") as f:
+            content = f.read()
+        self.assertEqual(content.count("shared = 1"), 1)
+        self.assertIn("Identical copies: " + os.path.join(self.test_dir, "b.py"), content)
+        self.assertNotIn("gen_pb2.py", content)
+        summary = "\n".join(logs.output)
+        self.assertIn("Folded 1 duplicate files into aliases, saving 10 tokens and 11 bytes", summary)
+        self.assertIn("Skipped 1 generated files", summary)
+        self.assertIn("gen_pb2.py: generated-code header", summary)
+    
+    @patch('docdog.chunking.ProjectLoader')
+    def test_generated_files_kept_when_disabled(self, mock_loader):
+        """Test that skip_generated is its own setting, independent of dedupe"""
+        self._write("gen_pb2.py", "# Generated by the protocol buffer compiler.  DO NOT EDIT!\nx = 1\n")
+        self._mock_loader(mock_loader, ["gen_pb2.py", "test.py"], 10)
+        
+        result = chunk_project(self.test_dir, self.chunks_dir, {"skip_generated": False})
+        
+        with open(result[0], encoding="utf-8") as f:
+            self.assertIn("gen_pb2.py", f.read())
+    
+    @patch('docdog.chunking.ProjectLoader')
+    def test_duplicates_listed_when_streaming(self, mock_loader):
+        """Test that streaming mode lists the folded copies at the end of the last chunk"""
+        self._write("a.py", "shared = 1\n")
+        self._write("b.py", "shared = 1\n")
+        self._mock_loader(mock_loader, ["a.py", "b.py"], 10)
+        
+        result = chunk_project(self.test_dir, self.chunks_dir, {"packing": "stream"})
+        
+        with open(result[-1], encoding="utf-8") as f:
+            content = f.read()
+        self.assertEqual(content.count("shared = 1"), 1)
+        self.assertIn(os.path.join(self.test_dir, "b.py") + " -> " + os.path.join(self.test_dir, "a.py"), content)
+    
+    @patch('docdog.chunking.ProjectLoader')
+    def test_incremental_alias_promoted_when_original_changes(self, mock_loader):
+        """Test that an alias becomes a real entry once its original stops being identical"""
+        config = {"incremental": True}
+        self._write("a.py", "shared = 1\n")
+        self._write("b.py", "shared = 1\n")
+        self._mock_loader(mock_loader, ["a.py", "b.py"], 10)
+        chunk_project(self.test_dir, self.chunks_dir, config)
+        
+        self._write("a.py", "shared = 2\n")
+        result = chunk_project(self.test_dir, self.chunks_dir, config)
+        
+        with open(os.path.join(self.chunks_dir, "manifest.json"), encoding="utf-8") as f:
+            files = json.load(f)["files"]
+        self.assertNotIn("duplicate_of", files["b.py"])
+        self.assertEqual(files["b.py"]["tokens"], 10)
+        with open(result[0], encoding="utf-8") as f:
+            content = f.read()
+        self.assertIn("shared = 1", content)
+        self.assertIn("shared = 2", content)
+    
+    @patch('docdog.chunking.ProjectLoader')
+    def test_prefilter_skips_oversized_and_binary_files(self, mock_loader):
+        """Test that size caps and the binary sniff skip files before tokenizing and report them"""
+        self._write("big.json", "[" + "1, " * 200 + "1]")
+        self._write("blob.py", "x = 1\n\0\0\0")
+        config = {"max_file_bytes_by_extension": {".json": 100}}
+        instance = self._mock_loader(mock_loader, ["big.json", "blob.py", "test.py"], 10)
+        
+        with self.assertLogs('docdog.chunking', level='INFO') as logs:
+            result = chunk_project(self.test_dir, self.chunks_dir, config)
+        
+        self.assertEqual(instance.count_tokens.call_count, 1)
+        with open(result[0], encoding="utf-8") as f:
+            content = f.read()
+        self.assertNotIn("big.json", content)
+        self.assertNotIn("blob.py", content)
+        output = "\n".join(logs.output)
+        self.assertIn("Skipped 2 files before tokenizing", output)
+        self.assertIn("big.json: larger than 100 bytes", output)
+        self.assertIn("blob.py: binary", output)
+    
+    def test_looks_binary(self):
+        """Test the head sniff used to reject binary files"""
+        self.assertTrue(looks_binary(b"ELF\0\1\2"))
+        self.assertTrue(looks_binary(bytes(range(1, 32)) * 4))
+        self.assertFalse(looks_binary("caf\u00e9 = 'na\u00efve'\n".encode("utf-8")))
+        self.assertFalse(looks_binary(b"line one\r\n\tline two\n"))
+    
+    @patch('docdog.chunking.ProjectLoader')
+    def test_estimate_mode_skips_tokenizer(self, mock_loader):
+        """Test that estimate mode sizes files from their bytes without calling the tokenizer"""
+        self._write("a.py", "x" * 340)
+        self._write("b.md", "y" * 400)
+        instance = self._mock_loader(mock_loader, ["a.py", "b.md"], 999)
+        
+        with self.assertLogs('docdog.chunking', level='INFO') as logs:
+            chunk_project(self.test_dir, self.chunks_dir, {"token_counting": "estimate", "incremental": True})
+        
+        instance.count_tokens.assert_not_called()
+        with open(os.path.join(self.chunks_dir, "manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.assertEqual(manifest["files"]["a.py"]["tokens"], 100)
+        self.assertEqual(manifest["files"]["b.md"]["tokens"], 100)
+        self.assertEqual(manifest["settings"]["token_counting"], "estimate")
+        self.assertIn("Estimated tokens for 2 files", "\n".join(logs.output))
+    
+    def test_estimator_sample_correction(self):
+        """Test that exact samples scale later estimates of the same extension"""
+        estimator = TokenEstimator({".py": 4.0}, sample_rate=1.0)
+        loader = MagicMock()
+        loader.count_tokens.return_value = 50
+        window = [("a.py", {"size": 400, "hash": "00000000"}, "text")]
+        
+        self.assertEqual(estimator.count(loader, window), {"a.py": 50})
+        self.assertEqual(estimator.sampled_files, 1)
+        self.assertEqual(estimator.sample_abs_error, 50)
+        self.assertEqual(estimator.estimate("b.py", 800), 100)
+        self.assertEqual(estimator.estimate("c.md", 360), 100)
+        self.assertFalse(TokenEstimator().is_sampled("00000000"))
+    
+    def _assert_index_matches_sources(self):
+        with open(os.path.join(self.chunks_dir, "index.json"), encoding="utf-8") as f:
+            files = json.load(f)["files"]
+        for rel_path, entry in files.items():
+            with open(os.path.join(self.chunks_dir, entry["chunk"]), "rb") as f:
+                f.seek(entry["offset"])
+                packed = f.read(entry["length"])
+            with open(os.path.join(self.test_dir, rel_path), "rb") as f:
+                self.assertEqual(packed, f.read())
+        return files
+    
+    @patch('docdog.chunking.ProjectLoader')
+    def test_chunk_index_offsets(self, mock_loader):
+        """Test that the chunk index points at each file's exact bytes and lines in every packing mode"""
+        self._write("a.py", "one\ntwo\nthree")
+        self._write("b.py", "one\ntwo\nthree")
+        self._write("c.md", "caf\u00e9\n")
+        self._mock_loader(mock_loader, ["a.py", "b.py", "c.md", "test.py"], 40)
+        
+        for config in ({}, {"packing": "stream"}, {"incremental": True}):
+            chunk_project(self.test_dir, self.chunks_dir, dict(config, max_tokens_per_chunk=100))
+            files = self._assert_index_matches_sources()
+            self.assertEqual(sorted(files), ["a.py", "b.py", "c.md", "test.py"])
+            self.assertEqual(files["b.py"]["duplicate_of"], "a.py")
+            self.assertEqual(files["a.py"]["lines"], 3)
+            with open(os.path.join(self.chunks_dir, files["c.md"]["chunk"]), encoding="utf-8") as f:
+                lines = f.read().split("\n")
+            self.assertEqual(lines[files["c.md"]["line"] - 1], "caf\u00e9")
+        
+        self._write("c.md", "changed\n")
+        chunk_project(self.test_dir, self.chunks_dir, {"incremental": True, "max_tokens_per_chunk": 100})
+        self._assert_index_matches_sources()
+    
+    def test_is_generated(self):
+        """Test detection of generated-code headers"""
+        self.assertTrue(is_generated("// Code generated by protoc-gen-go. DO NOT EDIT.\npackage x\n"))
+        self.assertTrue(is_generated("# -*- coding: utf-8 -*-\n# @generated\n"))
+        self.assertTrue(is_generated("/**\n * @generated SignedSource<<abc>>\n */\n"))
+        self.assertTrue(is_generated("# Generated by the protocol buffer compiler.  DO NOT EDIT!\n# source: a.proto\n"))
+        self.assertFalse(is_generated("def main():\n    pass\n"))
+        self.assertFalse(is_generated("\n" * 10 + "# @generated\n"))
+        self.assertFalse(is_generated('"""Helpers for autogenerated IDs."""\n'))
+        self.assertFalse(is_generated("# Tables\n\nDo not edit this table by hand; code generated by tools goes elsewhere.\n"))
+        self.assertFalse(is_generated("x = 'written by @generated'  # do not edit\n"))
+    
+    def test_make_token_batches_balances_sizes(self):
+        """Test that token batches are balanced by text size"""
+        texts = {"a": "x" * 90, "b": "x" * 50, "c": "x" * 40, "d": "x" * 10}
+        
+        batches = make_token_batches(texts, 2)
+        
+        sizes = sorted(sum(len(text) for _, text in batch) for batch in batches)
+        self.assertEqual(sizes, [90, 100])
+        self.assertEqual(len(make_token_batches({"a": "x"}, 4)), 1)
+    
+    def test_count_tokens_parallel_matches_serial(self):
+        """Test that the process pool counts the same tokens as the serial loop"""
+        loader = SimpleNamespace(
+            encoding=None,
+            encoding_name="cl100k_base",
+            count_tokens=lambda text: len(text.split())
+        )
+        texts = {f"file{i}.py": "word " * (i + 1) for i in range(40)}
+        
+        serial = count_tokens(loader, texts, 1)
+        parallel = count_tokens(loader, texts, 2)
+        
+        self.assertEqual(parallel, serial)
+        self.assertEqual(serial["file9.py"], 10)
     
     @patch('shutil.rmtree')
     @patch('os.makedirs')
     @patch('os.path.exists')
-    @patch('docdog.chunking.TokenBasedChunker')
+    @patch('docdog.chunking.ProjectLoader')
     @patch('docdog.chunking.ParallelChunker')
     def test_both_chunkers_fail(self, mock_parallel, mock_token, mock_exists, mock_makedirs, mock_rmtree):
         """Test when both TokenBasedChunker and ParallelChunker fail"""
         mock_exists.return_value = True
-        mock_token.side_effect = Exception("Token chunker failed")
+        mock_token.side_effect = Exception("Project loader failed")
         mock_parallel.side_effect = Exception("Parallel chunker failed")
         
         result = chunk_project(self.test_dir, self.chunks_dir)
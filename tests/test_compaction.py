@@ -0,0 +1,115 @@
+import json
+import unittest
+from types import SimpleNamespace
+from docdog.compaction import COMPACTED_MARKER, compact_messages, estimate_tokens, summarize_chunk
+from docdog.p1_analysis_helper import analyze_project
+
+SEP = "=" * 40
+
+
+def chunk_text(index, body_lines=200):
+    body = "\n".join(f"    value_{i} = {i}" for i in range(body_lines))
+    return (
+        f"{'=' * 80}\nCHUNK {index + 1}\n{'=' * 80}\n\n"
+        f"{SEP}\nFile: pkg/mod{index}.py\n{SEP}\nimport os\n\nclass Store{index}:\n{body}\n\n"
+        f"def helper{index}():\n    pass\n\n"
+        f"{SEP}\nFile: web/app{index}.js\n{SEP}\nexport function start{index}() {{}}\n\n"
+    )
+
+
+def read_turn(tool_id, name, tool_input, result):
+    return [
+        {"role": "assistant", "content": [{"type": "tool_use", "id": tool_id, "name": name, "input": tool_input}]},
+        {"role": "user", "content": [{"type": "tool_result", "tool_use_id": tool_id, "content": result}]},
+    ]
+
+
+class TestSummarizeChunk(unittest.TestCase):
+    def test_lists_files_lines_and_definitions(self):
+        """Test the extractive summary of a chunk"""
+        summary = summarize_chunk("chunk-0.txt", chunk_text(0, body_lines=3))
+        lines = summary.split("\n")
+        self.assertTrue(lines[0].startswith(f"{COMPACTED_MARKER} chunk-0.txt was already analyzed"))
+        self.assertEqual(lines[1:], [
+            "- pkg/mod0.py (9 lines): Store0, helper0",
+            "- web/app0.js (1 lines): start0",
+        ])
+
+
+class TestCompactMessages(unittest.TestCase):
+    def setUp(self):
+        self.messages = [{"role": "user", "content": "Initial prompt"}]
+        self.messages += read_turn("t0", "read_file", {"file_path": "chunks/chunk-0.txt"}, chunk_text(0))
+        batch = json.dumps([
+            {"file": "chunks/chunk-1.txt", "content": chunk_text(1)},
+            {"file": "src/other.py", "content": "x = 1\n" * 300},
+        ])
+        self.messages += read_turn("t1", "batch_read_files", {"file_paths": ["chunks/chunk-1.txt", "src/other.py"]}, batch)
+        self.messages += read_turn("t2", "read_file", {"file_path": "chunks/chunk-2.txt"}, chunk_text(2))
+        self.analyzed = {"chunk-0.txt", "chunk-1.txt", "chunk-2.txt"}
+
+    def test_below_threshold_leaves_conversation_alone(self):
+        """Test that nothing changes under the threshold or when disabled"""
+        before = json.dumps(self.messages)
+        self.assertEqual(compact_messages(self.messages, self.analyzed, threshold=10 ** 9), 0)
+        self.assertEqual(compact_messages(self.messages, self.analyzed, threshold=0), 0)
+        self.assertEqual(json.dumps(self.messages), before)
+
+    def test_compacts_only_answered_chunk_results(self):
+        """Test that answered chunk results are summarized and the latest one is kept in full"""
+        before = estimate_tokens(self.messages)
+        saved = compact_messages(self.messages, self.analyzed, threshold=100)
+        self.assertGreater(saved, 0)
+        self.assertEqual(estimate_tokens(self.messages), before - saved)
+
+        self.assertTrue(self.messages[2]["content"][0]["content"].startswith(COMPACTED_MARKER))
+        items = json.loads(self.messages[4]["content"][0]["content"])
+        self.assertTrue(items[0]["compacted"])
+        self.assertIn("- pkg/mod1.py", items[0]["content"])
+        self.assertEqual(items[1]["content"], "x = 1\n" * 300)
+        self.assertEqual(self.messages[6]["content"][0]["content"], chunk_text(2))
+
+        self.assertEqual(compact_messages(self.messages, self.analyzed, threshold=100), 0)
+
+    def test_read_file_range_windows_of_analyzed_chunks_are_compacted(self):
+        """Test that answered read_file_range windows of an analyzed chunk are summarized too"""
+        window = f"[chunks/chunk-3.txt bytes 0-4000 of 8000]\n{chunk_text(3)}[more follows, cursor: bytes:4000]"
+        self.messages[1:1] = read_turn("t3", "read_file_range", {"file_path": "chunks/chunk-3.txt"}, window)
+        compact_messages(self.messages, self.analyzed | {"chunk-3.txt"}, threshold=100)
+        self.assertTrue(self.messages[2]["content"][0]["content"].startswith(COMPACTED_MARKER))
+        self.assertIn("- pkg/mod3.py", self.messages[2]["content"][0]["content"])
+
+    def test_unanalyzed_chunks_are_kept(self):
+        """Test that chunks not in analyzed_chunks keep their content"""
+        compact_messages(self.messages, {"chunk-1.txt"}, threshold=100)
+        self.assertEqual(self.messages[2]["content"][0]["content"], chunk_text(0))
+
+
+class TestAnalysisCompaction(unittest.TestCase):
+    def test_analysis_compacts_between_iterations(self):
+        """Test that analyze_project compacts consumed chunks and logs the savings"""
+        responses = [
+            SimpleNamespace(content=[SimpleNamespace(
+                type="tool_use", id=f"t{i}", name="read_file", input={"file_path": f"chunks/chunk-{i}.txt"}
+            )]) for i in range(3)
+        ]
+        client = SimpleNamespace(messages=SimpleNamespace(create=lambda **kwargs: responses.pop(0)))
+        doc_tools = SimpleNamespace(handle_tool_call=lambda name, tool_input: chunk_text(int(tool_input["file_path"][-5])))
+        messages = [{"role": "user", "content": "Initial prompt"}]
+
+        with self.assertLogs("docdog.p1_analysis_helper", level="INFO") as logs:
+            messages, analyzed, _ = analyze_project(
+                client, "model", messages, [], doc_tools, [f"chunk-{i}.txt" for i in range(3)],
+                max_iterations=5, compact_threshold=500
+            )
+
+        self.assertEqual(len(analyzed), 3)
+        results = [m["content"][0]["content"] for m in messages if m["role"] == "user" and m is not messages[0]]
+        self.assertTrue(results[0].startswith(COMPACTED_MARKER))
+        self.assertTrue(results[1].startswith(COMPACTED_MARKER))
+        self.assertEqual(results[2], chunk_text(2))
+        self.assertTrue(any("Compaction removed about" in line for line in logs.output))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import time
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from docdog.disk_cache import DiskCache, content_hash
+from docdog.tools import Tools
+
+class TestDiskCache(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.root, ".docdog", "cache")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_round_trip_keyed_by_content(self):
+        """Test that entries are found only for the same kind, path and content"""
+        cache = DiskCache(self.cache_dir)
+        key = cache.key("read_file", "a.py", content_hash("x = 1\n"))
+        self.assertIsNone(cache.get(key))
+        cache.put(key, "processed")
+        self.assertEqual(cache.get(key), "processed")
+        self.assertNotEqual(key, cache.key("read_file", "a.py", content_hash("x = 2\n")))
+        self.assertNotEqual(key, cache.key("read_file", "b.py", content_hash("x = 1\n")))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_prune_by_age_then_size(self):
+        """Test that pruning drops expired entries, then the least recently used ones"""
+        cache = DiskCache(self.cache_dir, max_bytes=250, max_age_days=7)
+        now = time.time()
+        ages = {"expired": 10, "old": 3, "middle": 2, "new": 1}
+        for name, days in ages.items():
+            key = cache.key("read_file", name, "0")
+            cache.put(key, "x" * 100)
+            os.utime(cache._path(key), (now - days * 86400, now - days * 86400))
+
+        self.assertEqual(cache.prune(), (2, 200))
+        remaining = [name for name in ages if cache.get(cache.key("read_file", name, "0"))]
+        self.assertEqual(remaining, ["middle", "new"])
+
+    def test_tools_reuse_processed_output_across_instances(self):
+        """Test that a new Tools instance serves Python file output from the disk cache"""
+        with open(os.path.join(self.root, "mod.py"), "w") as f:
+            f.write("def f():\n    \"\"\"Doc.\"\"\"\n    # note\n    pass\n")
+        first = Tools(self.root, disk_cache=DiskCache(self.cache_dir)).read_file("mod.py")
+        self.assertIn("Doc.", first)
+
+        tools = Tools(self.root, disk_cache=DiskCache(self.cache_dir))
+        with patch('docdog.tools.ast.parse') as mock_parse:
+            self.assertEqual(tools.read_file("mod.py"), first)
+            mock_parse.assert_not_called()
+        self.assertEqual(tools.cache_stats()["read_file"]["disk_hits"], 1)
+        self.assertTrue(tools.should_ignore(os.path.join(self.cache_dir, "ab", "abc")))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import os
+import shutil
+import tempfile
+import unittest
+from docdog.file_cache import StatValidatedCache, stat_signature
+from docdog.tools import Tools
+
+class TestStatValidatedCache(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.reads = []
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _write(self, name, text, mtime_ns=None):
+        path = os.path.join(self.root, name)
+        with open(path, "w") as f:
+            f.write(text)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+        return path
+
+    def _read(self, name):
+        self.reads.append(name)
+        with open(os.path.join(self.root, name)) as f:
+            return f.read()
+
+    def _cache(self, maxsize=128):
+        return StatValidatedCache(self._read, lambda name: os.path.join(self.root, name), maxsize)
+
+    def test_hit_until_file_changes(self):
+        """Test that entries are served until mtime or size changes, then refreshed alone"""
+        self._write("a.txt", "one", 1000)
+        self._write("b.txt", "bee", 1000)
+        cache = self._cache()
+        self.assertEqual(cache("a.txt"), "one")
+        self.assertEqual(cache("b.txt"), "bee")
+        self.assertEqual(cache("a.txt"), "one")
+
+        self._write("a.txt", "four", 1000)
+        self.assertEqual(cache("a.txt"), "four")
+        self._write("a.txt", "three", 2000)
+        self.assertEqual(cache("a.txt"), "three")
+        self.assertEqual(cache("b.txt"), "bee")
+
+        self.assertEqual(self.reads, ["a.txt", "b.txt", "a.txt", "a.txt"])
+        info = cache.cache_info()
+        self.assertEqual((info.hits, info.misses, info.invalidations, info.currsize), (2, 4, 2, 2))
+
+    def test_replaced_file_detected_by_inode(self):
+        """Test that a file swapped in with the same size and mtime is still refreshed"""
+        path = self._write("a.txt", "old", 1000)
+        cache = self._cache()
+        cache("a.txt")
+        replacement = self._write("new.txt", "new", 1000)
+        os.replace(replacement, path)
+        if stat_signature(path)[2] == 0:
+            self.skipTest("filesystem does not report inodes")
+        self.assertEqual(cache("a.txt"), "new")
+        self.assertEqual(cache.cache_info().invalidations, 1)
+
+    def test_evicts_least_recently_used(self):
+        """Test the entry-count bound and cache_clear"""
+        for name in ("a", "b", "c"):
+            self._write(name, name)
+        cache = self._cache(maxsize=2)
+        cache("a")
+        cache("b")
+        cache("a")
+        cache("c")
+        self.assertEqual(cache.cache_info().currsize, 2)
+        cache("a")
+        cache("b")
+        self.assertEqual(self.reads, ["a", "b", "c", "b"])
+        cache.cache_clear()
+        self.assertEqual(cache.cache_info()[:5], (0, 0, 0, 2, 0))
+
+    def test_byte_budget_evicts_large_entries_first(self):
+        """Test that the byte budget evicts by recency weighted by size"""
+        self._write("big", "x" * 3000)
+        self._write("small1", "s")
+        self._write("small2", "t")
+        self._write("huge", "h" * 20000)
+        cache = StatValidatedCache(self._read, lambda name: os.path.join(self.root, name), None, 3500)
+        cache("big")
+        cache("small1")
+        cache("small2")
+        self.assertEqual(cache.cache_info().currsize, 3)
+        self._write("medium", "m" * 500)
+        cache("medium")
+        info = cache.cache_info()
+        self.assertLessEqual(info.bytes, 3500)
+        cache("small1")
+        cache("small2")
+        self.assertEqual(self.reads, ["big", "small1", "small2", "medium"])
+        cache("huge")
+        self.assertEqual(cache.cache_info().currsize, 3)
+        cache("big")
+        self.assertEqual(self.reads[-2:], ["huge", "big"])
+
+    def test_tools_cache_stats(self):
+        """Test that Tools refreshes changed files and reports per-tool counters"""
+        self._write("a.txt", "one", 1000)
+        tools = Tools(self.root)
+        self.assertEqual(tools.read_file("a.txt"), "one")
+        self.assertEqual(tools.read_file("a.txt"), "one")
+        self._write("a.txt", "changed", 2000)
+        self.assertEqual(tools.read_file("a.txt"), "changed")
+        tools.list_files(".")
+        tools.list_files("./")
+
+        self.assertEqual(tools.read_file("./sub/../a.txt"), "changed")
+        stats = tools.cache_stats()
+        self.assertEqual(stats["read_file"]["hits"], 2)
+        self.assertEqual(stats["read_file"]["misses"], 2)
+        self.assertEqual(stats["read_file"]["invalidations"], 1)
+        self.assertEqual(stats["read_file"]["entries"], 1)
+        self.assertGreater(stats["read_file"]["bytes"], 0)
+        self.assertEqual(stats["list_files"], dict(stats["list_files"], hits=1, misses=1))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import os
+import time
+import shutil
+import asyncio
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+import anthropic
+from docdog.p1_map_reduce import map_reduce_analysis_async
+from docdog.p2_readme_generator import generate_readme
+
+
+def text_response(text):
+    return SimpleNamespace(content=[SimpleNamespace(type="text", text=text)])
+
+
+class FakeAsyncMessages:
+    """Async messages.create stand-in: each summary request sleeps, so concurrency shows in the wall time."""
+
+    def __init__(self, delay=0.2, fail_on=None, failures=None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.failures = failures
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+
+    async def create(self, **kwargs):
+        self.requests.append(kwargs)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            prompt = kwargs["messages"][-1]["content"]
+            chunk = prompt.split("CHUNK ", 1)[1].split("\n", 1)[0]
+            if chunk == self.fail_on:
+                if self.failures is None:
+                    raise RuntimeError("bad request")
+                if self.failures:
+                    self.failures -= 1
+                    raise anthropic.APIStatusError(
+                        "overloaded", response=MagicMock(status_code=529, headers={}), body=None
+                    )
+            return text_response(f"summary of chunk {chunk}")
+        finally:
+            self.active -= 1
+
+
+class TestMapReduceAnalysis(unittest.TestCase):
+    def setUp(self):
+        self.chunks_dir = tempfile.mkdtemp()
+        self.chunk_names = [f"chunk-{i}.txt" for i in range(12)]
+        for i, name in enumerate(self.chunk_names):
+            with open(os.path.join(self.chunks_dir, name), "w") as f:
+                f.write(f"CHUNK {i}\nFile: mod{i}.py\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.chunks_dir)
+
+    def analyze(self, fake, chunk_names=None, **kwargs):
+        return asyncio.run(map_reduce_analysis_async(
+            SimpleNamespace(messages=fake), "model", [{"role": "user", "content": "Initial prompt"}],
+            self.chunks_dir, chunk_names or self.chunk_names, "Summarize:", **kwargs
+        ))
+
+    def test_chunks_summarized_concurrently_then_synthesized(self):
+        """Test that summaries run in parallel and Phase 2 synthesizes from them"""
+        fake = FakeAsyncMessages()
+
+        start = time.perf_counter()
+        messages, analyzed, iterations = self.analyze(fake, list(reversed(self.chunk_names)), max_concurrency=12)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(analyzed, set(self.chunk_names))
+        self.assertEqual(iterations, 1)
+        self.assertGreater(fake.max_active, 1)
+        self.assertLess(elapsed, 12 * fake.delay / 2)
+        self.assertTrue(all(r["messages"][0]["content"].startswith("Summarize:\n\nCHUNK") for r in fake.requests))
+
+        summary_text = messages[-1]["content"][0]["text"]
+        self.assertEqual(messages[-1]["role"], "assistant")
+        positions = [summary_text.index(f"## chunk-{i}.txt\nsummary of chunk {i}\n") for i in range(11)]
+        self.assertEqual(positions, sorted(positions))
+
+        client = MagicMock()
+        client.messages.create.return_value = text_response("Final README: # Project")
+        readme, _, _ = generate_readme(client, "model", messages, analyzed, self.chunk_names)
+        self.assertEqual(readme, "# Project")
+        _, kwargs = client.messages.create.call_args
+        self.assertEqual([m["role"] for m in kwargs["messages"]], ["user", "assistant", "user"])
+
+    def test_failed_chunk_is_reported_missing(self):
+        """Test that a summary request failing with a permanent error leaves its chunk out of analyzed_chunks"""
+        fake = FakeAsyncMessages(delay=0, fail_on="3")
+        with self.assertLogs("docdog.p1_map_reduce", level="WARNING") as logs:
+            messages, analyzed, _ = self.analyze(fake)
+        self.assertEqual(analyzed, set(self.chunk_names) - {"chunk-3.txt"})
+        self.assertEqual(len(fake.requests), 12)
+        self.assertNotIn("## chunk-3.txt", messages[-1]["content"][0]["text"])
+        self.assertTrue(any("Missing chunks: chunk-3.txt" in line for line in logs.output))
+
+    def test_transient_failure_is_retried(self):
+        """Test that an overloaded summary request is retried instead of dropping its chunk"""
+        fake = FakeAsyncMessages(delay=0, fail_on="3", failures=2)
+        with patch("docdog.retry.backoff_delay", return_value=0.0):
+            messages, analyzed, _ = self.analyze(fake)
+            self.assertEqual(analyzed, set(self.chunk_names))
+            self.assertEqual(len(fake.requests), 14)
+            self.assertIn("## chunk-3.txt\nsummary of chunk 3", messages[-1]["content"][0]["text"])
+
+            fake = FakeAsyncMessages(delay=0, fail_on="3", failures=2)
+            _, analyzed, _ = self.analyze(fake, max_retries=1)
+            self.assertEqual(analyzed, set(self.chunk_names) - {"chunk-3.txt"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+import unittest
+from docdog.outline import python_outline
+from docdog.tools import Tools
+
+SOURCE = '''"""Module summary.
+
+More detail about the module.
+"""
+import os
+from typing import Optional
+
+MAX_SIZE = 10
+name = "not a constant"
+
+
+class Base(object, metaclass=type):
+    """A base class."""
+
+    LIMIT: int = 3
+
+    @property
+    def size(self) -> int:
+        """Size of the thing."""
+        helper = 1
+        return helper
+
+    async def fetch(self, url, *, timeout=None):
+        return url
+
+
+def top(a, b: Optional[int] = None, *args, **kwargs) -> str:
+    def nested():
+        pass
+    return ""
+'''
+
+
+class TestOutline(unittest.TestCase):
+    def test_python_outline(self):
+        """Test that the outline keeps signatures, docstrings, imports and constants only"""
+        outline = python_outline(SOURCE)
+        self.assertEqual(outline.split("\n"), [
+            '"""Module summary.',
+            '',
+            'More detail about the module.',
+            '"""',
+            'import os',
+            'from typing import Optional',
+            'MAX_SIZE = 10',
+            'class Base(object, metaclass=type):  # lines 12-24',
+            '    """A base class."""',
+            '    LIMIT: int = 3',
+            '    @property',
+            '    def size(self) -> int:  # lines 17-21',
+            '        """Size of the thing."""',
+            '    async def fetch(self, url, *, timeout=None):  # lines 23-24',
+            'def top(a, b: Optional[int]=None, *args, **kwargs) -> str:  # lines 27-30',
+        ])
+
+    def test_python_outline_syntax_error(self):
+        """Test that unparsable source raises SyntaxError"""
+        with self.assertRaises(SyntaxError):
+            python_outline("def broken(:\n")
+
+    def test_read_file_outline_mode(self):
+        """Test the outline mode of the read_file tool"""
+        root = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(root, "mod.py"), "w") as f:
+                f.write(SOURCE)
+            with open(os.path.join(root, "notes.md"), "w") as f:
+                f.write("# Notes\n")
+            tools = Tools(root)
+            outline = tools.handle_tool_call("read_file", {"file_path": "mod.py", "mode": "outline"})
+            self.assertIn("def top(", outline)
+            self.assertNotIn("helper = 1", outline)
+            self.assertLess(len(outline), len(tools.read_file("mod.py")))
+            self.assertIn("Python files only", tools.read_file("notes.md", mode="outline"))
+            self.assertEqual(tools.cache_stats()["outline"]["misses"], 2)
+        finally:
+            shutil.rmtree(root)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+import os
+import shutil
+import tempfile
+import subprocess
+import unittest
+from unittest.mock import patch
+from docdog.project_files import (
+    compile_gitignore_line, GitignoreMatcher, IgnoreRules, git_ls_files, list_project_files
+)
+from docdog.tools import Tools
+
+class TestProjectFiles(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self._write(".gitignore", "build/\n*.log\n!keep.log\n/top.txt\n")
+        self._write("src/app.py", "print('app')\n")
+        self._write("src/debug.log", "noise\n")
+        self._write("src/keep.log", "kept\n")
+        self._write("src/top.txt", "nested top\n")
+        self._write("top.txt", "root top\n")
+        self._write("build/out.py", "generated\n")
+        self._write("docs/.gitignore", "drafts/\n")
+        self._write("docs/drafts/wip.md", "wip\n")
+        self._write("docs/index.md", "# Docs\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _write(self, rel_path, text):
+        path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def test_compile_gitignore_line(self):
+        """Test translation of gitignore globs into anchored regexes"""
+        self.assertIsNone(compile_gitignore_line("# comment"))
+        self.assertIsNone(compile_gitignore_line("   "))
+
+        regex, negate, dir_only = compile_gitignore_line("build/")
+        self.assertTrue(dir_only)
+        self.assertFalse(negate)
+        self.assertTrue(regex.match("build"))
+        self.assertTrue(regex.match("pkg/build"))
+
+        regex, negate, _ = compile_gitignore_line("!keep.log")
+        self.assertTrue(negate)
+
+        regex, _, _ = compile_gitignore_line("/top.txt")
+        self.assertTrue(regex.match("top.txt"))
+        self.assertFalse(regex.match("src/top.txt"))
+
+        regex, _, _ = compile_gitignore_line("docs/**/*.md", "pkg")
+        self.assertTrue(regex.match("pkg/docs/a/b/c.md"))
+        self.assertTrue(regex.match("pkg/docs/c.md"))
+        self.assertFalse(regex.match("docs/c.md"))
+
+    def test_matcher_rules(self):
+        """Test negation, anchoring, directory rules and nested .gitignore files"""
+        matcher = GitignoreMatcher(self.root)
+
+        self.assertTrue(matcher.is_ignored("src/debug.log"))
+        self.assertFalse(matcher.is_ignored("src/keep.log"))
+        self.assertTrue(matcher.is_ignored("top.txt"))
+        self.assertFalse(matcher.is_ignored("src/top.txt"))
+        self.assertTrue(matcher.is_ignored("build/out.py"))
+        self.assertTrue(matcher.is_ignored("docs/drafts/wip.md"))
+        self.assertFalse(matcher.is_ignored("docs/index.md"))
+        self.assertFalse(matcher.is_ignored("src/app.py"))
+        self.assertTrue(matcher.is_ignored(".git/config"))
+
+    def test_walk_skips_ignored_directories(self):
+        """Test that the .gitignore walk never descends into ignored directories"""
+        visited = []
+        real_scandir = os.scandir
+
+        def recording_scandir(path):
+            visited.append(os.path.relpath(path, self.root))
+            return real_scandir(path)
+
+        with patch('docdog.project_files.os.scandir', side_effect=recording_scandir):
+            files = dict(list_project_files(self.root, "gitignore"))
+
+        self.assertNotIn("build", visited)
+        self.assertNotIn(os.path.join("docs", "drafts"), visited)
+        self.assertEqual(files["src/app.py"].st_size, len("print('app')\n"))
+        self.assertEqual(
+            sorted(files),
+            [".gitignore", "docs/.gitignore", "docs/index.md", "src/app.py", "src/keep.log", "src/top.txt"]
+        )
+
+    def test_git_backend_uses_index(self):
+        """Test that the git backend lists tracked and untracked-but-not-ignored files"""
+        try:
+            subprocess.run(["git", "init", "-q", self.root], check=True, capture_output=True)
+            subprocess.run(["git", "-C", self.root, "add", "src/app.py"], check=True, capture_output=True)
+        except (OSError, subprocess.CalledProcessError):
+            self.skipTest("git is not available")
+        os.makedirs(os.path.join(self.root, "venv"))
+        self._write("venv/lib.py", "vendored\n")
+
+        files = dict(list_project_files(self.root, "git", skip_dir_names=["venv"]))
+
+        self.assertIn("src/app.py", files)
+        self.assertIn("docs/index.md", files)
+        self.assertNotIn("build/out.py", files)
+        self.assertNotIn("docs/drafts/wip.md", files)
+        self.assertNotIn("venv/lib.py", files)
+
+        files = dict(list_project_files(self.root, "git", skip_paths=["docs/index.md"]))
+        self.assertIn("src/app.py", files)
+        self.assertNotIn("docs/index.md", files)
+
+    @patch('docdog.project_files.subprocess.run', side_effect=FileNotFoundError("git"))
+    def test_git_backend_falls_back_to_gitignore(self, mock_run):
+        """Test that a missing git falls back to the .gitignore walk"""
+        self.assertIsNone(git_ls_files(self.root))
+        files = dict(list_project_files(self.root, "git"))
+        self.assertIn("src/app.py", files)
+        self.assertNotIn("build/out.py", files)
+        self.assertNotIn("src/top.txt", dict(list_project_files(self.root, "git", skip_paths=["src/top.txt"])))
+
+    def test_tools_respect_gitignore(self):
+        """Test that Tools ignores gitignored files but can always read chunk files"""
+        self._write(".gitignore", "chunks/\n*.log\n")
+        self._write("chunks/chunk-0.txt", "chunk\n")
+        tools = Tools(self.root)
+
+        self.assertTrue(tools.should_ignore(os.path.join(self.root, "src", "debug.log")))
+        self.assertFalse(tools.should_ignore(os.path.join(self.root, "src", "app.py")))
+        self.assertFalse(tools.should_ignore(os.path.join(self.root, "chunks", "chunk-0.txt")))
+        self.assertFalse(Tools(self.root, respect_gitignore=False).should_ignore(
+            os.path.join(self.root, "src", "debug.log")
+        ))
+
+    def test_ignore_rules(self):
+        """Test the compiled prefix, inner directory, suffix and glob rules"""
+        rules = IgnoreRules(
+            prefixes=[".git", "venv"], dir_names=[".git", "venv"], suffixes=[".pyc", ".DS_Store"],
+            patterns=["docs/*.tmp"]
+        )
+        self.assertTrue(rules.matches(".git/config"))
+        self.assertTrue(rules.matches("venv_tools/x.py"))
+        self.assertTrue(rules.matches("pkg/venv/lib.py"))
+        self.assertFalse(rules.matches("pkg/venv"))
+        self.assertTrue(rules.matches("pkg/mod.cpython-311.pyc"))
+        self.assertTrue(rules.matches("pkg/.DS_Store"))
+        self.assertTrue(rules.matches("docs/a/b.tmp"))
+        self.assertFalse(rules.matches("src/app.py"))
+        self.assertFalse(rules.matches("pyc"))
+
+    def test_tools_extra_ignore_patterns(self):
+        """Test that patterns added to Tools.ignore_patterns apply once recompiled"""
+        tools = Tools(self.root, respect_gitignore=False)
+        path = os.path.join(self.root, "docs", "index.md")
+        self.assertFalse(tools.should_ignore(path))
+        tools.ignore_patterns.append("docs/*.md")
+        tools.compile_ignore_rules()
+        self.assertTrue(tools.should_ignore(path))
+        self.assertTrue(tools.should_ignore(os.path.join(self.root, "src", ".", "..", "venv", "x.py")))
+
+if __name__ == '__main__':
+    unittest.main()
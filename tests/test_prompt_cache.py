@@ -0,0 +1,103 @@
+import copy
+import unittest
+from types import SimpleNamespace
+from docdog.p1_analysis_helper import analyze_project
+from docdog.prompt_cache import MAX_CACHE_BREAKPOINTS, cached_tools, input_usage, with_cache_breakpoints
+from tests.helpers import FakeTools, read_chunk_response
+
+TOOLS = [
+    {"name": "read_file", "description": "Read a file", "input_schema": {"type": "object"}},
+    {"name": "list_files", "description": "List files", "input_schema": {"type": "object"}},
+]
+
+
+class FakeMessages:
+    """messages.create stand-in that records each request and replays canned responses."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def create(self, **kwargs):
+        self.requests.append(copy.deepcopy(kwargs))
+        return self.responses.pop(0)
+
+
+class FakeClient:
+    def __init__(self, responses):
+        self.messages = FakeMessages(responses)
+
+
+def breakpoints(request):
+    """Positions that carry cache_control: ("tools", index) or (message index, block index)."""
+    marked = [("tools", i) for i, tool in enumerate(request.get("tools", [])) if "cache_control" in tool]
+    for i, message in enumerate(request["messages"]):
+        if isinstance(message["content"], list):
+            marked += [(i, j) for j, block in enumerate(message["content"]) if "cache_control" in block]
+    return marked
+
+
+class TestCacheBreakpoints(unittest.TestCase):
+    def test_cached_tools_marks_only_the_last_schema(self):
+        """Test that the tool schemas are copied with one breakpoint at the end"""
+        tools = cached_tools(TOOLS)
+        self.assertNotIn("cache_control", tools[0])
+        self.assertEqual(tools[1]["cache_control"], {"type": "ephemeral"})
+        self.assertNotIn("cache_control", TOOLS[1])
+
+    def test_breakpoints_on_prompt_and_latest_user_turns(self):
+        """Test breakpoint placement and that the stored conversation is not modified"""
+        messages = [{"role": "user", "content": "Initial prompt"}]
+        for i in range(4):
+            messages.append({"role": "assistant", "content": [{"type": "text", "text": f"turn {i}"}]})
+            messages.append({"role": "user", "content": [
+                {"type": "tool_result", "tool_use_id": f"a{i}", "content": "x"},
+                {"type": "tool_result", "tool_use_id": f"b{i}", "content": "y"},
+            ]})
+        original = copy.deepcopy(messages)
+
+        request = with_cache_breakpoints(messages)
+        self.assertEqual(breakpoints({"messages": request}), [(0, 0), (6, 1), (8, 1)])
+        self.assertEqual(request[0]["content"], [
+            {"type": "text", "text": "Initial prompt", "cache_control": {"type": "ephemeral"}}
+        ])
+        self.assertEqual(messages, original)
+
+        without_tools = with_cache_breakpoints(messages, tools_cached=False)
+        self.assertEqual(breakpoints({"messages": without_tools}), [(0, 0), (4, 1), (6, 1), (8, 1)])
+
+    def test_input_usage_defaults_missing_fields(self):
+        """Test that responses without cache fields count as uncached"""
+        self.assertEqual(input_usage(SimpleNamespace(usage=SimpleNamespace(input_tokens=7))), (0, 0, 7))
+        self.assertEqual(input_usage(SimpleNamespace()), (0, 0, 0))
+
+
+class TestAnalysisWithPromptCaching(unittest.TestCase):
+    def test_requests_carry_breakpoints_and_usage_is_logged(self):
+        """Test every analysis request against a fake client and the per-iteration usage log"""
+        client = FakeClient([read_chunk_response(i, 900 * i, 300, 50) for i in range(3)])
+        messages = [{"role": "user", "content": "Initial prompt"}]
+
+        with self.assertLogs("docdog.p1_analysis_helper", level="INFO") as logs:
+            analyze_project(client, "model", messages, TOOLS, FakeTools(),
+                            [f"chunk-{i}.txt" for i in range(3)], max_iterations=5)
+
+        requests = client.messages.requests
+        self.assertEqual(len(requests), 3)
+        for request in requests:
+            marked = breakpoints(request)
+            self.assertLessEqual(len(marked), MAX_CACHE_BREAKPOINTS)
+            self.assertIn(("tools", 1), marked)
+            self.assertIn((0, 0), marked)
+            self.assertIn((len(request["messages"]) - 1, len(request["messages"][-1]["content"]) - 1), marked)
+        self.assertEqual(breakpoints(requests[2]), [("tools", 1), (0, 0), (2, 0), (4, 0)])
+        self.assertEqual(messages[0], {"role": "user", "content": "Initial prompt"})
+        self.assertTrue(all("cache_control" not in block for m in messages[1:] for block in m["content"]))
+
+        output = "\n".join(logs.output)
+        self.assertIn("Analysis iteration 2 input tokens: 900 cached, 300 written to cache, 50 uncached", output)
+        self.assertIn("Analysis input tokens: 2700 cached, 900 written to cache, 150 uncached", output)
+
+
+if __name__ == '__main__':
+    unittest.main()
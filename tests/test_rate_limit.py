@@ -0,0 +1,184 @@
+import os
+import json
+import time
+import shutil
+import asyncio
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import anthropic
+from docdog.p1_map_reduce import map_reduce_analysis_async
+from docdog.rate_limit import RateScheduler, ScheduledClient, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeAPIServer:
+    """
+    Local stand-in for the Messages API that enforces its own token-bucket request limit
+    and answers 429 once it is exceeded, like the real API.
+    """
+
+    def __init__(self, requests_per_period, period, delay=0.05):
+        self.bucket = TokenBucket(requests_per_period, requests_per_period / period)
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.served = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with server.lock:
+                    allowed = server.bucket.wait_time(1) == 0
+                    if allowed:
+                        server.bucket.take(1)
+                        server.served += 1
+                        server.in_flight += 1
+                        server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                    else:
+                        server.rejected += 1
+                if not allowed:
+                    return self._reply(429, {"type": "error", "error": {"type": "rate_limit_error", "message": "slow down"}})
+                time.sleep(server.delay)
+                with server.lock:
+                    server.in_flight -= 1
+                prompt = body["messages"][-1]["content"]
+                self._reply(200, {
+                    "id": "msg_test", "type": "message", "role": "assistant", "model": body["model"],
+                    "content": [{"type": "text", "text": f"summary: {prompt.splitlines()[-1]}"}],
+                    "stop_reason": "end_turn", "stop_sequence": None,
+                    "usage": {"input_tokens": 100, "output_tokens": 20}
+                })
+
+            def _reply(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_refill_wait_and_settle(self):
+        """Test continuous refill, waiting for a full bucket and corrections after the fact"""
+        clock = FakeClock()
+        bucket = TokenBucket(10, 2, clock)
+        bucket.take(10)
+        self.assertEqual(bucket.wait_time(4), 2.0)
+        clock.now = 2.0
+        self.assertEqual(bucket.wait_time(4), 0.0)
+        self.assertEqual(bucket.wait_time(50), 3.0)
+        bucket.take(4)
+        bucket.give_back(-6)
+        self.assertEqual(bucket.level, -6)
+        clock.now = 100.0
+        bucket.give_back(5)
+        self.assertEqual(bucket.level, 10)
+
+
+class TestRateScheduler(unittest.IsolatedAsyncioTestCase):
+    async def test_requests_paced_after_burst(self):
+        """Test that a burst up to the limit passes at once and the rest is paced"""
+        scheduler = RateScheduler(requests_per_minute=4, tokens_per_minute=None, period=1.0)
+        start = time.monotonic()
+        admitted_at = []
+
+        async def request():
+            await scheduler.acquire(0)
+            admitted_at.append(time.monotonic() - start)
+
+        await asyncio.gather(*(request() for _ in range(8)))
+        self.assertEqual(scheduler.admitted, 8)
+        self.assertLess(max(admitted_at[:4]), 0.15)
+        self.assertGreaterEqual(min(admitted_at[4:]), 0.2)
+        self.assertGreaterEqual(max(admitted_at), 0.9)
+
+    async def test_token_budget_and_settlement(self):
+        """Test that large requests wait for token budget and refunds free it early"""
+        scheduler = RateScheduler(requests_per_minute=None, tokens_per_minute=1000, period=1.0)
+        await scheduler.acquire(800)
+        scheduler.settle(800, 100)
+        start = time.monotonic()
+        await scheduler.acquire(900)
+        self.assertLess(time.monotonic() - start, 0.1)
+        await scheduler.acquire(500)
+        self.assertGreaterEqual(time.monotonic() - start, 0.35)
+
+    async def test_request_over_capacity_is_settled_against_its_charge(self):
+        """Test that a request estimated above the budget leaves a debt of what it used beyond the charge"""
+        clock = FakeClock()
+        scheduler = RateScheduler(requests_per_minute=None, tokens_per_minute=40000, clock=clock)
+        with self.assertLogs("docdog.rate_limit", level="WARNING") as logs:
+            charged = await scheduler.acquire(82000)
+        self.assertEqual(len(logs.output), 1)
+        self.assertEqual(charged, 40000)
+        scheduler.settle(charged, 80000)
+        self.assertEqual(scheduler.tokens.level, -40000)
+        self.assertEqual(scheduler.tokens.wait_time(1000), 61.5)
+
+
+class TestScheduledClientAgainstFakeServer(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeAPIServer(requests_per_period=4, period=0.5)
+        self.chunks_dir = tempfile.mkdtemp()
+        self.chunk_names = [f"chunk-{i}.txt" for i in range(10)]
+        for i, name in enumerate(self.chunk_names):
+            with open(os.path.join(self.chunks_dir, name), "w") as f:
+                f.write(f"CHUNK {i}")
+
+    def tearDown(self):
+        self.server.close()
+        shutil.rmtree(self.chunks_dir)
+
+    def client(self):
+        return anthropic.AsyncAnthropic(api_key="test", base_url=self.server.base_url, max_retries=0)
+
+    def analyze(self, client):
+        return asyncio.run(map_reduce_analysis_async(
+            client, "model", [{"role": "user", "content": "Initial prompt"}], self.chunks_dir,
+            self.chunk_names, "Summarize:", max_concurrency=10, max_retries=0
+        ))
+
+    def test_unscheduled_burst_trips_rate_limit(self):
+        """Test that the fake server rejects a burst above its limit"""
+        _, analyzed, _ = self.analyze(self.client())
+        self.assertGreater(self.server.rejected, 0)
+        self.assertLess(len(analyzed), 10)
+
+    def test_scheduled_client_stays_within_limit(self):
+        """Test that the scheduler, set a little under the server's limit, never trips it"""
+        scheduler = RateScheduler(requests_per_minute=4, tokens_per_minute=None, period=0.6)
+        messages, analyzed, _ = self.analyze(ScheduledClient(self.client(), scheduler))
+        self.assertEqual(self.server.rejected, 0)
+        self.assertEqual(analyzed, set(self.chunk_names))
+        self.assertEqual(scheduler.admitted, 10)
+        self.assertGreater(self.server.max_in_flight, 1)
+        self.assertIn("## chunk-9.txt\nsummary: CHUNK 9", messages[-1]["content"][0]["text"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import random
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+import anthropic
+from docdog.retry import backoff_delay, call_with_retries, call_with_retries_async, is_transient
+from tests.helpers import status_error
+
+
+class TestRetry(unittest.TestCase):
+    def test_transient_errors(self):
+        """Test which API errors are retried"""
+        self.assertTrue(is_transient(anthropic.APIConnectionError(request=MagicMock())))
+        self.assertTrue(is_transient(status_error(429)))
+        self.assertTrue(is_transient(status_error(529)))
+        self.assertTrue(is_transient(status_error(503)))
+        self.assertFalse(is_transient(status_error(400)))
+        self.assertFalse(is_transient(ValueError("bad input")))
+
+    def test_backoff_is_jittered_and_capped(self):
+        """Test that delays stay within the exponential envelope and the cap"""
+        rng = random.Random(7)
+        for attempt in range(10):
+            delays = [backoff_delay(attempt, base=1.0, cap=8.0, rng=rng) for _ in range(50)]
+            self.assertTrue(all(0 <= d <= min(8.0, 2 ** attempt) for d in delays))
+            self.assertGreater(len(set(delays)), 1)
+
+    def test_retries_until_success_honouring_retry_after(self):
+        """Test that transient failures are retried and retry-after sets the minimum wait"""
+        sleeps = []
+        func = MagicMock(side_effect=[status_error(529, retry_after="5"), status_error(503), "ok"])
+        self.assertEqual(call_with_retries(func, max_retries=3, sleep=sleeps.append, rng=random.Random(1)), "ok")
+        self.assertEqual(func.call_count, 3)
+        self.assertGreaterEqual(sleeps[0], 5.0)
+        self.assertLessEqual(sleeps[1], 2.0)
+
+    def test_gives_up_after_max_retries_or_on_permanent_errors(self):
+        """Test that the last transient error and permanent errors are raised"""
+        func = MagicMock(side_effect=status_error(429))
+        with self.assertRaises(anthropic.APIStatusError):
+            call_with_retries(func, max_retries=2, sleep=lambda _: None)
+        self.assertEqual(func.call_count, 3)
+
+        func = MagicMock(side_effect=status_error(400))
+        with self.assertRaises(anthropic.APIStatusError):
+            call_with_retries(func, max_retries=5, sleep=lambda _: None)
+        self.assertEqual(func.call_count, 1)
+
+    def test_async_retries_share_the_backoff(self):
+        """Test that the asyncio form retries transient errors, waits through its sleep and raises the rest"""
+        sleeps = []
+
+        async def sleep(delay):
+            sleeps.append(delay)
+
+        func = AsyncMock(side_effect=[status_error(529, retry_after="3"), "ok"])
+        result = asyncio.run(call_with_retries_async(func, max_retries=2, sleep=sleep))
+        self.assertEqual((result, func.call_count), ("ok", 2))
+        self.assertGreaterEqual(sleeps[0], 3.0)
+
+        func = AsyncMock(side_effect=status_error(400))
+        with self.assertRaises(anthropic.APIStatusError):
+            asyncio.run(call_with_retries_async(func, max_retries=2, sleep=sleep))
+        self.assertEqual(func.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import os
+import shutil
+import tempfile
+import unittest
+from docdog.symbol_index import SymbolIndex, js_symbols, python_symbols
+from docdog.tools import Tools
+
+PY_SOURCE = '''import os
+
+MAX_ITEMS = 10
+
+
+class Store(object):
+    LIMIT = 3
+
+    def get(self, key, default=None):
+        return default
+
+    async def fetch(self, url) -> bytes:
+        pass
+
+
+def helper(x: int) -> int:
+    def nested():
+        pass
+    return x
+'''
+
+JS_SOURCE = '''import x from "y";
+export function parse(text, options) {
+  return text;
+}
+export default class Parser extends Base {
+}
+export const VERSION = "1.0";
+export interface Options { strict: boolean }
+export type Mode = "a" | "b";
+function internal() {}
+'''
+
+
+class TestSymbolExtraction(unittest.TestCase):
+    def test_python_symbols(self):
+        """Test classes, methods, functions and constants with qualified names and lines"""
+        symbols = [(s.qualname, s.kind, s.line, s.signature) for s in python_symbols(PY_SOURCE, "store.py")]
+        self.assertEqual(symbols, [
+            ("MAX_ITEMS", "constant", 3, "MAX_ITEMS = 10"),
+            ("Store", "class", 6, "class Store(object):"),
+            ("Store.LIMIT", "constant", 7, "LIMIT = 3"),
+            ("Store.get", "method", 9, "def get(self, key, default=None):"),
+            ("Store.fetch", "method", 12, "async def fetch(self, url) -> bytes:"),
+            ("helper", "function", 16, "def helper(x: int) -> int:"),
+        ])
+
+    def test_js_exports(self):
+        """Test that only exported JS/TS declarations are listed"""
+        symbols = [(s.name, s.kind, s.line) for s in js_symbols(JS_SOURCE, "parser.ts")]
+        self.assertEqual(symbols, [
+            ("parse", "function", 2),
+            ("Parser", "class", 5),
+            ("VERSION", "constant", 7),
+            ("Options", "interface", 8),
+            ("Mode", "type", 9),
+        ])
+        self.assertEqual(js_symbols(JS_SOURCE, "parser.ts")[0].signature, "export function parse(text, options)")
+
+
+class TestSymbolIndex(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        for rel_path, text in {
+            "pkg/store.py": PY_SOURCE,
+            "pkg/other.py": "def helper():\n    pass\n",
+            "pkg/broken.py": "def oops(:\n",
+            "web/parser.ts": JS_SOURCE,
+            "node_modules/lib/index.js": "export function helper() {}\n",
+            "README.md": "# helper\n",
+        }.items():
+            path = os.path.join(self.root, rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(text)
+        self.tools = Tools(self.root)
+
+    def tearDown(self):
+        self.tools.close()
+        shutil.rmtree(self.root)
+
+    def test_find_symbol(self):
+        """Test lookups by name and qualified name across files"""
+        self.assertEqual(self.tools.find_symbol("helper").split("\n"), [
+            "pkg/other.py:1\tfunction\thelper\tdef helper():",
+            "pkg/store.py:16\tfunction\thelper\tdef helper(x: int) -> int:",
+        ])
+        self.assertEqual(
+            self.tools.handle_tool_call("find_symbol", {"name": "Store.get"}),
+            "pkg/store.py:9\tmethod\tStore.get\tdef get(self, key, default=None):"
+        )
+        self.assertIn("web/parser.ts:5\tclass\tParser", self.tools.find_symbol("Parser"))
+        self.assertEqual(self.tools.find_symbol("nested"), "No definition of nested found.")
+
+    def test_list_module_symbols(self):
+        """Test per-file listings, unparsable files and unindexed files"""
+        listing = self.tools.handle_tool_call("list_module_symbols", {"file_path": "./pkg/other.py"})
+        self.assertEqual(listing, "1\tfunction\thelper\tdef helper():")
+        self.assertIn("not in the symbol index", self.tools.list_module_symbols("pkg/broken.py"))
+        self.assertIn("not in the symbol index", self.tools.list_module_symbols("README.md"))
+
+    def test_built_once_in_background(self):
+        """Test that the background build serves later lookups without re-reading files"""
+        self.tools.start_symbol_index().join()
+        os.remove(os.path.join(self.root, "pkg", "other.py"))
+        self.assertIn("pkg/other.py:1", self.tools.find_symbol("helper"))
+
+    def test_build_is_idempotent(self):
+        """Test that a second build keeps the first result"""
+        index = SymbolIndex(self.root)
+        index.build()
+        first = index.find("Store")
+        index.build()
+        self.assertIs(index.find("Store"), first)
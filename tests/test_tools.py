@@ -1,4 +1,6 @@
 import os
+import shutil
+import tempfile
 import unittest
 import json
 import ast
@@ -16,7 +18,9 @@ class TestTools(unittest.TestCase):
         tools = Tools(self.project_root)
         self.assertEqual(tools.project_root, self.project_root)
         self.assertIsNone(tools.max_workers)
-        self.assertEqual(tools.cache_size, 128)
+        self.assertIsNone(tools.cache_size)
+        self.assertIsNone(tools._cached_read_file.maxsize)
+        self.assertEqual(tools._cached_read_file.max_bytes, tools.cache_bytes)
         
         tools_custom = Tools(self.project_root, max_workers=4, cache_size=256)
         self.assertEqual(tools_custom.project_root, self.project_root)
@@ -213,9 +217,9 @@ class TestTools(unittest.TestCase):
     
     @patch('concurrent.futures.ThreadPoolExecutor')
     def test_batch_read_files_threading(self, mock_executor_class):
-        """Test that batch_read_files uses ThreadPoolExecutor"""
+        """Test that batch_read_files uses one ThreadPoolExecutor for the life of Tools"""
         mock_executor = MagicMock()
-        mock_executor_class.return_value.__enter__.return_value = mock_executor
+        mock_executor_class.return_value = mock_executor
         
         mock_future1 = MagicMock()
         mock_future1.result.return_value = "content1"
@@ -237,6 +241,46 @@ class TestTools(unittest.TestCase):
             self.assertEqual(parsed[0]["content"], "content1")
             self.assertEqual(parsed[1]["file"], "file2.txt")
             self.assertEqual(parsed[1]["content"], "content2")
+        
+        mock_executor.submit.side_effect = [mock_future1]
+        with patch('concurrent.futures.as_completed', return_value=[mock_future1]):
+            self.tools.batch_read_files(["file1.txt"])
+        mock_executor_class.assert_called_once()
+        self.tools.close()
+        mock_executor.shutdown.assert_called_once()
+    
+    def test_batch_read_files_out_of_order_completion(self):
+        """Test that results completing out of order are returned in request order"""
+        futures = [concurrent.futures.Future() for _ in range(3)]
+        for future, content in zip(futures, ["a", "b", "c"]):
+            future.set_result(content)
+        mock_executor = MagicMock()
+        mock_executor.submit.side_effect = futures
+        with patch.object(self.tools, '_get_executor', return_value=mock_executor):
+            with patch('concurrent.futures.as_completed', return_value=list(reversed(futures))):
+                parsed = json.loads(self.tools.batch_read_files(["1", "2", "3"]))
+        self.assertEqual([item["content"] for item in parsed], ["a", "b", "c"])
+    
+    def test_batch_read_files_truncates_with_cursor(self):
+        """Test the output cap, the continuation cursor and that an oversized file is never cut"""
+        contents = {f"f{i}.txt": str(i) * 40 for i in range(5)}
+        self.tools.batch_max_bytes = 150
+        with patch.object(self.tools, 'read_file', side_effect=lambda p: contents[p]):
+            parsed = json.loads(self.tools.batch_read_files(list(contents)))
+            self.assertEqual([item.get("file") for item in parsed[:-1]], ["f0.txt", "f1.txt"])
+            self.assertEqual(parsed[-1]["truncated"], True)
+            self.assertEqual(parsed[-1]["cursor"], 2)
+            
+            parsed = json.loads(self.tools.handle_tool_call(
+                "batch_read_files", {"file_paths": list(contents), "cursor": 4}
+            ))
+            self.assertEqual(parsed, [{"file": "f4.txt", "content": "4" * 40}])
+            
+            self.tools.batch_max_bytes = 20
+            parsed = json.loads(self.tools.batch_read_files(["f0.txt", "f1.txt"]))
+            self.assertEqual(parsed[0], {"file": "f0.txt", "content": "0" * 40})
+            self.assertEqual(parsed[1]["cursor"], 1)
+        self.tools.close()
     
     def test_batch_read_files(self):
         """Test batch reading multiple files"""
@@ -274,4 +318,109 @@ class TestTools(unittest.TestCase):
             self.assertEqual(result, '[{"file": "test.txt", "content": "data"}]')
         
         result = self.tools.handle_tool_call("unknown_tool", {})
-        self.assertIn("Unknown tool", result)
\ No newline at end of file
+        self.assertIn("Unknown tool", result)
+
+class TestReadFileRange(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        with open(os.path.join(self.root, "big.py"), "w", encoding="utf-8") as f:
+            f.writelines(f"line {i}\n" for i in range(1, 501))
+        with open(os.path.join(self.root, "utf8.txt"), "w", encoding="utf-8") as f:
+            f.write("caf\u00e9 " * 10)
+        self.tools = Tools(self.root)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_line_window(self):
+        """Test that a line window returns just those lines with a continuation cursor"""
+        result = self.tools.read_file_range("big.py", start_line=10, num_lines=3)
+        self.assertEqual(result.split("\n")[1:4], ["line 10", "line 11", "line 12"])
+        self.assertIn("lines 10-12", result)
+        self.assertNotIn("line 13", result)
+        self.assertTrue(result.endswith("[more follows, cursor: lines:13:87]"))
+
+    def test_cursor_pages_through_file(self):
+        """Test that following cursors reads every line exactly once"""
+        seen = []
+        result = self.tools.handle_tool_call("read_file_range", {"file_path": "big.py"})
+        while True:
+            body = result.split("\n")[1:-1]
+            seen.extend(line for line in body if line)
+            if result.endswith("[end of file]"):
+                break
+            cursor = result.rsplit("cursor: ", 1)[1].rstrip("]")
+            result = self.tools.handle_tool_call("read_file_range", {"file_path": "big.py", "cursor": cursor})
+        self.assertEqual(seen, [f"line {i}" for i in range(1, 501)])
+
+    def test_byte_window_keeps_characters_whole(self):
+        """Test that byte windows never split a UTF-8 character"""
+        result = self.tools.read_file_range("utf8.txt", offset=0, length=4)
+        self.assertEqual(result.split("\n")[1], "caf")
+        self.assertIn("cursor: bytes:3", result)
+        result = self.tools.read_file_range("utf8.txt", cursor="bytes:3", length=3)
+        self.assertEqual(result.split("\n")[1], "\u00e9 ")
+
+    def test_errors(self):
+        """Test reads outside the repo, past the end and with a bad cursor"""
+        self.assertIn("outside the repo", self.tools.read_file_range("../etc/passwd"))
+        self.assertIn("fewer than 1000 lines", self.tools.read_file_range("big.py", start_line=1000))
+        self.assertIn("Invalid cursor", self.tools.read_file_range("big.py", cursor="x:1"))
+        self.assertIn("Error reading file", self.tools.read_file_range("missing.py"))
+
+class TestListTree(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        for rel_path, text in {
+            "setup.py": "x" * 10,
+            "src/pkg/__init__.py": "",
+            "src/pkg/core.py": "y" * 25,
+            "src/pkg/deep/more/leaf.py": "z",
+            "docs/guide.md": "# Guide\n",
+            "node_modules/lib/index.js": "ignored",
+        }.items():
+            path = os.path.join(self.root, rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(text)
+        self.tools = Tools(self.root)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_depth_limit_and_sizes(self):
+        """Test the depth-first listing with sizes, depth limit and ignored directories"""
+        result = self.tools.handle_tool_call("list_tree", {"max_depth": 3})
+        self.assertEqual(result.split("\n"), [
+            "docs/", "docs/guide.md\t8",
+            "setup.py\t10",
+            "src/", "src/pkg/", "src/pkg/__init__.py\t0", "src/pkg/core.py\t25", "src/pkg/deep/",
+        ])
+
+    def test_glob_filter(self):
+        """Test that a pattern lists only matching files"""
+        self.assertEqual(
+            self.tools.list_tree("src", max_depth=10, pattern="*.py").split("\n"),
+            ["src/pkg/__init__.py\t0", "src/pkg/core.py\t25", "src/pkg/deep/more/leaf.py\t1"]
+        )
+        self.assertEqual(self.tools.list_tree(pattern="src/*/core.py"), "src/pkg/core.py\t25")
+
+    def test_pagination_with_cursor(self):
+        """Test that following cursors lists every entry exactly once"""
+        full = self.tools.list_tree(max_depth=10, page_size=100).split("\n")
+        seen = []
+        cursor = None
+        while True:
+            page = self.tools.list_tree(max_depth=10, page_size=3, cursor=cursor).split("\n")
+            if page[-1].startswith("[more entries"):
+                cursor = page[-1].rsplit("cursor: ", 1)[1].rstrip("]")
+                seen.extend(page[:-1])
+            else:
+                seen.extend(page)
+                break
+        self.assertEqual(seen, full)
+
+    def test_errors(self):
+        """Test directories outside the repo or missing"""
+        self.assertIn("outside the repo", self.tools.list_tree(".."))
+        self.assertEqual(self.tools.list_tree("missing"), "Directory does not exist.")